@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agents', '0003_aiinteraction'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aiinteraction',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='ai_interaction_feed_idx'),
+        ),
+    ]
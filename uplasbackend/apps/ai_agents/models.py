@@ -46,6 +46,10 @@ class AIInteraction(BaseModel):
     class Meta:
         app_label = 'ai_agents'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a user's interaction history (see apps.core.pagination)
+            models.Index(fields=['user', '-created_at', '-id'], name='ai_interaction_feed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.interaction_type} - {self.created_at}"
@@ -6,6 +6,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
+from apps.core.pagination import KeysetPagination
+
 from .models import AIAgent, AIInteraction
 from .serializers import (
     AIAgentSerializer,
@@ -37,9 +39,10 @@ class AIInteractionViewSet(viewsets.ReadOnlyModelViewSet):
     """API endpoint for viewing AI interaction history."""
     serializer_class = AIInteractionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return AIInteraction.objects.filter(user=self.request.user)
+        return AIInteraction.objects.filter(user=self.request.user).order_by('-created_at')
 
 
 def get_user_profile_snapshot(user, provided_snapshot=None):
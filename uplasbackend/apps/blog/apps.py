@@ -1,7 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 from django.utils.translation import gettext_lazy as _
 
 
+def create_model_indexes(sender, using, **kwargs):
+    # The app has no migrations; Meta.indexes added later are created after every migrate
+    from django.db import connections
+    from apps.core.schema import ensure_model_indexes
+    ensure_model_indexes(sender.get_models(), connections[using])
+
+
 class BlogConfig(AppConfig):
     """
     Application configuration for the 'blog' app.
@@ -26,5 +34,6 @@ class BlogConfig(AppConfig):
             # import apps.blog.signals
         except ImportError:
             pass
+        post_migrate.connect(create_model_indexes, sender=self)
 
 
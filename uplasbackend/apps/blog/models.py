@@ -3,7 +3,6 @@ from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.utils.text import slugify
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
@@ -11,6 +10,9 @@ from django.dispatch import receiver
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 
+from apps.core.models import CounterFieldsMixin
+from apps.core.slugs import with_unique_slug
+
 
 # Choices for BlogPost Status
 BLOG_POST_STATUS_CHOICES = [
@@ -59,7 +61,7 @@ class BlogPostTag(models.Model):
         return self.name
 
 
-class BlogPost(models.Model):
+class BlogPost(CounterFieldsMixin, models.Model):
     """
     Represents an individual blog post.
     """
@@ -108,6 +110,7 @@ class BlogPost(models.Model):
     view_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('View Count'))
     like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Like Count'))
     comment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Comment Count'))
+    counter_fields = ('view_count', 'like_count', 'comment_count')
 
     # SEO Fields (optional)
     meta_title = models.CharField(max_length=160, blank=True, null=True, verbose_name=_('Meta Title'))
@@ -130,15 +133,6 @@ class BlogPost(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-            # Ensure slug uniqueness if auto-generating
-            original_slug = self.slug
-            counter = 1
-            while BlogPost.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
-        
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
         elif self.status != 'published' and self.published_at is not None:
@@ -149,10 +143,19 @@ class BlogPost(models.Model):
         # TODO: Add Markdown to HTML conversion logic here if storing content_html
         # from markdown import markdown
         # self.content_html = markdown(self.content_markdown)
+        if not self.slug:
+            # Auto-generated slugs are made unique (retried if a concurrent save takes the same one)
+            save = super().save
+
+            def write(slug):
+                self.slug = slug
+                save(*args, **kwargs)
+            with_unique_slug(BlogPost, self.title, write, exclude_pk=self.pk)
+            return
         super().save(*args, **kwargs)
 
 
-class BlogComment(models.Model):
+class BlogComment(CounterFieldsMixin, models.Model):
     """
     Represents a comment on a BlogPost.
     """
@@ -183,6 +186,7 @@ class BlogComment(models.Model):
     is_hidden_by_moderator = models.BooleanField(default=False, verbose_name=_('Is Hidden by Moderator'))
     
     like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Like Count'))
+    counter_fields = ('like_count',)
     # GenericRelation to allow Likes from the community app
     likes = GenericRelation('community.Like', related_query_name='blog_comments_liked')
 
@@ -194,6 +198,10 @@ class BlogComment(models.Model):
         verbose_name = _('Blog Comment')
         verbose_name_plural = _('Blog Comments')
         ordering = ['created_at'] # Oldest comments first for a post
+        indexes = [
+            # Keyset pagination of a post's comments (see apps.core.pagination)
+            models.Index(fields=['blog_post', 'created_at', 'id'], name='blog_comment_feed_idx'),
+        ]
 
     def __str__(self):
         author_email = self.author.email if self.author else _("Anonymous")
@@ -228,10 +236,5 @@ def update_blog_post_comment_count(sender, instance, **kwargs):
         ).count()
         blog_post.save(update_fields=['comment_count'])
 
-# Signal for updating BlogPost.like_count when a 'community.Like' is saved/deleted
-# This assumes 'community.Like' has a signal that can identify if the liked object is a BlogPost.
-# Alternatively, if you had a dedicated BlogLike model, the signal would be on that.
-# If using community.Like, its own signal should handle updating the liked_object.like_count
-# as long as BlogPost has a 'like_count' field and the GenericRelation is set up.
-# The community.Like signal needs to be robust enough to check:
-# if isinstance(liked_object, BlogPost): liked_object.save(update_fields=['like_count'])
+# BlogPost.like_count and BlogComment.like_count are kept by the 'community.Like'
+# signals, which apply +1/-1 to the liked object's like_count (see apps.community.likes).
@@ -1,9 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
-from django.utils.text import slugify
 from django.contrib.contenttypes.models import ContentType # For generic likes
 from rest_framework import serializers
 
+from apps.core.slugs import unique_slug
+
 from .models import BlogCategory, BlogPostTag, BlogPost, BlogComment
 # Assuming a generic Like model might be in 'community' or a shared app
 # from apps.community.models import Like # Example if using community's Like model
@@ -53,16 +54,7 @@ class BlogCategorySerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
     def _get_unique_slug(self, name, instance_pk=None):
-        slug = slugify(name)
-        unique_slug = slug
-        counter = 1
-        qs = BlogCategory.objects.all()
-        if instance_pk:
-            qs = qs.exclude(pk=instance_pk)
-        while qs.filter(slug=unique_slug).exists():
-            unique_slug = f'{slug}-{counter}'
-            counter += 1
-        return unique_slug
+        return unique_slug(BlogCategory, name, exclude_pk=instance_pk)
 
 
 # --- BlogPostTag Serializer ---
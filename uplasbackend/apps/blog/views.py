@@ -12,6 +12,9 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
+from apps.core.pagination import KeysetPagination
+from apps.core.view_counts import record_view, viewer_key
+
 from .models import BlogCategory, BlogPostTag, BlogPost, BlogComment
 from .serializers import (
     BlogCategorySerializer, BlogPostTagSerializer,
@@ -115,12 +118,9 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object() # This also runs permission checks
         
-        # Increment view count (basic implementation, consider rate limiting or uniqueness for views)
-        # Check if it's a legitimate view (e.g., not by a bot or the author themselves repeatedly)
-        # For simplicity, we increment on every retrieve for now.
+        # Views are buffered and written in batches (see apps/core/view_counts.py)
         if instance.status == 'published': # Only count views for published posts
-            instance.view_count += 1
-            instance.save(update_fields=['view_count', 'updated_at']) # Avoid full save if only view_count changes
+            instance.view_count += record_view(instance, viewer_key(request))
             
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -151,6 +151,7 @@ class BlogCommentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = BlogCommentSerializer
     permission_classes = [IsAuthenticated] # Base, refined per action
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
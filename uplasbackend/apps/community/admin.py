@@ -1,10 +1,14 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.html import format_html
 from django.contrib.contenttypes.admin import GenericTabularInline # For GenericForeignKey relationships
 
 from .models import Forum, Thread, Post, Comment, Like, Report
+from .counters import set_comments_hidden, set_posts_hidden, set_threads_hidden
+from .reports import load_report_targets, reported_target
 
 # --- Inlines (Optional, but can be useful) ---
 
@@ -156,9 +160,9 @@ class ThreadAdmin(admin.ModelAdmin):
     close_threads.short_description = _("Close selected threads")
     def open_threads(self, request, queryset): queryset.update(is_closed=False, updated_at=timezone.now())
     open_threads.short_description = _("Open selected threads")
-    def hide_threads(self, request, queryset): queryset.update(is_hidden=True, updated_at=timezone.now())
+    def hide_threads(self, request, queryset): set_threads_hidden(queryset, True)
     hide_threads.short_description = _("Hide selected threads")
-    def unhide_threads(self, request, queryset): queryset.update(is_hidden=False, updated_at=timezone.now())
+    def unhide_threads(self, request, queryset): set_threads_hidden(queryset, False)
     unhide_threads.short_description = _("Unhide selected threads")
 
 
@@ -191,9 +195,9 @@ class PostAdmin(admin.ModelAdmin):
     author_link.short_description = _('Author')
     author_link.admin_order_field = 'author__email'
 
-    def hide_posts(self, request, queryset): queryset.update(is_hidden=True, updated_at=timezone.now())
+    def hide_posts(self, request, queryset): set_posts_hidden(queryset, True)
     hide_posts.short_description = _("Hide selected posts")
-    def unhide_posts(self, request, queryset): queryset.update(is_hidden=False, updated_at=timezone.now())
+    def unhide_posts(self, request, queryset): set_posts_hidden(queryset, False)
     unhide_posts.short_description = _("Unhide selected posts")
 
 
@@ -228,9 +232,9 @@ class CommentAdmin(admin.ModelAdmin):
     author_link.short_description = _('Author')
     author_link.admin_order_field = 'author__email'
 
-    def hide_comments(self, request, queryset): queryset.update(is_hidden=True, updated_at=timezone.now())
+    def hide_comments(self, request, queryset): set_comments_hidden(queryset, True)
     hide_comments.short_description = _("Hide selected comments")
-    def unhide_comments(self, request, queryset): queryset.update(is_hidden=False, updated_at=timezone.now())
+    def unhide_comments(self, request, queryset): set_comments_hidden(queryset, False)
     unhide_comments.short_description = _("Unhide selected comments")
 
 
@@ -267,6 +271,13 @@ class LikeAdmin(admin.ModelAdmin):
     object_id_display.short_description = _('Object ID')
 
 
+class ReportChangeList(ChangeList):
+    """Loads the reported objects of a changelist page grouped by content type."""
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_list = load_report_targets(self.result_list)
+
+
 @admin.register(Report)
 class ReportAdmin(admin.ModelAdmin):
     list_display = ('reported_object_display', 'reporter_link', 'reason_summary', 'status', 'resolved_by_link', 'created_at', 'updated_at')
@@ -282,15 +293,19 @@ class ReportAdmin(admin.ModelAdmin):
     actions = ['resolve_reports_action_taken', 'resolve_reports_no_action', 'dismiss_reports']
     autocomplete_fields = ['reporter', 'resolved_by'] # For easier selection
 
+    def get_changelist(self, request, **kwargs):
+        return ReportChangeList
+
     def reported_object_link(self, obj):
-        if obj.reported_object:
+        target = reported_target(obj)
+        if target:
             try:
                 app_label = obj.content_type.app_label
                 model_name = obj.content_type.model
-                admin_url = reverse(f"admin:{app_label}_{model_name}_change", args=[obj.reported_object.pk])
-                return format_html('<a href="{}">View {} ({})</a>', admin_url, model_name.capitalize(), str(obj.reported_object))
+                admin_url = reverse(f"admin:{app_label}_{model_name}_change", args=[target.pk])
+                return format_html('<a href="{}">View {} ({})</a>', admin_url, model_name.capitalize(), str(target))
             except Exception:
-                return f"{obj.content_type.model.capitalize()}: {str(obj.reported_object)}"
+                return f"{obj.content_type.model.capitalize()}: {str(target)}"
         return _("N/A (Object might be deleted)")
     reported_object_link.short_description = _('Reported Content')
     
@@ -304,8 +319,9 @@ class ReportAdmin(admin.ModelAdmin):
 
 
     def reported_object_display(self, obj):
-        if obj.reported_object:
-            return f"{obj.content_type.model.capitalize()}: {str(obj.reported_object)[:50]}..."
+        target = reported_target(obj)
+        if target:
+            return f"{obj.content_type.model.capitalize()}: {str(target)[:50]}..."
         return _("N/A")
     reported_object_display.short_description = _('Reported Content')
 
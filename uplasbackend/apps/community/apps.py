@@ -1,7 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 from django.utils.translation import gettext_lazy as _
 
 
+def create_search_index(sender, using, **kwargs):
+    # The app has no migrations; its full-text index is created after every migrate
+    from django.db import connections
+    from .search import ensure_search_index
+    ensure_search_index(connections[using])
+
+
+def create_model_indexes(sender, using, **kwargs):
+    # Nor do Meta.indexes added later reach existing tables without this
+    from django.db import connections
+    from apps.core.schema import ensure_model_indexes
+    ensure_model_indexes(sender.get_models(), connections[using])
+
+
 class CommunityConfig(AppConfig):
     """
     Application configuration for the 'community' app.
@@ -26,5 +41,7 @@ class CommunityConfig(AppConfig):
             # import apps.community.signals
         except ImportError:
             pass
+        post_migrate.connect(create_search_index, sender=self)
+        post_migrate.connect(create_model_indexes, sender=self)
 
 
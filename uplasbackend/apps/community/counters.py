@@ -0,0 +1,165 @@
+# apps/community/counters.py
+"""
+Denormalized forum counters.
+
+`Thread.reply_count` counts a thread's visible posts. `Forum.thread_count`
+counts a forum's visible threads. `Forum.post_count` counts the visible
+threads plus the visible posts in them. The signals in models.py apply each
+save, delete, hide or unhide as a delta in one UPDATE per counter row and
+never re-aggregate. Bulk moderation goes through `set_threads_hidden` and
+`set_posts_hidden`, which merge the deltas and write one UPDATE per forum,
+and `set_comments_hidden`. All three keep the search entries' visibility in
+step (see search.py).
+`reconcile_counters` recomputes everything from scratch with grouped
+queries. The `reconcile_community_counters` command exposes it.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .live import publish_posts_hidden
+from .models import Comment, Forum, Post, SearchEntry, Thread
+
+
+def apply_thread_delta(thread_id, replies=0, touch=False):
+    """Adds `replies` to a thread's reply count; `touch` also bumps its last activity."""
+    changes = {}
+    if replies:
+        changes['reply_count'] = Greatest(F('reply_count') + replies, 0)
+    if touch:
+        changes['last_activity_at'] = timezone.now()
+    if thread_id and changes:
+        Thread.objects.filter(pk=thread_id).update(**changes)
+
+
+def apply_forum_delta(forum_id, threads=0, posts=0):
+    changes = {}
+    if threads:
+        changes['thread_count'] = Greatest(F('thread_count') + threads, 0)
+    if posts:
+        changes['post_count'] = Greatest(F('post_count') + posts, 0)
+    if forum_id and changes:
+        Forum.objects.filter(pk=forum_id).update(**changes)
+
+
+def apply_forum_deltas(deltas):
+    """Applies {forum_id: (thread delta, post delta)} with one UPDATE per forum."""
+    for forum_id, (threads, posts) in deltas.items():
+        apply_forum_delta(forum_id, threads, posts)
+
+
+def apply_visible_post_delta(thread_id, delta):
+    """Adds `delta` posts to the forum of a thread, if the thread is visible (one UPDATE, no read)."""
+    if thread_id and delta:
+        Forum.objects.filter(threads__pk=thread_id, threads__is_hidden=False).update(
+            post_count=Greatest(F('post_count') + delta, 0)
+        )
+
+
+def apply_thread_visibility(thread_id, forum_id, sign):
+    """Adds (`sign` = 1) or removes (-1) a thread and its visible replies from a forum's counts."""
+    if not (thread_id and forum_id):
+        return
+    replies = Subquery(Thread.objects.filter(pk=thread_id).values('reply_count')[:1])
+    Forum.objects.filter(pk=forum_id).update(
+        thread_count=Greatest(F('thread_count') + sign, 0),
+        post_count=Greatest(F('post_count') + sign * (replies + 1), 0),
+    )
+
+
+def set_threads_hidden(queryset, hidden):
+    """Hides or unhides the threads of `queryset` and moves their counts accordingly. Returns the number changed."""
+    sign = -1 if hidden else 1
+    with transaction.atomic():
+        changed = list(
+            queryset.exclude(is_hidden=hidden).select_for_update().order_by()
+            .values_list('pk', 'forum_id', 'reply_count')
+        )
+        if not changed:
+            return 0
+        thread_ids = [pk for pk, _forum, _replies in changed]
+        Thread.objects.filter(pk__in=thread_ids).update(is_hidden=hidden, updated_at=timezone.now())
+        SearchEntry.objects.filter(kind='thread', object_id__in=thread_ids).update(is_hidden=hidden)
+        deltas = defaultdict(lambda: (0, 0))
+        for _pk, forum_id, replies in changed:
+            threads, posts = deltas[forum_id]
+            deltas[forum_id] = (threads + sign, posts + sign * (replies + 1))
+        apply_forum_deltas(deltas)
+    return len(changed)
+
+
+def set_posts_hidden(queryset, hidden):
+    """Hides or unhides the posts of `queryset` and moves their counts accordingly. Returns the number changed."""
+    sign = -1 if hidden else 1
+    with transaction.atomic():
+        changed = list(
+            queryset.exclude(is_hidden=hidden).select_for_update().order_by()
+            .values_list('pk', 'thread_id', 'thread__forum_id', 'thread__is_hidden')
+        )
+        if not changed:
+            return 0
+        post_ids = [row[0] for row in changed]
+        Post.objects.filter(pk__in=post_ids).update(is_hidden=hidden, updated_at=timezone.now())
+        SearchEntry.objects.filter(kind='post', object_id__in=post_ids).update(is_hidden=hidden)
+        publish_posts_hidden([(pk, thread_id) for pk, thread_id, _forum, _hidden in changed], hidden)
+        per_thread = defaultdict(int)
+        forum_deltas = defaultdict(lambda: (0, 0))
+        for _pk, thread_id, forum_id, thread_hidden in changed:
+            per_thread[thread_id] += sign
+            if not thread_hidden:
+                forum_deltas[forum_id] = (0, forum_deltas[forum_id][1] + sign)
+        # Threads that gain or lose the same number of replies share one UPDATE
+        by_delta = defaultdict(list)
+        for thread_id, delta in per_thread.items():
+            by_delta[delta].append(thread_id)
+        for delta, thread_ids in by_delta.items():
+            Thread.objects.filter(pk__in=thread_ids).update(reply_count=Greatest(F('reply_count') + delta, 0))
+        apply_forum_deltas(forum_deltas)
+    return len(changed)
+
+
+def set_comments_hidden(queryset, hidden):
+    """Hides or unhides the comments of `queryset` (no counters, just their search entries). Returns the number changed."""
+    with transaction.atomic():
+        comment_ids = list(queryset.exclude(is_hidden=hidden).select_for_update().order_by().values_list('pk', flat=True))
+        if not comment_ids:
+            return 0
+        Comment.objects.filter(pk__in=comment_ids).update(is_hidden=hidden, updated_at=timezone.now())
+        SearchEntry.objects.filter(kind='comment', object_id__in=comment_ids).update(is_hidden=hidden)
+    return len(comment_ids)
+
+
+def reconcile_counters(batch_size=500):
+    """
+    Recomputes every thread's reply count and every forum's thread and post
+    counts from the source tables with grouped queries, writing only rows
+    that drifted. Returns (threads fixed, forums fixed).
+    """
+    replies = dict(
+        Post.objects.filter(is_hidden=False).values('thread_id').annotate(count=Count('id')).order_by()
+        .values_list('thread_id', 'count')
+    )
+    threads_fixed = []
+    for thread in Thread.objects.only('id', 'reply_count').iterator(chunk_size=batch_size):
+        actual = replies.get(thread.id, 0)
+        if thread.reply_count != actual:
+            thread.reply_count = actual
+            threads_fixed.append(thread)
+    Thread.objects.bulk_update(threads_fixed, ['reply_count'], batch_size=batch_size)
+
+    visible = Thread.objects.filter(forum=OuterRef('pk'), is_hidden=False).order_by().values('forum')
+    forums = Forum.objects.annotate(
+        actual_threads=Coalesce(Subquery(visible.annotate(count=Count('id')).values('count')), 0),
+        actual_replies=Coalesce(Subquery(visible.annotate(total=Sum('reply_count')).values('total')), 0),
+    )
+    forums_fixed = []
+    for forum in forums.only('id', 'thread_count', 'post_count'):
+        actual_posts = forum.actual_threads + forum.actual_replies
+        if (forum.thread_count, forum.post_count) != (forum.actual_threads, actual_posts):
+            forum.thread_count, forum.post_count = forum.actual_threads, actual_posts
+            forums_fixed.append(forum)
+    Forum.objects.bulk_update(forums_fixed, ['thread_count', 'post_count'], batch_size=batch_size)
+    return len(threads_fixed), len(forums_fixed)
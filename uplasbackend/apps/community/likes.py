@@ -0,0 +1,121 @@
+# apps/community/likes.py
+"""
+Likes of community and blog content.
+
+Liking is `Like.objects.get_or_create` on the (user, content_type,
+object_id) unique index, and unliking is a delete. The Like signals in
+models.py move the target's `like_count` by +1/-1 with an F() expression.
+Likes never recount, and they do not read the target row first. Likeable
+types are resolved by name through LIKEABLE_MODELS and Django's in-process
+ContentType cache, so they cost no query.
+
+List and detail querysets are annotated with `liked_by_user` through an
+EXISTS subquery on the same index, so a page costs no extra queries however
+many rows it has. `liked_object_ids` answers the liked state of an arbitrary
+page of objects with one query.
+"""
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import BooleanField, Count, Exists, F, OuterRef, Value
+from django.db.models.functions import Greatest
+
+from .models import Like
+
+LIKED_ANNOTATION = 'liked_by_user'
+
+# content_type_model accepted by the like endpoints -> model label
+LIKEABLE_MODELS = {
+    'thread': 'community.Thread',
+    'post': 'community.Post',
+    'comment': 'community.Comment',
+    'blogpost': 'blog.BlogPost',
+    'blogcomment': 'blog.BlogComment',
+}
+
+
+class LikeError(ValueError):
+    """Raised for content types that cannot be liked."""
+
+
+def likeable_model(name):
+    """The model liked under `name` (e.g. 'thread', 'blogpost')."""
+    label = LIKEABLE_MODELS.get((name or '').lower())
+    if label is None:
+        raise LikeError(f"Liking is not supported for '{name}'. Allowed: {', '.join(LIKEABLE_MODELS)}.")
+    return apps.get_model(label)
+
+
+def like(user, obj):
+    """Likes `obj` as `user`. Returns False if it was already liked."""
+    content_type = ContentType.objects.get_for_model(obj)
+    _like, created = Like.objects.get_or_create(user=user, content_type=content_type, object_id=obj.pk)
+    return created
+
+
+def unlike(user, obj):
+    """Removes the like of `user` from `obj`. Returns False if there was none."""
+    content_type = ContentType.objects.get_for_model(obj)
+    deleted, _rows = Like.objects.filter(user=user, content_type=content_type, object_id=obj.pk).delete()
+    return deleted > 0
+
+
+def apply_like_delta(content_type_id, object_id, delta):
+    """Adds `delta` to the like count of the target, in one UPDATE (no-op for models without one)."""
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is None or not any(field.name == 'like_count' for field in model._meta.concrete_fields):
+        return
+    model._default_manager.filter(pk=object_id).update(like_count=Greatest(F('like_count') + delta, 0))
+
+
+def liked_object_ids(user, model, object_ids):
+    """The subset of `object_ids` (of `model`) liked by `user`, with one query."""
+    if not (user and user.is_authenticated) or not object_ids:
+        return set()
+    content_type = ContentType.objects.get_for_model(model)
+    return set(
+        Like.objects.filter(user=user, content_type=content_type, object_id__in=object_ids)
+        .values_list('object_id', flat=True)
+    )
+
+
+def reconcile_like_counts(batch_size=500):
+    """Recomputes `like_count` of every likeable object from the Like rows, writing only drifted rows."""
+    fixed = 0
+    for label in LIKEABLE_MODELS.values():
+        model = apps.get_model(label)
+        content_type = ContentType.objects.get_for_model(model)
+        counts = dict(
+            Like.objects.filter(content_type=content_type).values('object_id').annotate(count=Count('id'))
+            .order_by().values_list('object_id', 'count')
+        )
+        drifted = []
+        for obj in model._default_manager.only('pk', 'like_count').iterator(chunk_size=batch_size):
+            actual = counts.get(obj.pk, 0)
+            if obj.like_count != actual:
+                obj.like_count = actual
+                drifted.append(obj)
+        model._default_manager.bulk_update(drifted, ['like_count'], batch_size=batch_size)
+        fixed += len(drifted)
+    return fixed
+
+
+def liked_subquery(model, user):
+    content_type = ContentType.objects.get_for_model(model)
+    return Exists(Like.objects.filter(user=user, content_type=content_type, object_id=OuterRef('pk')))
+
+
+def annotate_liked(queryset, user):
+    """Annotates each row with whether `user` likes it (always False for anonymous users)."""
+    if not (user and user.is_authenticated):
+        return queryset.annotate(**{LIKED_ANNOTATION: Value(False, output_field=BooleanField())})
+    return queryset.annotate(**{LIKED_ANNOTATION: liked_subquery(queryset.model, user)})
+
+
+def is_liked(obj, user):
+    """Liked state of one object: the annotation when present, else one EXISTS query."""
+    if not (user and user.is_authenticated):
+        return False
+    if hasattr(obj, LIKED_ANNOTATION):
+        return getattr(obj, LIKED_ANNOTATION)
+    content_type = ContentType.objects.get_for_model(obj)
+    return Like.objects.filter(user=user, content_type=content_type, object_id=obj.pk).exists()
@@ -0,0 +1,259 @@
+# apps/community/live.py
+"""
+Live thread updates pushed to open thread pages over Server-Sent Events.
+
+The save paths in models.py, and bulk hides in counters.py, publish an event
+once their transaction commits.
+Events cover new posts, edits, hides and deletes, and like-count changes on
+a thread and its posts. Each goes to the thread's channel. The
+`thread_event_stream` view (an async Django view) relays the channel to
+EventSource clients, replacing polling. It needs an ASGI server; the WSGI
+deployment answers 501 so clients stay on polling.
+
+The broadcast backend is chosen by the COMMUNITY_LIVE_BACKEND setting (a
+dotted path). The default, InProcessBroadcast, only reaches clients
+connected to the same process and keeps its replay history there, so it is
+only correct with a single server process. Deployments running more than
+one worker process must configure a shared (Redis-style) backend, which
+provides the same methods:
+
+    publish(channel, event, data)               # from sync code, any thread
+    subscribe(channel, last_event_id=None)      # -> subscription with
+        await subscription.next(timeout)        #    message dict or None on timeout,
+        subscription.close()                    #    raising SubscriptionClosed if it fell behind
+    is_listened(channel), has_listeners()       # False lets the save paths skip the event
+
+InProcessBroadcast only publishes to, and keeps history for, channels with a
+subscriber (or one that left within `history_grace_seconds`, so reconnects
+replay what they missed). Under WSGI nobody can subscribe, so the save paths
+build no payloads, run no extra queries and nothing is kept in memory.
+
+Messages are {'id': int, 'event': str, 'data': dict}. Ids increase per
+backend, so a reconnecting client's Last-Event-ID replays what it missed from
+the backend's short history.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import Post, Thread
+
+DEFAULT_BACKEND = 'apps.community.live.InProcessBroadcast'
+LIVE_HEARTBEAT_SECONDS = getattr(settings, 'COMMUNITY_LIVE_HEARTBEAT_SECONDS', 15)
+LIVE_MAX_STREAM_SECONDS = getattr(settings, 'COMMUNITY_LIVE_MAX_STREAM_SECONDS', 300)  # Clients reconnect after this
+LIVE_RETRY_MILLISECONDS = 3000
+
+
+class SubscriptionClosed(Exception):
+    """The subscriber fell too far behind and was dropped; it should reconnect with its Last-Event-ID."""
+
+
+class _Subscription:
+    def __init__(self, backend, channel, loop, queue_size):
+        self.backend = backend
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def deliver(self, message):
+        """Hands a message over from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:  # Event loop already closed
+            self.close()
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def next(self, timeout):
+        if self.overflowed:
+            raise SubscriptionClosed()
+        try:
+            return self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            if self.overflowed:
+                raise SubscriptionClosed()
+            return None
+
+    def close(self):
+        self.backend._unsubscribe(self)
+
+
+class InProcessBroadcast:
+    """
+    Fans events out to the subscribers of this process, keeping a short replay
+    history per listened channel.
+    """
+    history_size = 100
+    max_channels_with_history = 1000
+    history_grace_seconds = 60  # How long a channel's history outlives its last subscriber
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._subscribers = {}  # channel -> set of subscriptions
+        self._idle_since = {}  # channel -> time its last subscriber left
+        self._history = OrderedDict()  # channel -> deque of recent messages, least recently published first
+
+    def _is_listened(self, channel):
+        if channel in self._subscribers:
+            return True
+        idle_since = self._idle_since.get(channel)
+        if idle_since is not None and time.monotonic() - idle_since < self.history_grace_seconds:
+            return True
+        self._idle_since.pop(channel, None)
+        self._history.pop(channel, None)
+        return False
+
+    def is_listened(self, channel):
+        with self._lock:
+            return self._is_listened(channel)
+
+    def has_listeners(self):
+        with self._lock:
+            return bool(self._subscribers) or any(self._is_listened(channel) for channel in list(self._idle_since))
+
+    def publish(self, channel, event, data):
+        """Sends an event to the channel's subscribers; returns the message, or None if nobody listens."""
+        with self._lock:
+            if not self._is_listened(channel):
+                return None
+            message = {'id': next(self._sequence), 'event': event, 'data': data}
+            history = self._history.pop(channel, None) or deque(maxlen=self.history_size)
+            history.append(message)
+            self._history[channel] = history
+            if len(self._history) > self.max_channels_with_history:
+                self._history.popitem(last=False)
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+        return message
+
+    def subscribe(self, channel, last_event_id=None):
+        subscription = _Subscription(self, channel, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+            self._idle_since.pop(channel, None)
+            if last_event_id is not None:
+                for message in self._history.get(channel, ()):
+                    if message['id'] > last_event_id:
+                        subscription._put(message)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+                    self._idle_since[subscription.channel] = time.monotonic()
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    path = getattr(settings, 'COMMUNITY_LIVE_BACKEND', DEFAULT_BACKEND)
+    if _backend is None or _backend[0] != path:
+        _backend = (path, import_string(path)())
+    return _backend[1]
+
+
+def thread_channel(thread_id):
+    return f"community:thread:{thread_id}"
+
+
+def is_thread_listened(thread_id):
+    """Whether events of the thread can reach anyone; the save paths build none otherwise."""
+    return bool(thread_id) and get_backend().is_listened(thread_channel(thread_id))
+
+
+def publish_thread_event(thread_id, event, data):
+    """Publishes `event` to the thread's subscribers once the current transaction commits."""
+    if thread_id:
+        transaction.on_commit(lambda: get_backend().publish(thread_channel(thread_id), event, data))
+
+
+# --- Events published by the save paths (see the signals in models.py) ---
+
+def post_payload(post):
+    author = post.author if post.author_id else None
+    return {
+        'id': str(post.pk),
+        'thread': str(post.thread_id),
+        'author': {'id': str(author.pk), 'username': author.username} if author else None,
+        'content': post.content,
+        'like_count': post.like_count,
+        'created_at': post.created_at.isoformat() if post.created_at else None,
+        'updated_at': post.updated_at.isoformat() if post.updated_at else None,
+    }
+
+
+def publish_post_saved(post, created, was_hidden, update_fields=None):
+    """`was_hidden` is the stored visibility before the save (None if unknown or new)."""
+    if not is_thread_listened(post.thread_id):
+        return
+    if created:
+        if not post.is_hidden:
+            publish_thread_event(post.thread_id, 'post.created', post_payload(post))
+    elif was_hidden is not None and was_hidden != post.is_hidden:
+        if post.is_hidden:
+            publish_thread_event(post.thread_id, 'post.hidden', {'id': str(post.pk)})
+        else:
+            publish_thread_event(post.thread_id, 'post.unhidden', post_payload(post))
+    elif not post.is_hidden and (update_fields is None or 'content' in update_fields):
+        publish_thread_event(post.thread_id, 'post.updated', post_payload(post))
+
+
+def publish_posts_hidden(posts, hidden):
+    """Events of a bulk hide or unhide (counters.set_posts_hidden); `posts` are (pk, thread_id) pairs."""
+    posts = [(pk, thread_id) for pk, thread_id in posts if is_thread_listened(thread_id)]
+    if not posts:
+        return
+    if hidden:
+        for pk, thread_id in posts:
+            publish_thread_event(thread_id, 'post.hidden', {'id': str(pk)})
+    else:
+        for post in Post.objects.select_related('author').filter(pk__in=[pk for pk, _thread_id in posts]):
+            publish_thread_event(post.thread_id, 'post.unhidden', post_payload(post))
+
+
+def publish_post_deleted(post):
+    if not post.is_hidden and is_thread_listened(post.thread_id):
+        publish_thread_event(post.thread_id, 'post.deleted', {'id': str(post.pk)})
+
+
+def publish_like_change(content_type_id, object_id, delta):
+    """Like-count changes of threads and posts, as deltas (the new count is not read back)."""
+    if not get_backend().has_listeners():
+        return
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is Thread:
+        thread_id = object_id
+    elif model is Post:
+        thread_id = Post.objects.filter(pk=object_id).values_list('thread_id', flat=True).first()
+    else:
+        return
+    if not is_thread_listened(thread_id):
+        return
+    publish_thread_event(thread_id, 'like.changed', {
+        'type': model._meta.model_name, 'id': str(object_id), 'delta': delta,
+    })
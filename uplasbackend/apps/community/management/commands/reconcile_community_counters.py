@@ -0,0 +1,19 @@
+# apps/community/management/commands/reconcile_community_counters.py
+from django.core.management.base import BaseCommand
+
+from apps.community.counters import reconcile_counters
+from apps.community.likes import reconcile_like_counts
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized thread reply counts, forum thread/post counts and like counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        threads, forums = reconcile_counters(batch_size=options['batch_size'])
+        liked = reconcile_like_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Corrected {threads} thread(s), {forums} forum(s) and {liked} like count(s)."
+        ))
@@ -0,0 +1,17 @@
+# apps/community/management/commands/reindex_community_search.py
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.community.search import ensure_search_index, reindex
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the community search entries of all threads, posts and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        ensure_search_index(connection)
+        written = reindex(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {written} thread(s), post(s) and comment(s)."))
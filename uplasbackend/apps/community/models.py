@@ -1,10 +1,13 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
+from apps.core.models import CounterFieldsMixin
+
 # Assuming you might want to link community content to courses or projects
 # from apps.courses.models import Course # Example
 # from apps.projects.models import Project # Example
@@ -17,7 +20,7 @@ REPORT_STATUS_CHOICES = [
     ('dismissed', _('Dismissed as Invalid')),
 ]
 
-class Forum(models.Model):
+class Forum(CounterFieldsMixin, models.Model):
     """
     Represents a forum or a main discussion category.
     e.g., "General Discussion", "Python Help", "Project Showcases"
@@ -32,6 +35,7 @@ class Forum(models.Model):
     # Denormalized counts (updated by signals)
     thread_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Thread Count'))
     post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Post Count')) # Total posts in all threads
+    counter_fields = ('thread_count', 'post_count')
 
     # Moderation settings for this forum
     is_moderated = models.BooleanField(default=True, verbose_name=_('Is Moderated'))
@@ -48,7 +52,7 @@ class Forum(models.Model):
     def __str__(self):
         return self.name
 
-class Thread(models.Model):
+class Thread(CounterFieldsMixin, models.Model):
     """
     Represents a discussion thread within a Forum.
     Started by a user with an initial post (which is the thread's content itself).
@@ -72,6 +76,7 @@ class Thread(models.Model):
     reply_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Reply Count')) # Number of posts excluding the initial one
     view_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('View Count'))
     like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Like Count (for thread itself)'))
+    counter_fields = ('reply_count', 'view_count', 'like_count')
     
     is_pinned = models.BooleanField(default=False, verbose_name=_('Is Pinned')) # Sticky thread
     is_closed = models.BooleanField(default=False, verbose_name=_('Is Closed')) # No more replies allowed
@@ -90,6 +95,13 @@ class Thread(models.Model):
         verbose_name = _('Thread')
         verbose_name_plural = _('Threads')
         ordering = ['-is_pinned', '-last_activity_at'] # Pinned threads first, then by recent activity
+        indexes = [
+            # Keyset pagination of thread lists (see apps.core.pagination)
+            models.Index(fields=['forum', '-is_pinned', '-last_activity_at', '-id'], name='community_thread_feed_idx'),
+            models.Index(fields=['-is_pinned', '-last_activity_at', '-id'], name='community_thread_all_feed_idx'),
+            # Unread/updated threads feed (see apps.community.unread)
+            models.Index(fields=['-last_activity_at', '-id'], name='community_thread_activity_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -100,7 +112,7 @@ class Thread(models.Model):
         super().save(*args, **kwargs)
 
 
-class Post(models.Model):
+class Post(CounterFieldsMixin, models.Model):
     """
     Represents a reply (post) within a Thread.
     The initial content of a thread is stored in Thread.content.
@@ -118,6 +130,7 @@ class Post(models.Model):
     
     # Denormalized counts (updated by signals)
     like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Like Count'))
+    counter_fields = ('like_count',)
     # comment_count = models.PositiveIntegerField(default=0, editable=False) # If posts can have direct comments
 
     is_hidden = models.BooleanField(default=False, verbose_name=_('Is Hidden by Moderator')) # Soft delete
@@ -132,12 +145,16 @@ class Post(models.Model):
         verbose_name = _('Post (Reply)')
         verbose_name_plural = _('Posts (Replies)')
         ordering = ['created_at'] # Chronological order within a thread
+        indexes = [
+            # Keyset pagination of a thread's replies
+            models.Index(fields=['thread', 'created_at', 'id'], name='community_post_feed_idx'),
+        ]
 
     def __str__(self):
         return f"Reply by {self.author.email if self.author else 'Anonymous'} in '{self.thread.title}' at {self.created_at.strftime('%Y-%m-%d %H:%M')}"
 
 
-class Comment(models.Model):
+class Comment(CounterFieldsMixin, models.Model):
     """
     Represents a comment on a Post (if allowing comments on replies).
     Or, could be used for comments on Blog posts or other content types using GenericForeignKey.
@@ -155,6 +172,7 @@ class Comment(models.Model):
     content = models.TextField(verbose_name=_('Comment Content'))
     is_hidden = models.BooleanField(default=False, verbose_name=_('Is Hidden by Moderator'))
     like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Like Count'))
+    counter_fields = ('like_count',)
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Updated At'))
@@ -170,7 +188,7 @@ class Comment(models.Model):
 
 class Like(models.Model):
     """
-    Represents a like on a Thread, Post, or Comment.
+    Represents a like on a Thread, Post, Comment, BlogPost or BlogComment.
     Uses a GenericForeignKey to point to the liked object.
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -244,53 +262,193 @@ class Report(models.Model):
         # or you might want to prevent duplicate active reports for the same object by the same user.
         # unique_together = [['reporter', 'content_type', 'object_id', 'status']] # If only one pending report per user/object
         ordering = ['-created_at']
+        indexes = [
+            # Grouping the moderation queue per reported object (see reports.group_reports_by_target)
+            models.Index(fields=['content_type', 'object_id', 'status'], name='community_report_target_idx'),
+        ]
 
     def __str__(self):
         return f"Report by {self.reporter.email if self.reporter else 'Anonymous'} on {self.content_type.model} {self.object_id} ({self.get_status_display()})"
 
 
+class ThreadReadMarker(models.Model):
+    """
+    When a user last read a thread. Written on visits only (one row per
+    user and thread); new activity is detected by comparing it with
+    Thread.last_activity_at (see apps/community/unread.py).
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='thread_read_markers')
+    thread = models.ForeignKey(Thread, on_delete=models.CASCADE, related_name='read_markers')
+    last_read_at = models.DateTimeField(verbose_name=_('Last Read At'))
+
+    class Meta:
+        verbose_name = _('Thread Read Marker')
+        verbose_name_plural = _('Thread Read Markers')
+        unique_together = [['user', 'thread']]
+
+    def __str__(self):
+        return f"{self.user_id} read {self.thread_id} at {self.last_read_at}"
+
+
+class ForumReadMarker(models.Model):
+    """
+    A per-forum high-water mark: everything in the forum active before
+    `read_until` counts as read for the user ("mark forum as read").
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='forum_read_markers')
+    forum = models.ForeignKey(Forum, on_delete=models.CASCADE, related_name='read_markers')
+    read_until = models.DateTimeField(verbose_name=_('Read Until'))
+
+    class Meta:
+        verbose_name = _('Forum Read Marker')
+        verbose_name_plural = _('Forum Read Markers')
+        unique_together = [['user', 'forum']]
+
+    def __str__(self):
+        return f"{self.user_id} read {self.forum_id} until {self.read_until}"
+
+
+SEARCH_ENTRY_KIND_CHOICES = [
+    ('thread', _('Thread')),
+    ('post', _('Post (Reply)')),
+    ('comment', _('Comment')),
+]
+
+class SearchEntry(models.Model):
+    """
+    The searchable text of one thread, post or comment, written by the save
+    signals below. The full-text index over these rows is maintained by the
+    database (see apps/community/search.py).
+    """
+    kind = models.CharField(max_length=10, choices=SEARCH_ENTRY_KIND_CHOICES, verbose_name=_('Kind'))
+    object_id = models.UUIDField(verbose_name=_('Object ID'))
+    thread = models.ForeignKey(Thread, on_delete=models.CASCADE, related_name='search_entries', verbose_name=_('Thread'))
+    # The post itself for post entries, the parent post for comment entries
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True, related_name='search_entries', verbose_name=_('Post'))
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name=_('Author'))
+    title = models.CharField(max_length=255, blank=True, verbose_name=_('Title'))
+    body = models.TextField(blank=True, verbose_name=_('Body'))
+    # The object's own moderation state; hidden parents are checked when searching
+    is_hidden = models.BooleanField(default=False, verbose_name=_('Is Hidden'))
+    created_at = models.DateTimeField(verbose_name=_('Created At'))
+
+    class Meta:
+        verbose_name = _('Search Entry')
+        verbose_name_plural = _('Search Entries')
+        unique_together = [['kind', 'object_id']]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
 # --- Signals for denormalization and activity updates ---
 
+# Counter deltas are applied by apps/community/counters.py; the pre_save
+# receivers remember the state a save moves away from.
+
+def _previous_state(model, instance, fields, update_fields):
+    """The stored values of `fields` before this save, or None for new rows and unrelated partial saves."""
+    if instance._state.adding:
+        return None
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return None
+    return model.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+@receiver(pre_save, sender=Thread)
+def remember_thread_visibility(sender, instance, update_fields=None, **kwargs):
+    instance._previous_visibility = _previous_state(Thread, instance, ['forum_id', 'is_hidden'], update_fields)
+
 @receiver(post_save, sender=Thread)
+def update_forum_counts_on_thread_save(sender, instance, created, **kwargs):
+    from .counters import apply_thread_visibility
+    if created:
+        if not instance.is_hidden:
+            apply_thread_visibility(instance.pk, instance.forum_id, 1)
+        return
+    previous = getattr(instance, '_previous_visibility', None)
+    if previous and previous != (instance.forum_id, instance.is_hidden):
+        previous_forum_id, was_hidden = previous
+        if not was_hidden:
+            apply_thread_visibility(instance.pk, previous_forum_id, -1)
+        if not instance.is_hidden:
+            apply_thread_visibility(instance.pk, instance.forum_id, 1)
+
 @receiver(post_delete, sender=Thread)
-def update_forum_thread_count(sender, instance, **kwargs):
-    forum = instance.forum
-    if forum: # Forum might be null if CASCADE on delete happened from Forum itself
-        forum.thread_count = Thread.objects.filter(forum=forum, is_hidden=False).count()
-        # Post count for forum is more complex, needs to sum posts from all its threads
-        # This might be better handled by a periodic task or more specific signals from Post.
-        forum.save(update_fields=['thread_count'])
+def update_forum_counts_on_thread_delete(sender, instance, **kwargs):
+    # The thread's posts were deleted first and have already removed themselves from the forum
+    from .counters import apply_forum_delta
+    if not instance.is_hidden:
+        apply_forum_delta(instance.forum_id, threads=-1, posts=-1)
+
+@receiver(pre_save, sender=Post)
+def remember_post_visibility(sender, instance, update_fields=None, **kwargs):
+    instance._previous_visibility = _previous_state(Post, instance, ['thread_id', 'is_hidden'], update_fields)
 
 @receiver(post_save, sender=Post)
+def update_counts_on_post_save(sender, instance, created, **kwargs):
+    from .counters import apply_thread_delta, apply_visible_post_delta
+    visible = 0 if instance.is_hidden else 1
+    previous = None if created else getattr(instance, '_previous_visibility', None)
+    if previous and previous[0] != instance.thread_id:
+        previous_thread_id, was_hidden = previous
+        if not was_hidden:
+            apply_thread_delta(previous_thread_id, replies=-1)
+            apply_visible_post_delta(previous_thread_id, -1)
+        delta = visible
+    elif previous:
+        delta = visible - (0 if previous[1] else 1)
+    else:
+        delta = visible if created else 0
+    apply_thread_delta(instance.thread_id, replies=delta, touch=True)
+    apply_visible_post_delta(instance.thread_id, delta)
+
+@receiver(post_delete, sender=Post)
+def update_counts_on_post_delete(sender, instance, **kwargs):
+    from .counters import apply_thread_delta, apply_visible_post_delta
+    delta = 0 if instance.is_hidden else -1
+    apply_thread_delta(instance.thread_id, replies=delta, touch=True)
+    apply_visible_post_delta(instance.thread_id, delta)
+
+# Live updates for open thread pages (apps/community/live.py), sent on commit
+@receiver(post_save, sender=Post)
+def publish_post_save(sender, instance, created, update_fields=None, **kwargs):
+    from .live import publish_post_saved
+    previous = None if created else getattr(instance, '_previous_visibility', None)
+    publish_post_saved(instance, created, previous[1] if previous else None, update_fields)
+
 @receiver(post_delete, sender=Post)
-def update_thread_reply_count_and_activity(sender, instance, **kwargs):
-    thread = instance.thread
-    if thread: # Thread might be null if CASCADE on delete happened from Thread itself
-        thread.reply_count = Post.objects.filter(thread=thread, is_hidden=False).count()
-        thread.last_activity_at = timezone.now() # Update on new post or post deletion (activity change)
-        thread.save(update_fields=['reply_count', 'last_activity_at'])
-        
-        # Update Forum's total post count (initial thread content + replies)
-        if thread.forum:
-            total_posts_in_forum = 0
-            for t in Thread.objects.filter(forum=thread.forum, is_hidden=False):
-                total_posts_in_forum += 1 # For the thread's initial content
-                total_posts_in_forum += t.posts.filter(is_hidden=False).count()
-            thread.forum.post_count = total_posts_in_forum
-            thread.forum.save(update_fields=['post_count'])
+def publish_post_delete(sender, instance, **kwargs):
+    from .live import publish_post_deleted
+    publish_post_deleted(instance)
+
+# Search entries (apps/community/search.py). Deleting a thread or post removes
+# its entries, and those of its posts and comments, by cascade.
+@receiver(post_save, sender=Thread)
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_search_entry(sender, instance, update_fields=None, **kwargs):
+    from .search import index_objects, needs_reindex
+    if needs_reindex(update_fields):
+        index_objects([instance])
+
+@receiver(post_delete, sender=Comment)
+def delete_comment_search_entry(sender, instance, **kwargs):
+    SearchEntry.objects.filter(kind='comment', object_id=instance.pk).delete()
 
 
 @receiver(post_save, sender=Like)
+def increment_like_count(sender, instance, created, **kwargs):
+    from .likes import apply_like_delta
+    from .live import publish_like_change
+    if created:
+        apply_like_delta(instance.content_type_id, instance.object_id, 1)
+        publish_like_change(instance.content_type_id, instance.object_id, 1)
+
 @receiver(post_delete, sender=Like)
-def update_like_count(sender, instance, **kwargs):
-    liked_object = instance.liked_object
-    if liked_object and hasattr(liked_object, 'like_count'):
-        # Ensure the liked_object is one of our models that has 'like_count'
-        if isinstance(liked_object, (Thread, Post, Comment)):
-            liked_object.like_count = Like.objects.filter(
-                content_type=instance.content_type,
-                object_id=instance.object_id
-            ).count()
-            liked_object.save(update_fields=['like_count'])
+def decrement_like_count(sender, instance, **kwargs):
+    from .likes import apply_like_delta
+    from .live import publish_like_change
+    apply_like_delta(instance.content_type_id, instance.object_id, -1)
+    publish_like_change(instance.content_type_id, instance.object_id, -1)
 
 # Consider signals for Comment count on Post if that's added.
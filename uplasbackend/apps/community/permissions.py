@@ -123,6 +123,10 @@ class CanInteractWithContent(BasePermission):
         if hasattr(obj, 'is_hidden') and obj.is_hidden:
             # Allow staff to interact with hidden content, but not regular users
             return request.user.is_staff
+
+        # Blog posts and comments (likeable through the same endpoints) must be public
+        if getattr(obj, 'is_publicly_visible', True) is False or getattr(obj, 'status', 'published') != 'published':
+            return request.user.is_staff
         
         # If it's a Post or Comment, also check if its parent Thread is hidden
         parent_thread = None
@@ -0,0 +1,87 @@
+# apps/community/reports.py
+"""
+Loading the reported content of the moderation queue.
+
+`Report.reported_object` is a GenericForeignKey, so resolving it row by row
+costs one query per report, and `prefetch_related` on it re-fetches
+content types and skips related authors. `load_report_targets` groups a page
+of reports by content type and fetches each target type with one `IN` query.
+Authors (and whatever the target's __str__ needs) are select-related. The
+targets are cached on the reports, where `reported_target` reads them.
+
+`group_reports_by_target` folds the reports of one target into a single
+queue row, so 200 reports on one spam post are one row to moderate.
+"""
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Max, Min, Q
+
+from .models import Report
+
+# Relations select-related with each target type (authors, plus what __str__ reads)
+TARGET_RELATED = {
+    'community.thread': ('author', 'forum'),
+    'community.post': ('author', 'thread'),
+    'community.comment': ('author', 'post'),
+}
+
+_LOADED_ATTR = '_reported_target_loaded'
+
+
+def load_targets(keys):
+    """
+    Fetches the objects of (content_type_id, object_id) pairs, one query per
+    content type. Returns {(content_type_id, object_id): object}; missing
+    objects (deleted content) are left out.
+    """
+    ids_by_type = defaultdict(set)
+    for content_type_id, object_id in keys:
+        ids_by_type[content_type_id].add(object_id)
+    targets = {}
+    for content_type_id, object_ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:  # Stale content type of a removed model
+            continue
+        related = TARGET_RELATED.get(model._meta.label_lower, ())
+        for obj in model._default_manager.select_related(*related).filter(pk__in=object_ids):
+            targets[(content_type_id, obj.pk)] = obj
+    return targets
+
+
+def load_report_targets(reports):
+    """Resolves `reported_object` for all `reports` at once. Returns the reports as a list."""
+    reports = list(reports)
+    targets = load_targets((report.content_type_id, report.object_id) for report in reports)
+    for report in reports:
+        target = targets.get((report.content_type_id, report.object_id))
+        if target is not None:
+            Report.reported_object.set_cached_value(report, target)
+        setattr(report, _LOADED_ATTR, True)
+    return reports
+
+
+def reported_target(report):
+    """The reported object (None if deleted), without a query once the report went through `load_report_targets`."""
+    if getattr(report, _LOADED_ATTR, False):
+        return Report.reported_object.get_cached_value(report, default=None)
+    return report.reported_object
+
+
+def group_reports_by_target(queryset):
+    """
+    One row per reported object of `queryset`: content_type_id, object_id,
+    report_count, pending_count, first_reported_at and last_reported_at,
+    most reported first.
+    """
+    return (
+        queryset.order_by()
+        .values('content_type_id', 'object_id')
+        .annotate(
+            report_count=Count('id'),
+            pending_count=Count('id', filter=Q(status='pending')),
+            first_reported_at=Min('created_at'),
+            last_reported_at=Max('created_at'),
+        )
+        .order_by('-report_count', '-last_reported_at', 'object_id')
+    )
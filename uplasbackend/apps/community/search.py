@@ -0,0 +1,242 @@
+# apps/community/search.py
+"""
+Ranked full-text search across threads, posts and comments.
+
+Every thread, post and comment has one SearchEntry row (thread title, and
+body text), written by the save signals in models.py, so hiding and
+unhiding keep it current. The full-text index over the entries is kept by
+the database, as for courses (see apps/courses/search.py):
+
+- PostgreSQL: a generated `search_document` tsvector column with a GIN index.
+- SQLite (local development): an FTS5 table `community_search_fts` kept in
+  sync by triggers on `community_searchentry`.
+
+The community app has no migrations, so `ensure_search_index` creates these
+after `migrate` (post_migrate, see apps.py) and is safe to run repeatedly.
+Other backends fall back to unranked `icontains` matching.
+
+Hits are visibility-filtered: the entry, its thread and, for posts and
+comments, its post must not be hidden. Each hit carries its thread (and
+forum) select-related, plus `search_rank` (higher is better) and
+`search_snippet`. Rows changed without signals (`queryset.update()`) are
+picked up by the `reindex_community_search` command.
+"""
+from django.db import connection as default_connection
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from apps.courses.search import POSTGRES_CONFIG, SNIPPET_START, SNIPPET_STOP, fts5_query
+
+from .models import Comment, Post, SearchEntry, Thread
+
+SEARCH_KINDS = ('thread', 'post', 'comment')
+
+# Fields of a thread, post or comment whose partial save changes its entry
+INDEXED_FIELDS = {'title', 'content', 'is_hidden', 'author', 'author_id', 'thread', 'thread_id', 'post', 'post_id'}
+ENTRY_UPDATE_FIELDS = ['thread', 'post', 'author', 'title', 'body', 'is_hidden']
+
+# FTS5 column weights, in table column order: title, body
+FTS5_WEIGHTS = '4.0, 1.0'
+
+POSTGRES_INDEX = [
+    f"""
+    ALTER TABLE community_searchentry ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{POSTGRES_CONFIG}'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{POSTGRES_CONFIG}'::regconfig, coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS community_searchentry_document_gin ON community_searchentry USING GIN (search_document)",
+]
+
+SQLITE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS community_search_fts USING fts5(
+        title, body, tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS community_search_fts_insert AFTER INSERT ON community_searchentry BEGIN
+        INSERT INTO community_search_fts (rowid, title, body) VALUES (NEW.id, NEW.title, NEW.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS community_search_fts_update AFTER UPDATE OF title, body ON community_searchentry BEGIN
+        DELETE FROM community_search_fts WHERE rowid = OLD.id;
+        INSERT INTO community_search_fts (rowid, title, body) VALUES (NEW.id, NEW.title, NEW.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS community_search_fts_delete AFTER DELETE ON community_searchentry BEGIN
+        DELETE FROM community_search_fts WHERE rowid = OLD.id;
+    END
+    """,
+]
+
+INDEX_STATEMENTS = {'postgresql': POSTGRES_INDEX, 'sqlite': SQLITE_INDEX}
+
+
+def ensure_search_index(connection=default_connection):
+    """Creates the database's full-text index over the search entries, if missing."""
+    statements = INDEX_STATEMENTS.get(connection.vendor)
+    if not statements or SearchEntry._meta.db_table not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+# --- Maintaining the entries ---
+
+def needs_reindex(update_fields):
+    """Whether a save with `update_fields` (None for a full save) can change the object's entry."""
+    return update_fields is None or bool(INDEXED_FIELDS & set(update_fields))
+
+
+def entry_for(obj):
+    """The unsaved SearchEntry of a thread, post or comment (comments read their post)."""
+    if isinstance(obj, Thread):
+        return SearchEntry(
+            kind='thread', object_id=obj.pk, thread_id=obj.pk, author_id=obj.author_id,
+            title=obj.title, body=obj.content, is_hidden=obj.is_hidden, created_at=obj.created_at,
+        )
+    if isinstance(obj, Post):
+        return SearchEntry(
+            kind='post', object_id=obj.pk, thread_id=obj.thread_id, post_id=obj.pk, author_id=obj.author_id,
+            body=obj.content, is_hidden=obj.is_hidden, created_at=obj.created_at,
+        )
+    if isinstance(obj, Comment):
+        return SearchEntry(
+            kind='comment', object_id=obj.pk, thread_id=obj.post.thread_id, post_id=obj.post_id,
+            author_id=obj.author_id, body=obj.content, is_hidden=obj.is_hidden, created_at=obj.created_at,
+        )
+    raise TypeError(f"{type(obj).__name__} is not searchable.")
+
+
+def index_objects(objects):
+    """Writes the entries of `objects` with one upsert."""
+    entries = [entry_for(obj) for obj in objects]
+    if entries:
+        SearchEntry.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=['kind', 'object_id'], update_fields=ENTRY_UPDATE_FIELDS,
+        )
+    return len(entries)
+
+
+def reindex(batch_size=500):
+    """
+    Rewrites the entries of all threads, posts and comments, streaming each
+    table with iterator() and upserting `batch_size` entries at a time.
+    Returns the number of entries written.
+    """
+    sources = (
+        Thread.objects.all(),
+        Post.objects.all(),
+        Comment.objects.select_related('post').only('id', 'post__thread', 'author', 'content', 'is_hidden', 'created_at'),
+    )
+    written = 0
+    for queryset in sources:
+        batch = []
+        for obj in queryset.order_by().iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                written += index_objects(batch)
+                batch = []
+        written += index_objects(batch)
+    return written
+
+
+# --- Searching ---
+
+def visible_entries(queryset):
+    return queryset.filter(is_hidden=False, thread__is_hidden=False).filter(
+        Q(post__isnull=True) | Q(post__is_hidden=False)
+    )
+
+
+class BaseCommunitySearchBackend:
+    vendor = None
+
+    def search(self, queryset, term):
+        raise NotImplementedError
+
+
+class PostgresCommunitySearchBackend(BaseCommunitySearchBackend):
+    vendor = 'postgresql'
+
+    def search(self, queryset, term):
+        tsquery = f"websearch_to_tsquery('{POSTGRES_CONFIG}', %s)"
+        return queryset.annotate(
+            search_match=RawSQL(f"community_searchentry.search_document @@ {tsquery}", [term], output_field=BooleanField()),
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(f"ts_rank(community_searchentry.search_document, {tsquery})", [term], output_field=FloatField()),
+            search_snippet=RawSQL(
+                f"ts_headline('{POSTGRES_CONFIG}', community_searchentry.body, "
+                f"{tsquery}, 'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=35, MinWords=15')",
+                [term], output_field=TextField(),
+            ),
+        ).order_by('-search_rank', '-created_at')
+
+
+class SQLiteCommunitySearchBackend(BaseCommunitySearchBackend):
+    vendor = 'sqlite'
+
+    def search(self, queryset, term):
+        match = fts5_query(term)
+        if match is None:
+            return queryset.none()
+        correlated = "FROM community_search_fts WHERE community_search_fts MATCH %s AND community_search_fts.rowid = community_searchentry.id"
+        return queryset.filter(
+            pk__in=RawSQL("SELECT rowid FROM community_search_fts WHERE community_search_fts MATCH %s", [match]),
+        ).annotate(
+            search_rank=RawSQL(f"SELECT -bm25(community_search_fts, {FTS5_WEIGHTS}) {correlated}", [match], output_field=FloatField()),
+            search_snippet=RawSQL(
+                f"SELECT snippet(community_search_fts, 1, '{SNIPPET_START}', '{SNIPPET_STOP}', '...', 16) {correlated}",
+                [match], output_field=TextField(),
+            ),
+        ).order_by('-search_rank', '-created_at')
+
+
+class FallbackCommunitySearchBackend(BaseCommunitySearchBackend):
+    """Unranked matching for databases without a full-text index."""
+
+    def search(self, queryset, term):
+        condition = Q()
+        for word in term.split():
+            condition &= Q(title__icontains=word) | Q(body__icontains=word)
+        return queryset.filter(condition).order_by('-created_at')
+
+
+SEARCH_BACKENDS = {
+    backend.vendor: backend for backend in (PostgresCommunitySearchBackend(), SQLiteCommunitySearchBackend())
+}
+
+
+def get_search_backend():
+    return SEARCH_BACKENDS.get(default_connection.vendor, FallbackCommunitySearchBackend())
+
+
+def search_community(term, kinds=None):
+    """Visible entries matching `term` (of the given kinds), best first, with their thread and forum attached."""
+    term = (term or '').strip()
+    queryset = SearchEntry.objects.select_related('thread', 'thread__forum', 'author')
+    if not term:
+        return queryset.none()
+    if kinds:
+        queryset = queryset.filter(kind__in=kinds)
+    return get_search_backend().search(visible_entries(queryset), term)
+
+
+class ThreadSearchFilter(BaseFilterBackend):
+    """
+    Restricts a Thread queryset to the threads whose own entry matches
+    ?search=, keeping the view's ordering (and so its keyset pagination).
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term:
+            return queryset
+        matches = get_search_backend().search(SearchEntry.objects.filter(kind='thread'), term)
+        return queryset.filter(pk__in=matches.order_by().values('object_id'))
@@ -1,10 +1,13 @@
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.utils.translation import gettext_lazy as _
-from django.utils.text import slugify
 from rest_framework import serializers
 
-from .models import Forum, Thread, Post, Comment, Like, Report, REPORT_STATUS_CHOICES
+from .models import Forum, Thread, Post, Comment, Like, Report, SearchEntry, REPORT_STATUS_CHOICES
+from apps.core.slugs import with_unique_slug
+
+from .likes import is_liked
+from .reports import reported_target
 
 User = get_user_model()
 
@@ -21,6 +24,22 @@ class SimpleUserSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class LikedStateMixin:
+    """
+    `is_liked_by_user` and `user_can_edit` for content rows. The liked state is
+    read from the `liked_by_user` annotation added by the viewsets (see
+    likes.annotate_liked); authorship is compared by ID so the author is not loaded.
+    """
+    def get_is_liked_by_user(self, obj):
+        return is_liked(obj, self.context.get('request').user)
+
+    def get_user_can_edit(self, obj):
+        user = self.context.get('request').user
+        if user and user.is_authenticated:
+            return obj.author_id == user.pk or user.is_staff
+        return False
+
+
 # --- Forum Serializers ---
 class ForumListSerializer(serializers.ModelSerializer):
     """
@@ -58,7 +77,7 @@ class ForumDetailSerializer(serializers.ModelSerializer):
 
 
 # --- Thread Serializers ---
-class ThreadListSerializer(serializers.ModelSerializer):
+class ThreadListSerializer(LikedStateMixin, serializers.ModelSerializer):
     """
     Serializer for listing Threads (summary view).
     """
@@ -78,20 +97,8 @@ class ThreadListSerializer(serializers.ModelSerializer):
             'is_liked_by_user', 'user_can_edit'
         ]
 
-    def get_is_liked_by_user(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            content_type = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(user=user, content_type=content_type, object_id=obj.id).exists()
-        return False
-
-    def get_user_can_edit(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            return obj.author == user or user.is_staff
-        return False
 
-class ThreadDetailSerializer(serializers.ModelSerializer):
+class ThreadDetailSerializer(LikedStateMixin, serializers.ModelSerializer):
     """
     Serializer for detailed view of a Thread.
     Includes initial content. Replies (Posts) are typically fetched via a separate paginated endpoint.
@@ -120,19 +127,6 @@ class ThreadDetailSerializer(serializers.ModelSerializer):
         # Fields for creation/update by user: title, content, (forum_id on create)
         # Fields for moderation: is_pinned, is_closed, is_hidden (by staff)
 
-    def get_is_liked_by_user(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            content_type = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(user=user, content_type=content_type, object_id=obj.id).exists()
-        return False
-
-    def get_user_can_edit(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            return obj.author == user or user.is_staff
-        return False
-
     def get_user_can_reply(self, obj):
         user = self.context.get('request').user
         if not user or not user.is_authenticated:
@@ -152,32 +146,24 @@ class ThreadDetailSerializer(serializers.ModelSerializer):
         # Author is set from request context in the view
         # Slug can be auto-generated if not provided
         if 'slug' not in validated_data or not validated_data['slug']:
-            base_slug = slugify(validated_data['title'])
-            slug = base_slug
-            counter = 1
-            while Thread.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            validated_data['slug'] = slug
+            create = super().create
+            return with_unique_slug(Thread, validated_data['title'], lambda slug: create({**validated_data, 'slug': slug}))
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
-        # Slug might need to be regenerated if title changes and slug is not provided
+        # Slug is regenerated if the title changes and no slug is provided
         if 'title' in validated_data and 'slug' not in validated_data:
             if validated_data['title'] != instance.title:
-                base_slug = slugify(validated_data['title'])
-                slug = base_slug
-                counter = 1
-                # Ensure uniqueness if auto-generating and title changed
-                while Thread.objects.filter(slug=slug).exclude(pk=instance.pk).exists():
-                    slug = f"{base_slug}-{counter}"
-                    counter += 1
-                validated_data['slug'] = slug
+                update = super().update
+                return with_unique_slug(
+                    Thread, validated_data['title'],
+                    lambda slug: update(instance, {**validated_data, 'slug': slug}), exclude_pk=instance.pk,
+                )
         return super().update(instance, validated_data)
 
 
 # --- Post (Reply) Serializers ---
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(LikedStateMixin, serializers.ModelSerializer):
     """
     Serializer for Posts (replies within a thread).
     """
@@ -206,19 +192,6 @@ class PostSerializer(serializers.ModelSerializer):
         # Fields for creation/update: content, (thread_id on create)
         # Field for moderation: is_hidden
 
-    def get_is_liked_by_user(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            content_type = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(user=user, content_type=content_type, object_id=obj.id).exists()
-        return False
-
-    def get_user_can_edit(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            return obj.author == user or user.is_staff
-        return False
-
     def validate_thread_id(self, value): # value is Thread instance
         if value.is_closed:
             raise serializers.ValidationError(_("Cannot post to a closed thread."))
@@ -233,7 +206,7 @@ class PostSerializer(serializers.ModelSerializer):
 
 
 # --- Comment Serializer (if used) ---
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(LikedStateMixin, serializers.ModelSerializer):
     author = SimpleUserSerializer(read_only=True)
     post_id = serializers.PrimaryKeyRelatedField(
         queryset=Post.objects.all(), source='post', write_only=True
@@ -253,19 +226,6 @@ class CommentSerializer(serializers.ModelSerializer):
             'is_liked_by_user', 'user_can_edit'
         ]
 
-    def get_is_liked_by_user(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            content_type = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(user=user, content_type=content_type, object_id=obj.id).exists()
-        return False
-
-    def get_user_can_edit(self, obj):
-        user = self.context.get('request').user
-        if user and user.is_authenticated:
-            return obj.author == user or user.is_staff
-        return False
-
     def validate_post_id(self, value): # value is Post instance
         if value.is_hidden and not (self.context['request'].user and self.context['request'].user.is_staff):
             raise serializers.ValidationError(_("Cannot comment on a hidden post."))
@@ -344,6 +304,21 @@ class LikeSerializer(serializers.ModelSerializer):
 
 
 # --- Report Serializer ---
+def reported_object_details(model_name, object_id, reported_object):
+    """A simple representation of reported content (title or snippet), None if it was deleted."""
+    if reported_object is None:
+        return None
+    details = {'type': model_name, 'id': str(object_id)}
+    if hasattr(reported_object, 'title'):
+        details['title'] = reported_object.title
+    elif hasattr(reported_object, 'content'):
+        content = reported_object.content
+        details['content_snippet'] = (content[:75] + '...') if len(content) > 75 else content
+    if getattr(reported_object, 'author_id', None):
+        details['author'] = SimpleUserSerializer(reported_object.author).data
+    return details
+
+
 class ReportSerializer(serializers.ModelSerializer):
     """
     Serializer for creating and viewing Reports.
@@ -374,15 +349,7 @@ class ReportSerializer(serializers.ModelSerializer):
         # Writable fields on update (by admin): status, moderator_notes
 
     def get_reported_object_details(self, obj):
-        if obj.reported_object:
-            # Provide a simple representation, e.g., title or snippet
-            if hasattr(obj.reported_object, 'title'):
-                return {'type': obj.content_type.model, 'id': str(obj.object_id), 'title': obj.reported_object.title}
-            if hasattr(obj.reported_object, 'content'):
-                content_snippet = (obj.reported_object.content[:75] + '...') if len(obj.reported_object.content) > 75 else obj.reported_object.content
-                return {'type': obj.content_type.model, 'id': str(obj.object_id), 'content_snippet': content_snippet}
-            return {'type': obj.content_type.model, 'id': str(obj.object_id)}
-        return None
+        return reported_object_details(obj.content_type.model, obj.object_id, reported_target(obj))
 
     def validate_content_type_model(self, value):
         value = value.lower()
@@ -440,3 +407,58 @@ class ReportSerializer(serializers.ModelSerializer):
         # instance.save()
         # return instance
         return super().update(instance, validated_data) # Default allows updating fields in serializer
+
+
+class ReportTargetGroupSerializer(serializers.Serializer):
+    """
+    One moderation queue row: a reported object with the number of reports on
+    it. Reads rows of reports.group_reports_by_target with the loaded `target`.
+    """
+    content_type_model = serializers.SerializerMethodField()
+    object_id = serializers.UUIDField()
+    report_count = serializers.IntegerField()
+    pending_count = serializers.IntegerField()
+    first_reported_at = serializers.DateTimeField()
+    last_reported_at = serializers.DateTimeField()
+    reported_object_details = serializers.SerializerMethodField()
+
+    def get_content_type_model(self, row):
+        return ContentType.objects.get_for_id(row['content_type_id']).model
+
+    def get_reported_object_details(self, row):
+        return reported_object_details(self.get_content_type_model(row), row['object_id'], row.get('target'))
+
+
+class SearchHitThreadSerializer(serializers.ModelSerializer):
+    forum_name = serializers.CharField(source='forum.name', read_only=True)
+    forum_slug = serializers.CharField(source='forum.slug', read_only=True)
+
+    class Meta:
+        model = Thread
+        fields = ['id', 'title', 'slug', 'forum_name', 'forum_slug']
+        read_only_fields = fields
+
+
+class SearchHitSerializer(serializers.ModelSerializer):
+    """
+    One community search hit (a SearchEntry from search.search_community):
+    the matching thread, post or comment with its thread attached.
+    """
+    type = serializers.CharField(source='kind', read_only=True)
+    id = serializers.UUIDField(source='object_id', read_only=True)
+    post_id = serializers.UUIDField(read_only=True, allow_null=True)
+    thread = SearchHitThreadSerializer(read_only=True)
+    author = SimpleUserSerializer(read_only=True, allow_null=True)
+    rank = serializers.SerializerMethodField()
+    snippet = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SearchEntry
+        fields = ['type', 'id', 'post_id', 'thread', 'author', 'title', 'snippet', 'rank', 'created_at']
+        read_only_fields = fields
+
+    def get_rank(self, obj):
+        return getattr(obj, 'search_rank', None)
+
+    def get_snippet(self, obj):
+        return getattr(obj, 'search_snippet', None)
@@ -1,14 +1,21 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.utils.text import slugify
 from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from io import StringIO
 
 from apps.community.models import (
-    Forum, Thread, Post, Comment, Like, Report,
+    Forum, Thread, Post, Comment, Like, Report, SearchEntry,
     REPORT_STATUS_CHOICES
 )
+from apps.community.counters import set_posts_hidden, set_threads_hidden
+from apps.community.likes import reconcile_like_counts
+from apps.core.schema import ensure_model_indexes
+from apps.core.slugs import unique_slug, unique_slugs, with_unique_slug
+from unittest import mock
 # Ensure settings are configured for tests, especially AUTH_USER_MODEL
 from django.conf import settings
 
@@ -229,6 +236,16 @@ class LikeModelTests(CommunityModelTestDataMixin, TestCase):
         self.thread1_user1.refresh_from_db()
         self.assertEqual(self.thread1_user1.like_count, likes_before_delete - 1)
 
+    def test_reconcile_like_counts_fixes_drift(self):
+        Like.objects.create(user=self.user2, content_type=self.thread_content_type, object_id=self.thread1_user1.id)
+        Thread.objects.filter(pk=self.thread1_user1.pk).update(like_count=7)
+        Post.objects.filter(pk=self.post_to_like.pk).update(like_count=2)
+        self.assertEqual(reconcile_like_counts(), 2)
+        self.thread1_user1.refresh_from_db()
+        self.post_to_like.refresh_from_db()
+        self.assertEqual((self.thread1_user1.like_count, self.post_to_like.like_count), (1, 0))
+        self.assertEqual(reconcile_like_counts(), 0)
+
 
 class ReportModelTests(CommunityModelTestDataMixin, TestCase):
     def setUp(self):
@@ -258,6 +275,167 @@ class ReportModelTests(CommunityModelTestDataMixin, TestCase):
         report.save()
         self.assertEqual(report.get_status_display(), 'Resolved - Action Taken')
 
+class CounterTests(CommunityModelTestDataMixin, TestCase):
+    def setUp(self):
+        self.posts = [Post.objects.create(thread=self.thread1_user1, author=self.user2, content=f"Reply {i}") for i in range(3)]
+
+    def assertCounts(self, replies, threads, posts):
+        self.thread1_user1.refresh_from_db()
+        self.forum_general.refresh_from_db()
+        self.assertEqual(self.thread1_user1.reply_count, replies)
+        self.assertEqual((self.forum_general.thread_count, self.forum_general.post_count), (threads, posts))
+
+    def test_post_save_uses_constant_queries(self):
+        for i in range(5):
+            Thread.objects.create(forum=self.forum_general, author=self.user1, title=f"T{i}", slug=f"t-{i}", content="c")
+        # Post insert, thread delta, forum delta, search entry upsert
+        with self.assertNumQueries(4):
+            Post.objects.create(thread=self.thread1_user1, author=self.user1, content="One more")
+
+    def test_hiding_and_unhiding_posts(self):
+        self.assertCounts(3, 1, 4)
+        self.posts[0].is_hidden = True
+        self.posts[0].save()
+        self.assertCounts(2, 1, 3)
+        self.posts[0].is_hidden = False
+        self.posts[0].save(update_fields=['is_hidden'])
+        self.assertCounts(3, 1, 4)
+        self.assertEqual(set_posts_hidden(Post.objects.filter(pk__in=[p.pk for p in self.posts[:2]]), True), 2)
+        self.assertCounts(1, 1, 2)
+        self.posts[2].delete()
+        self.assertCounts(0, 1, 1)
+
+    def test_hiding_a_thread_removes_its_replies_from_the_forum(self):
+        self.thread1_user1.is_hidden = True
+        self.thread1_user1.save()
+        self.assertCounts(3, 0, 0)
+        Post.objects.create(thread=self.thread1_user1, author=self.user1, content="In a hidden thread")
+        self.assertCounts(4, 0, 0)
+        set_threads_hidden(Thread.objects.filter(pk=self.thread1_user1.pk), False)
+        self.assertCounts(4, 1, 5)
+
+    def test_moving_a_thread_between_forums(self):
+        self.thread1_user1.forum = self.forum_python
+        self.thread1_user1.save()
+        self.forum_python.refresh_from_db()
+        self.assertCounts(3, 0, 0)
+        self.assertEqual((self.forum_python.thread_count, self.forum_python.post_count), (1, 4))
+
+    def test_reconcile_command_repairs_drift(self):
+        Thread.objects.filter(pk=self.thread1_user1.pk).update(reply_count=9)
+        Forum.objects.filter(pk=self.forum_general.pk).update(thread_count=0, post_count=42)
+        out = StringIO()
+        call_command('reconcile_community_counters', stdout=out)
+        self.assertIn("Corrected 1 thread(s), 1 forum(s) and 0 like count(s).", out.getvalue())
+        self.assertCounts(3, 1, 4)
+
+
+class SearchIndexTests(CommunityModelTestDataMixin, TestCase):
+    def _entry(self, obj):
+        return SearchEntry.objects.get(object_id=obj.pk)
+
+    def test_saves_write_entries(self):
+        post = Post.objects.create(thread=self.thread1_user1, author=self.user2, content="Decorators explained")
+        comment = Comment.objects.create(post=post, author=self.user1, content="Thanks!")
+        self.assertEqual((self._entry(post).kind, self._entry(post).thread_id), ('post', self.thread1_user1.pk))
+        self.assertEqual((self._entry(comment).post_id, self._entry(comment).thread_id), (post.pk, self.thread1_user1.pk))
+
+        self.thread1_user1.title = "Renamed thread"
+        self.thread1_user1.save()
+        self.assertEqual(self._entry(self.thread1_user1).title, "Renamed thread")
+        # Saves of unrelated fields leave the entry alone
+        with self.assertNumQueries(1):
+            self.thread1_user1.save(update_fields=['is_pinned'])
+
+    def test_hide_and_unhide_update_entries(self):
+        post = Post.objects.create(thread=self.thread1_user1, author=self.user2, content="Reply")
+        post.is_hidden = True
+        post.save(update_fields=['is_hidden', 'updated_at'])
+        self.assertTrue(self._entry(post).is_hidden)
+        set_posts_hidden(Post.objects.filter(pk=post.pk), False)
+        self.assertFalse(self._entry(post).is_hidden)
+        set_threads_hidden(Thread.objects.filter(pk=self.thread1_user1.pk), True)
+        self.assertTrue(self._entry(self.thread1_user1).is_hidden)
+
+    def test_deletes_remove_entries(self):
+        post = Post.objects.create(thread=self.thread1_user1, author=self.user2, content="Reply")
+        comment = Comment.objects.create(post=post, author=self.user1, content="Comment")
+        comment.delete()
+        self.assertFalse(SearchEntry.objects.filter(object_id=comment.pk).exists())
+        self.thread1_user1.delete()
+        self.assertFalse(SearchEntry.objects.filter(thread_id=self.thread1_user1.pk).exists())
+
+    def test_reindex_command_rebuilds_entries(self):
+        post = Post.objects.create(thread=self.thread1_user1, author=self.user2, content="Reply")
+        Comment.objects.create(post=post, author=self.user1, content="Comment")
+        Post.objects.filter(pk=post.pk).update(content="Edited without signals")
+        SearchEntry.objects.exclude(object_id=post.pk).delete()
+        out = StringIO()
+        call_command('reindex_community_search', batch_size=1, stdout=out)
+        total = Thread.objects.count() + Post.objects.count() + Comment.objects.count()
+        self.assertIn(f"Reindexed {total} thread(s), post(s) and comment(s).", out.getvalue())
+        self.assertEqual(SearchEntry.objects.count(), total)
+        self.assertEqual(self._entry(post).body, "Edited without signals")
+
+
+class SlugAllocationTests(CommunityModelTestDataMixin, TestCase):
+    def _thread(self, slug):
+        return Thread.objects.create(forum=self.forum_general, author=self.user1, title='Dup', slug=slug, content='c')
+
+    def test_next_free_suffix_found_with_one_query(self):
+        for slug in ['dup', 'dup-1', 'dup-2', 'dup-4', 'dup-extra']:
+            self._thread(slug)
+        with self.assertNumQueries(1):
+            self.assertEqual(unique_slug(Thread, 'Dup'), 'dup-3')
+        self.assertEqual(unique_slug(Thread, 'Fresh title'), 'fresh-title')
+
+    def test_batch_allocation_uses_one_query(self):
+        for slug in ['dup', 'dup-1', 'other']:
+            self._thread(slug)
+        with self.assertNumQueries(1):
+            allocated = unique_slugs(Thread, ['Dup', 'dup!', 'Other', 'Fresh title'])
+        self.assertEqual(allocated, {'Dup': 'dup-2', 'dup!': 'dup-3', 'Other': 'other-1', 'Fresh title': 'fresh-title'})
+
+    def test_excluded_row_keeps_its_slug(self):
+        thread = self._thread('dup')
+        self.assertEqual(unique_slug(Thread, 'Dup', exclude_pk=thread.pk), 'dup')
+
+    def test_suffix_fits_max_length(self):
+        long_title = 'x' * 300
+        self._thread('x' * 280)
+        slug = unique_slug(Thread, long_title)
+        self.assertEqual(len(slug), 280)
+        self.assertTrue(slug.endswith('-1'))
+
+    def test_write_retried_when_slug_taken_concurrently(self):
+        self._thread('dup')
+        write = lambda slug: self._thread(slug)
+        # The first allocation returns a slug another writer already took
+        with mock.patch('apps.core.slugs.unique_slug', side_effect=['dup', 'dup-1']):
+            thread = with_unique_slug(Thread, 'Dup', write)
+        self.assertEqual(thread.slug, 'dup-1')
+
+    def test_other_integrity_errors_propagate(self):
+        def write(slug):
+            raise IntegrityError('other constraint')
+        with self.assertRaises(IntegrityError):
+            with_unique_slug(Thread, 'Dup', write)
+
+
+
+class ModelIndexUpkeepTests(TransactionTestCase):  # Schema changes on SQLite need no open transaction
+    def _indexes(self, model):
+        with connection.cursor() as cursor:
+            return set(connection.introspection.get_constraints(cursor, model._meta.db_table))
+
+    def test_missing_meta_indexes_are_created(self):
+        with connection.schema_editor() as schema_editor:  # As on a database created before the index was added
+            schema_editor.remove_index(Post, Post._meta.indexes[0])
+        self.assertNotIn('community_post_feed_idx', self._indexes(Post))
+        self.assertEqual(ensure_model_indexes([Thread, Post]), ['community_post_feed_idx'])
+        self.assertIn('community_post_feed_idx', self._indexes(Post))
+        self.assertEqual(ensure_model_indexes([Thread, Post]), [])
+
 # Add more tests for:
 # - Edge cases for signals (e.g., deleting a Forum and checking if related Thread counts are handled gracefully or if errors occur).
 # - Behavior of is_hidden, is_closed, is_pinned on Threads and Posts and how they affect counts if signals consider them.
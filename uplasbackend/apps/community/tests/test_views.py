@@ -1,12 +1,26 @@
+import asyncio
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 from django.contrib.contenttypes.models import ContentType # For Like/Report tests
+from django.db import DatabaseError, connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
+from unittest import mock
+
+from apps.blog.models import BlogPost
+from apps.community.admin import CommentAdmin
+from apps.community.counters import set_posts_hidden
+from apps.community.live import SubscriptionClosed, get_backend, thread_channel
+from apps.core.view_counts import flush_view_counts
 
 from apps.community.models import (
     Forum, Thread, Post, Comment, Like, Report
@@ -348,6 +362,307 @@ class LikeToggleAPIViewTests(CommunityViewTestDataMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN) # CanInteractWithContent
 
 
+class LikeSubsystemTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.blog_post = BlogPost.objects.create(
+            author=self.user1, title='Likeable blog post', content_markdown='Body', status='published'
+        )
+        self.url = reverse('community:like-toggle')
+
+    def test_like_applies_delta_without_recount(self):
+        self.authenticate_client_with_jwt(self.user2)
+        data = {"content_type_model": "post", "object_id": str(self.post1_thread1_user2.id)}
+        ContentType.objects.get_for_model(Post)  # Warm the in-process cache, as in a running server
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        sql = ' '.join(query['sql'] for query in queries.captured_queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('DJANGO_CONTENT_TYPE', sql)
+        self.post1_thread1_user2.refresh_from_db()
+        self.assertEqual(self.post1_thread1_user2.like_count, 1)
+
+    def test_like_and_unlike_blog_post(self):
+        self.authenticate_client_with_jwt(self.user2)
+        data = {"content_type_model": "blogpost", "object_id": str(self.blog_post.id)}
+        self.assertEqual(self.client.post(self.url, data, format='json').status_code, status.HTTP_201_CREATED)
+        self.blog_post.refresh_from_db()
+        self.assertEqual(self.blog_post.like_count, 1)
+        self.assertEqual(self.client.delete(self.url, data, format='json').status_code, status.HTTP_200_OK)
+        self.blog_post.refresh_from_db()
+        self.assertEqual(self.blog_post.like_count, 0)
+
+    def test_unpublished_blog_post_cannot_be_liked(self):
+        self.blog_post.status = 'draft'
+        self.blog_post.save()
+        self.authenticate_client_with_jwt(self.user2)
+        data = {"content_type_model": "blogpost", "object_id": str(self.blog_post.id)}
+        self.assertEqual(self.client.post(self.url, data, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unsupported_type_rejected(self):
+        self.authenticate_client_with_jwt(self.user2)
+        data = {"content_type_model": "forum", "object_id": str(self.forum1.id)}
+        self.assertEqual(self.client.post(self.url, data, format='json').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_liked_state_for_a_page_in_one_query(self):
+        Like.objects.create(user=self.user1, content_type=ContentType.objects.get_for_model(Thread), object_id=self.thread2_forum1_user2.pk)
+        self.authenticate_client_with_jwt(self.user1)
+        ids = [self.thread1_forum1_user1.pk, self.thread2_forum1_user2.pk]
+        params = {'content_type_model': 'thread', 'object_ids': ','.join(str(pk) for pk in ids)}
+        # JWT user, liked likes
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('community:liked-state'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['liked'], [str(self.thread2_forum1_user2.pk)])
+
+    def test_liked_state_rejects_invalid_ids(self):
+        self.authenticate_client_with_jwt(self.user1)
+        response = self.client.get(reverse('community:liked-state'), {'content_type_model': 'thread', 'object_ids': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UnreadFeedTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.authenticate_client_with_jwt(self.user1)
+        self.url = reverse('community:thread-global-unread')
+
+    def _unread_slugs(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [item['slug'] for item in response.data['results']]
+
+    def _touch(self, thread):
+        Thread.objects.filter(pk=thread.pk).update(last_activity_at=timezone.now())
+
+    def test_visit_marks_thread_read_until_new_activity(self):
+        self.assertEqual(set(self._unread_slugs()), {self.thread1_forum1_user1.slug, self.thread2_forum1_user2.slug})
+        self.client.get(reverse('community:thread-global-detail', kwargs={'slug': self.thread2_forum1_user2.slug}))
+        self.assertEqual(self._unread_slugs(), [self.thread1_forum1_user1.slug])
+
+        self._touch(self.thread2_forum1_user2)
+        self.assertEqual(self._unread_slugs()[0], self.thread2_forum1_user2.slug)
+
+    def test_feed_is_one_query(self):
+        ContentType.objects.get_for_model(Thread)  # Warm the in-process cache, as in a running server
+        # JWT user, feed page (read marks are subqueries)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_forum_mark_read_and_nested_feed(self):
+        response = self.client.post(reverse('community:forum-mark-read', kwargs={'slug': self.forum1.slug}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._unread_slugs(), [])
+
+        self._touch(self.thread1_forum1_user1)
+        nested = reverse('community:forum-thread-unread', kwargs={'forum_slug': self.forum1.slug})
+        self.assertEqual(self._unread_slugs(nested), [self.thread1_forum1_user1.slug])
+        other = reverse('community:forum-thread-unread', kwargs={'forum_slug': self.forum2.slug})
+        self.assertEqual(self._unread_slugs(other), [])
+
+    def test_since_limits_feed_and_is_validated(self):
+        cutoff = timezone.now()
+        self._touch(self.thread2_forum1_user2)
+        self.assertEqual(self._unread_slugs(since=cutoff.isoformat()), [self.thread2_forum1_user2.slug])
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_anonymous_forbidden(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LiveThreadEventsTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('apps.community.live._backend', None)  # A fresh in-process backend per test
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.channel = thread_channel(self.thread1_forum1_user1.pk)
+        self._published()  # A thread page was open just now, so the channel keeps history
+
+    def _published(self):
+        async def replay():
+            subscription = get_backend().subscribe(self.channel, last_event_id=0)
+            messages = []
+            try:
+                while (message := await subscription.next(timeout=0)) is not None:
+                    messages.append(message)
+            finally:
+                subscription.close()
+            return messages
+        return [(message['event'], message['data']) for message in async_to_sync(replay)()]
+
+    def test_post_save_paths_publish_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(thread=self.thread1_forum1_user1, author=self.user1, content='Live reply')
+        self.assertEqual(self._published(), [('post.created', mock.ANY)])
+        self.assertEqual(self._published()[0][1]['content'], 'Live reply')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.content = 'Edited'
+            post.save()
+            post.is_hidden = True
+            post.save(update_fields=['is_hidden', 'updated_at'])
+            Like.objects.create(user=self.user2, content_type=ContentType.objects.get_for_model(Post), object_id=self.post1_thread1_user2.pk)
+        events = [event for event, _data in self._published()]
+        self.assertEqual(events, ['post.created', 'post.updated', 'post.hidden', 'like.changed'])
+        self.assertEqual(self._published()[-1][1], {'type': 'post', 'id': str(self.post1_thread1_user2.pk), 'delta': 1})
+
+    def test_bulk_hide_and_unhide_publish(self):
+        post = self.post1_thread1_user2
+        with self.captureOnCommitCallbacks(execute=True):
+            set_posts_hidden(Post.objects.filter(pk=post.pk), True)
+        with self.captureOnCommitCallbacks(execute=True):
+            set_posts_hidden(Post.objects.filter(pk=post.pk), False)
+        published = self._published()
+        self.assertEqual(published[0], ('post.hidden', {'id': str(post.pk)}))
+        self.assertEqual((published[1][0], published[1][1]['id']), ('post.unhidden', str(post.pk)))
+
+    def test_nothing_built_or_kept_without_listeners(self):
+        other_thread = self.thread2_forum1_user2
+        post_type = ContentType.objects.get_for_model(Post)
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = Post.objects.create(thread=other_thread, author=self.user1, content='Nobody watching')
+            post.content = 'Edited'
+            post.save()
+            Like.objects.create(user=self.user2, content_type=post_type, object_id=post.pk)
+            set_posts_hidden(Post.objects.filter(pk=post.pk), True)
+        self.assertEqual(callbacks, [])
+        self.assertIsNone(get_backend().publish(thread_channel(other_thread.pk), 'post.deleted', {'id': 'x'}))
+
+        # Once every page has been closed for a while the history goes too
+        get_backend().history_grace_seconds = 0
+        self.assertFalse(get_backend().has_listeners())
+        self.assertEqual(self._published(), [])
+
+    def test_nothing_published_when_transaction_rolls_back(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Post.objects.create(thread=self.thread1_forum1_user1, author=self.user1, content='Never committed')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._published(), [])
+
+    def test_subscriber_receives_events_from_another_thread(self):
+        async def listen():
+            subscription = get_backend().subscribe(self.channel)
+            try:
+                await sync_to_async(get_backend().publish, thread_sensitive=False)(self.channel, 'post.deleted', {'id': 'x'})
+                return await subscription.next(timeout=5)
+            finally:
+                subscription.close()
+        message = async_to_sync(listen)()
+        self.assertEqual((message['event'], message['data']), ('post.deleted', {'id': 'x'}))
+
+    def test_slow_subscriber_is_dropped(self):
+        async def overflow():
+            subscription = get_backend().subscribe(self.channel)
+            try:
+                for i in range(get_backend().queue_size + 1):
+                    get_backend().publish(self.channel, 'like.changed', {'delta': 1})
+                await asyncio.sleep(0)
+                with self.assertRaises(SubscriptionClosed):
+                    while True:
+                        await subscription.next(timeout=0)
+            finally:
+                subscription.close()
+        async_to_sync(overflow)()
+
+    def test_stream_sends_events_and_resumes_from_last_event_id(self):
+        missed = get_backend().publish(self.channel, 'post.deleted', {'id': 'missed'})
+        url = reverse('community:thread-events', kwargs={'thread_slug': self.thread1_forum1_user1.slug})
+
+        async def stream():
+            response = await AsyncClient().get(url, headers={'Last-Event-ID': str(missed['id'] - 1)})
+            chunks = aiter(response.streaming_content)
+            try:
+                return response, [await anext(chunks), await anext(chunks)]
+            finally:
+                await chunks.aclose()
+        response, chunks = async_to_sync(stream)()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(chunks[0].startswith(b'retry:'))
+        self.assertEqual(chunks[1], f'id: {missed["id"]}\nevent: post.deleted\ndata: {{"id": "missed"}}\n\n'.encode())
+
+    def test_wsgi_request_is_not_implemented(self):
+        get_backend().publish(self.channel, 'post.deleted', {'id': 'missed'})
+        url = reverse('community:thread-events', kwargs={'thread_slug': self.thread1_forum1_user1.slug})
+        response = self.client.get(url, HTTP_LAST_EVENT_ID='0')
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertIn('ASGI', response.json()['detail'])
+
+    def test_stream_of_hidden_thread_not_found(self):
+        url = reverse('community:thread-events', kwargs={'thread_slug': self.thread3_forum2_user1_hidden.slug})
+        response = async_to_sync(AsyncClient().get)(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CommunitySearchTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('community:search')
+
+    def _hits(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [(hit['type'], hit['id']) for hit in response.data['results']]
+
+    def test_ranked_hits_across_threads_posts_and_comments(self):
+        comment = Comment.objects.create(post=self.post1_thread1_user2, author=self.user1, content="Alpha comment")
+        hits = self._hits(q='alpha')
+        # The thread title outweighs body matches
+        self.assertEqual(hits[0], ('thread', str(self.thread1_forum1_user1.pk)))
+        self.assertEqual(set(hits[1:]), {('post', str(self.post1_thread1_user2.pk)), ('comment', str(comment.pk))})
+
+        hit = self.client.get(self.url, {'q': 'alpha', 'type': 'comment'}).data['results'][0]
+        self.assertEqual(hit['thread']['slug'], self.thread1_forum1_user1.slug)
+        self.assertEqual(hit['thread']['forum_slug'], self.forum1.slug)
+        self.assertEqual(hit['post_id'], str(self.post1_thread1_user2.pk))
+        self.assertIn('<mark>', hit['snippet'])
+
+    def test_hidden_content_and_its_replies_are_filtered(self):
+        self.assertEqual(self._hits(q='gamma'), [])
+        self.post1_thread1_user2.is_hidden = True
+        self.post1_thread1_user2.save(update_fields=['is_hidden', 'updated_at'])
+        self.assertEqual(self._hits(q='reply', type='post'), [])
+        self.post1_thread1_user2.is_hidden = False
+        self.post1_thread1_user2.save(update_fields=['is_hidden', 'updated_at'])
+        self.assertEqual(self._hits(q='reply', type='post'), [('post', str(self.post1_thread1_user2.pk))])
+
+        self.thread1_forum1_user1.is_hidden = True
+        self.thread1_forum1_user1.save(update_fields=['is_hidden', 'updated_at'])
+        self.assertEqual(self._hits(q='alpha'), [])
+
+    def test_comment_hidden_in_admin_drops_out(self):
+        comment = Comment.objects.create(post=self.post1_thread1_user2, author=self.user1, content="Spam spam")
+        comment_admin = CommentAdmin(Comment, admin.site)
+        comment_admin.hide_comments(None, Comment.objects.filter(pk=comment.pk))
+        self.assertEqual(self._hits(q='spam'), [])
+        comment_admin.unhide_comments(None, Comment.objects.filter(pk=comment.pk))
+        self.assertEqual(self._hits(q='spam'), [('comment', str(comment.pk))])
+
+    def test_edits_are_searchable(self):
+        self.thread2_forum1_user2.content = "Now about tensors"
+        self.thread2_forum1_user2.save()
+        self.assertEqual(self._hits(q='tensor'), [('thread', str(self.thread2_forum1_user2.pk))])
+
+    def test_page_in_constant_queries(self):
+        for i in range(5):
+            Post.objects.create(thread=self.thread1_forum1_user1, author=self.user1, content=f"Alpha reply {i}")
+        # Count, page with threads, forums and authors joined
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'q': 'alpha'})
+
+    def test_empty_query_and_invalid_type(self):
+        self.assertEqual(self._hits(q=' '), [])
+        response = self.client.get(self.url, {'q': 'alpha', 'type': 'forum'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_thread_list_search_uses_index(self):
+        response = self.client.get(reverse('community:forum-thread-list', kwargs={'forum_slug': self.forum1.slug}), {'search': 'beta'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['slug'] for item in response.data['results']], [self.thread2_forum1_user2.slug])
+
+
 class ReportCreateAPIViewTests(CommunityViewTestDataMixin, APITestCase):
     def test_create_report_success(self):
         self.authenticate_client_with_jwt(self.user1)
@@ -404,6 +719,66 @@ class ReportViewSetAdminTests(CommunityViewTestDataMixin, APITestCase):
         self.assertEqual(self.report1.moderator_notes, "User warned.")
         self.assertEqual(self.report1.resolved_by, self.admin_user)
 
+
+class ReportQueueTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.authenticate_client_with_jwt(self.admin_user)
+        self.comment = Comment.objects.create(post=self.post1_thread1_user2, author=self.user1, content='A comment')
+
+    def _report(self, target, count=1, reporter=None):
+        Report.objects.bulk_create([
+            Report(reporter=reporter or self.user1, reported_object=target, reason=f'Spam {i}') for i in range(count)
+        ])
+
+    def _list_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries.captured_queries)
+
+    def test_list_loads_targets_per_content_type(self):
+        url = reverse('community:report-admin-list')
+        self._report(self.thread1_forum1_user1)
+        self._report(self.post1_thread1_user2)
+        self._report(self.comment)
+        _response, few = self._list_queries(url)
+        self._report(self.thread2_forum1_user2, 3)
+        self._report(self.post1_thread1_user2, 3)
+        response, many = self._list_queries(url)
+        self.assertEqual(many, few)
+        details = {item['reported_object_details']['id']: item['reported_object_details'] for item in response.data['results']}
+        self.assertEqual(details[str(self.thread2_forum1_user2.pk)]['title'], self.thread2_forum1_user2.title)
+        self.assertEqual(details[str(self.post1_thread1_user2.pk)]['author']['username'], self.user2.username)
+        self.assertEqual(details[str(self.comment.pk)]['content_snippet'], 'A comment')
+
+    def test_deleted_target_has_no_details(self):
+        self._report(self.comment)
+        self.comment.delete()
+        response = self.client.get(reverse('community:report-admin-list'))
+        self.assertIsNone(response.data['results'][0]['reported_object_details'])
+
+    def test_by_target_groups_reports_on_one_object(self):
+        self._report(self.post1_thread1_user2, 200)
+        self._report(self.thread1_forum1_user1, 2)
+        Report.objects.filter(object_id=self.thread1_forum1_user1.pk).update(status='dismissed')
+        response = self.client.get(reverse('community:report-admin-by-target'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data['results']
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['object_id'], str(self.post1_thread1_user2.pk))
+        self.assertEqual((rows[0]['report_count'], rows[0]['pending_count']), (200, 200))
+        self.assertEqual(rows[0]['content_type_model'], 'post')
+        self.assertEqual((rows[1]['report_count'], rows[1]['pending_count']), (2, 0))
+
+        response = self.client.get(reverse('community:report-admin-by-target'), {'status': 'pending'})
+        self.assertEqual([row['object_id'] for row in response.data['results']], [str(self.post1_thread1_user2.pk)])
+
+    def test_by_target_forbidden_for_non_staff(self):
+        self.authenticate_client_with_jwt(self.user1)
+        response = self.client.get(reverse('community:report-admin-by-target'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 # TODO:
 # - More tests for CommentViewSet if fully implemented.
 # - Test all permissions thoroughly for each action and user type.
@@ -411,3 +786,138 @@ class ReportViewSetAdminTests(CommunityViewTestDataMixin, APITestCase):
 # - Test pagination for list views.
 # - Test error responses for invalid data in POST/PUT/PATCH more extensively.
 # - Test behavior when trying to interact with content in hidden threads by non-staff.
+
+
+class LikedStateAnnotationTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            Thread.objects.create(forum=self.forum1, author=self.user2, title=f'Extra thread {i}', slug=f'extra-thread-{i}', content='c')
+        Like.objects.create(user=self.user1, content_type=ContentType.objects.get_for_model(Thread), object_id=self.thread2_forum1_user2.pk)
+        Like.objects.create(user=self.user1, content_type=ContentType.objects.get_for_model(Post), object_id=self.post1_thread1_user2.pk)
+
+    def test_thread_list_liked_state_in_constant_queries(self):
+        self.authenticate_client_with_jwt(self.user1)
+        url = reverse('community:thread-global-list')
+        # JWT user, page (liked state annotated; keyset pagination runs no count)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        liked = {item['slug']: item['is_liked_by_user'] for item in response.data['results']}
+        self.assertTrue(liked[self.thread2_forum1_user2.slug])
+        self.assertEqual(sum(liked.values()), 1)
+        can_edit = {item['slug']: item['user_can_edit'] for item in response.data['results']}
+        self.assertTrue(can_edit[self.thread1_forum1_user1.slug])
+        self.assertFalse(can_edit[self.thread2_forum1_user2.slug])
+
+    def test_post_list_liked_state(self):
+        self.authenticate_client_with_jwt(self.user1)
+        url = reverse('community:post-global-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['results'][0]['is_liked_by_user'])
+
+    def test_anonymous_list_has_no_liked_state(self):
+        response = self.client.get(reverse('community:thread-global-list'))
+        self.assertFalse(any(item['is_liked_by_user'] for item in response.data['results']))
+
+
+class BufferedViewCountTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        flush_view_counts()
+        self.addCleanup(flush_view_counts)  # Buffered views must not leak into other tests
+        self.url = reverse('community:thread-global-detail', kwargs={'slug': self.thread1_forum1_user1.slug})
+
+    def test_retrieve_does_not_write_the_thread(self):
+        self.client.get(self.url)
+        # Only the thread read (plus the liked-state subquery inside it); no UPDATE
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['view_count'], 2)
+        self.thread1_forum1_user1.refresh_from_db()
+        self.assertEqual(self.thread1_forum1_user1.view_count, 0)
+
+        self.assertEqual(flush_view_counts(), 1)
+        self.thread1_forum1_user1.refresh_from_db()
+        self.assertEqual(self.thread1_forum1_user1.view_count, 2)
+        self.assertEqual(self.client.get(self.url).data['view_count'], 3)
+
+    def test_views_are_deduplicated_per_viewer_within_window(self):
+        with mock.patch('apps.core.view_counts.VIEW_COUNT_DEDUP_WINDOW', 60):
+            self.authenticate_client_with_jwt(self.user1)
+            self.client.get(self.url)
+            self.client.get(self.url)
+            self.authenticate_client_with_jwt(self.user2)
+            self.client.get(self.url)
+        flush_view_counts()
+        self.thread1_forum1_user1.refresh_from_db()
+        self.assertEqual(self.thread1_forum1_user1.view_count, 2)
+
+    def test_failed_flush_keeps_views_and_serves_the_read(self):
+        with mock.patch('apps.core.view_counts.VIEW_COUNT_FLUSH_INTERVAL', 0), \
+                mock.patch('django.db.models.query.QuerySet.update', side_effect=DatabaseError), \
+                self.assertLogs('apps.core.view_counts', 'ERROR'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['view_count'], 1)
+
+        self.assertEqual(flush_view_counts(), 1)
+        self.thread1_forum1_user1.refresh_from_db()
+        self.assertEqual(self.thread1_forum1_user1.view_count, 1)
+
+
+class KeysetPaginationTests(CommunityViewTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts_url = reverse('community:thread-post-list', kwargs={
+            'forum_slug': self.forum1.slug, 'thread_slug': self.thread1_forum1_user1.slug
+        })
+        Post.objects.bulk_create([
+            Post(thread=self.thread1_forum1_user1, author=self.user1, content=f'Reply {i}') for i in range(11)
+        ])
+        # Rows sharing the ordering value must still be paged without repeats or gaps
+        Post.objects.filter(thread=self.thread1_forum1_user1).update(created_at=timezone.now())
+
+    def _walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append(response.data)
+            url = response.data['next']
+        return pages
+
+    def test_posts_paged_in_order_without_repeats(self):
+        pages = self._walk(f'{self.posts_url}?page_size=5')
+        self.assertEqual([len(page['results']) for page in pages], [5, 5, 2])
+        ids = [item['id'] for page in pages for item in page['results']]
+        expected = Post.objects.filter(thread=self.thread1_forum1_user1).order_by('created_at', 'id')
+        self.assertEqual(ids, [str(pk) for pk in expected.values_list('id', flat=True)])
+
+    def test_previous_link_returns_prior_page(self):
+        pages = self._walk(f'{self.posts_url}?page_size=5')
+        self.assertIsNone(pages[0]['previous'])
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual(response.data['results'], pages[1]['results'])
+        self.assertEqual(self.client.get(response.data['previous']).data['results'], pages[0]['results'])
+
+    def test_deep_page_does_not_count_or_offset(self):
+        next_url = self.client.get(f'{self.posts_url}?page_size=5').data['next']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(next_url)
+        sql = ' '.join(query['sql'] for query in queries.captured_queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_threads_keep_pinned_first_across_pages(self):
+        self.thread2_forum1_user2.is_pinned = True
+        self.thread2_forum1_user2.save(update_fields=['is_pinned'])
+        url = reverse('community:forum-thread-list', kwargs={'forum_slug': self.forum1.slug})
+        pages = self._walk(f'{url}?page_size=1')
+        slugs = [item['slug'] for page in pages for item in page['results']]
+        self.assertEqual(slugs, [self.thread2_forum1_user2.slug, self.thread1_forum1_user1.slug])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(f'{self.posts_url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
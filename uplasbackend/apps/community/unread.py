@@ -0,0 +1,62 @@
+# apps/community/unread.py
+"""
+Per-user unread tracking for forum threads.
+
+Reading is recorded on visits only. Opening a thread upserts one
+ThreadReadMarker row, and "mark forum as read" upserts one ForumReadMarker
+high-water mark instead of a row per thread. A thread is unread when its
+`last_activity_at` is newer than both of the user's marks. Replies and
+edits never write markers, because they already bump `last_activity_at`.
+
+`unread_threads` builds the "unread/updated threads" feed as one query
+against the `last_activity_at` index. The marks are correlated subqueries on
+the markers' (user, thread) and (user, forum) unique indexes. Clients poll
+it with `since` instead of re-listing whole forums.
+"""
+import datetime
+
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import ForumReadMarker, ThreadReadMarker
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+READ_MARK_ANNOTATION = 'read_mark'
+
+
+def mark_thread_read(user, thread, at=None):
+    """Records that `user` read `thread` (one upsert)."""
+    if not (user and user.is_authenticated):
+        return
+    ThreadReadMarker.objects.bulk_create(
+        [ThreadReadMarker(user=user, thread=thread, last_read_at=at or timezone.now())],
+        update_conflicts=True, unique_fields=['user', 'thread'], update_fields=['last_read_at'],
+    )
+
+
+def mark_forum_read(user, forum, at=None):
+    """Marks everything currently in `forum` as read for `user` (one upsert)."""
+    if not (user and user.is_authenticated):
+        return
+    ForumReadMarker.objects.bulk_create(
+        [ForumReadMarker(user=user, forum=forum, read_until=at or timezone.now())],
+        update_conflicts=True, unique_fields=['user', 'forum'], update_fields=['read_until'],
+    )
+
+
+def annotate_read_mark(queryset, user):
+    """Annotates threads with the later of the user's thread and forum read marks (epoch when unread)."""
+    thread_mark = ThreadReadMarker.objects.filter(user=user, thread=OuterRef('pk')).values('last_read_at')[:1]
+    forum_mark = ForumReadMarker.objects.filter(user=user, forum=OuterRef('forum_id')).values('read_until')[:1]
+    return queryset.annotate(**{
+        READ_MARK_ANNOTATION: Greatest(Coalesce(Subquery(thread_mark), EPOCH), Coalesce(Subquery(forum_mark), EPOCH)),
+    })
+
+
+def unread_threads(queryset, user, since=None):
+    """The threads of `queryset` with activity `user` has not read, most recently active first."""
+    if since is not None:
+        queryset = queryset.filter(last_activity_at__gt=since)
+    queryset = annotate_read_mark(queryset, user)
+    return queryset.filter(last_activity_at__gt=F(READ_MARK_ANNOTATION)).order_by('-last_activity_at')
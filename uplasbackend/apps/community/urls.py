@@ -9,6 +9,9 @@ from .views import (
     PostViewSet,
     # CommentViewSet, # If implemented
     LikeToggleAPIView,
+    LikedStateAPIView,
+    CommunitySearchAPIView,
+    thread_event_stream,
     ReportCreateAPIView,
     ReportViewSet
 )
@@ -72,6 +75,9 @@ urlpatterns = [
 
     # Standalone views for specific actions
     path('like-toggle/', LikeToggleAPIView.as_view(), name='like-toggle'), # POST to like, DELETE to unlike
+    path('likes/state/', LikedStateAPIView.as_view(), name='liked-state'), # GET liked state of a page of objects
+    path('threads/<slug:thread_slug>/events/', thread_event_stream, name='thread-events'), # SSE live updates
+    path('search/', CommunitySearchAPIView.as_view(), name='search'), # GET ranked search over threads, posts and comments
     path('report-content/', ReportCreateAPIView.as_view(), name='report-content-create'),
 
     # Custom actions on ViewSets are automatically routed by DefaultRouter.
@@ -108,4 +114,7 @@ urlpatterns = [
 
 # Standalone:
 # /api/community/like-toggle/ (POST to like, DELETE to unlike - expects body data)
+# /api/community/likes/state/?content_type_model=post&object_ids=... (GET liked state of a page of objects)
+# /api/community/threads/{thread_slug}/events/ (GET Server-Sent Events stream of live thread updates)
+# /api/community/search/?q=...&type=thread,post,comment (GET ranked search hits with their threads)
 # /api/community/report-content/ (POST to create a report - expects body data)
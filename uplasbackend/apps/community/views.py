@@ -1,11 +1,16 @@
+import json
+import time
 import uuid # <-- THIS IS THE CRITICAL FIX
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.contrib.contenttypes.models import ContentType
+from django.utils.dateparse import parse_datetime
 from django.db.models import Q, Exists, OuterRef
 from rest_framework import viewsets, status, generics, serializers
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
@@ -18,8 +23,19 @@ from .serializers import (
     ForumListSerializer, ForumDetailSerializer,
     ThreadListSerializer, ThreadDetailSerializer,
     PostSerializer, CommentSerializer,
-    LikeSerializer, ReportSerializer
+    LikeSerializer, ReportSerializer, ReportTargetGroupSerializer, SearchHitSerializer
 )
+from apps.core.pagination import KeysetPagination
+from apps.core.view_counts import record_view, viewer_key
+
+from .live import (
+    LIVE_HEARTBEAT_SECONDS, LIVE_MAX_STREAM_SECONDS, LIVE_RETRY_MILLISECONDS, SubscriptionClosed, get_backend,
+    thread_channel,
+)
+from .likes import annotate_liked, like, likeable_model, liked_object_ids, unlike
+from .unread import mark_forum_read, mark_thread_read, unread_threads
+from .reports import group_reports_by_target, load_report_targets, load_targets
+from .search import SEARCH_KINDS, ThreadSearchFilter, search_community
 from .permissions import (
     IsAdminOrReadOnly, IsAuthorOrReadOnly, CanCreateThreadOrPost,
     IsModeratorOrAdmin, CanInteractWithContent, CanManageReport
@@ -46,6 +62,12 @@ class ForumViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save()
 
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def mark_read(self, request, slug=None):
+        """Marks every thread currently in the forum as read for the user."""
+        mark_forum_read(request.user, self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class ThreadViewSet(viewsets.ModelViewSet):
     """
     API endpoint for managing threads within a forum.
@@ -56,15 +78,15 @@ class ThreadViewSet(viewsets.ModelViewSet):
     queryset = Thread.objects.all() # Base queryset
     permission_classes = [IsAuthenticated] # Base permission, refined per action
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ThreadSearchFilter, OrderingFilter] # ?search= uses the search index
     filterset_fields = {
         'author__username': ['exact'],
         'is_pinned': ['exact'],
         'is_closed': ['exact'],
         'forum__slug': ['exact'], 
     }
-    search_fields = ['title', 'content', 'author__username', 'forum__name']
     ordering_fields = ['title', 'created_at', 'last_activity_at', 'reply_count', 'view_count', 'like_count']
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -82,7 +104,7 @@ class ThreadViewSet(viewsets.ModelViewSet):
         if not (user.is_authenticated and user.is_staff):
             qs = qs.filter(is_hidden=False)
         
-        return qs.order_by('-is_pinned', '-last_activity_at')
+        return annotate_liked(qs, user).order_by('-is_pinned', '-last_activity_at')
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -99,14 +121,33 @@ class ThreadViewSet(viewsets.ModelViewSet):
         forum_slug = self.kwargs.get('forum_slug')
         forum = get_object_or_404(Forum, slug=forum_slug)
         self.check_object_permissions(self.request, forum)
-        serializer.save(author=self.request.user, forum=forum)
+        thread = serializer.save(author=self.request.user, forum=forum)
+        mark_thread_read(self.request.user, thread)
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.view_count += 1
-        instance.save(update_fields=['view_count'])
+        instance.view_count += record_view(instance, viewer_key(request))
+        mark_thread_read(request.user, instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def unread(self, request, forum_slug=None):
+        """
+        Threads with activity the user has not read yet, most recently active
+        first. `since` (ISO datetime) limits the feed to activity after it, for polling.
+        """
+        since = request.query_params.get('since')
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                return Response({'detail': _("'since' must be an ISO 8601 datetime.")}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        queryset = unread_threads(self.filter_queryset(self.get_queryset()), request.user, since=since or None)
+        page = self.paginate_queryset(queryset)
+        serializer = ThreadListSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
         
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsModeratorOrAdmin])
     def pin_thread(self, request, slug=None):
@@ -135,6 +176,7 @@ class PostViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = { 'author__username': ['exact'] }
     ordering_fields = ['created_at', 'like_count']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -151,7 +193,7 @@ class PostViewSet(viewsets.ModelViewSet):
         if not (user.is_authenticated and user.is_staff):
             qs = qs.filter(is_hidden=False, thread__is_hidden=False)
             
-        return qs.order_by('created_at')
+        return annotate_liked(qs, user).order_by('created_at')
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -169,6 +211,7 @@ class PostViewSet(viewsets.ModelViewSet):
         thread = get_object_or_404(Thread, slug=thread_slug)
         self.check_object_permissions(self.request, thread)
         serializer.save(author=self.request.user, thread=thread)
+        mark_thread_read(self.request.user, thread)
         
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsModeratorOrAdmin])
     def hide_post(self, request, pk=None):
@@ -187,29 +230,22 @@ class LikeToggleAPIView(generics.GenericAPIView):
 
         if not content_type_model_str or not object_id_str:
             return None, Response({"detail": _("content_type_model and object_id are required.")}, status=status.HTTP_400_BAD_REQUEST)
-        
-        target_model = None
+
         try:
-            object_id = uuid.UUID(object_id_str)
-            app_label = 'community'
-            content_type = ContentType.objects.get(app_label=app_label, model=content_type_model_str)
-            target_model = content_type.model_class()
-            target_object = get_object_or_404(target_model, pk=object_id)
-            return target_object, None
-        except (ContentType.DoesNotExist, ValueError) as e:
+            object_id = uuid.UUID(str(object_id_str))
+            target_model = likeable_model(content_type_model_str)
+        except ValueError: # Includes LikeError
             return None, Response({"detail": _("Invalid content_type_model or object_id.")}, status=status.HTTP_404_NOT_FOUND)
-        except Exception: # Catches target_model.DoesNotExist if target_model is None
-             if target_model:
-                 return None, Response({"detail": _(f"{target_model.__name__} with ID '{object_id_str}' not found.")}, status=status.HTTP_404_NOT_FOUND)
-             return None, Response({"detail": _("An unexpected error occurred identifying the target object.")}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        target_object = target_model._default_manager.filter(pk=object_id).first()
+        if target_object is None:
+            return None, Response({"detail": _(f"{target_model.__name__} with ID '{object_id_str}' not found.")}, status=status.HTTP_404_NOT_FOUND)
+        return target_object, None
 
     def post(self, request, *args, **kwargs): # Like
         target_object, error_response = self._get_target_object(request.data)
         if error_response: return error_response
         self.check_object_permissions(request, target_object)
-        content_type = ContentType.objects.get_for_model(target_object)
-        _, created = Like.objects.get_or_create(user=request.user, content_type=content_type, object_id=target_object.pk)
-        if created:
+        if like(request.user, target_object):
             return Response({'detail': _('Content liked successfully.'), 'liked': True}, status=status.HTTP_201_CREATED)
         return Response({'detail': _('You have already liked this content.'), 'liked': True}, status=status.HTTP_200_OK)
 
@@ -217,12 +253,90 @@ class LikeToggleAPIView(generics.GenericAPIView):
         target_object, error_response = self._get_target_object(request.data)
         if error_response: return error_response
         self.check_object_permissions(request, target_object)
-        content_type = ContentType.objects.get_for_model(target_object)
-        deleted_count, _ = Like.objects.filter(user=request.user, content_type=content_type, object_id=target_object.pk).delete()
-        if deleted_count > 0:
+        if unlike(request.user, target_object):
             return Response({'detail': _('Like removed successfully.'), 'liked': False}, status=status.HTTP_200_OK)
         return Response({'detail': _('You have not liked this content or like already removed.'), 'liked': False}, status=status.HTTP_400_BAD_REQUEST)
 
+class LikedStateAPIView(generics.GenericAPIView):
+    """
+    Liked state of a page of objects for the requesting user, in one query:
+    GET ?content_type_model=post&object_ids=<uuid>,<uuid>,... -> {"liked": [<uuid>, ...]}
+    """
+    permission_classes = [IsAuthenticated]
+    max_object_ids = 100
+
+    def get(self, request, *args, **kwargs):
+        raw_ids = [value for value in request.query_params.get('object_ids', '').split(',') if value.strip()]
+        try:
+            target_model = likeable_model(request.query_params.get('content_type_model'))
+            object_ids = [uuid.UUID(value.strip()) for value in raw_ids]
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(object_ids) > self.max_object_ids:
+            return Response(
+                {'detail': _(f"At most {self.max_object_ids} object_ids can be checked at once.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        liked = liked_object_ids(request.user, target_model, object_ids)
+        return Response({'liked': [str(object_id) for object_id in object_ids if object_id in liked]})
+
+class CommunitySearchAPIView(generics.ListAPIView):
+    """
+    Ranked full-text search over visible threads, posts and comments (see search.py):
+    GET ?q=<text>[&type=thread,post,comment] -> hits, best first, each with its thread.
+    """
+    serializer_class = SearchHitSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        kinds = [kind.strip() for kind in self.request.query_params.get('type', '').split(',') if kind.strip()]
+        invalid = [kind for kind in kinds if kind not in SEARCH_KINDS]
+        if invalid:
+            raise ParseError(_(f"Unknown type(s): {', '.join(invalid)}."))
+        return search_community(self.request.query_params.get('q', ''), kinds=kinds)
+
+async def thread_event_stream(request, thread_slug):
+    """
+    Server-Sent Events stream of a visible thread's live updates (see live.py).
+    The stream stays open for LIVE_MAX_STREAM_SECONDS, then EventSource
+    reconnects and resumes from Last-Event-ID. WSGI workers cannot hold it
+    open, so under WSGI the view answers 501, which also stops EventSource
+    from reconnecting; clients fall back to polling.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': _("Live updates need an ASGI server.")}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    thread_id = await Thread.objects.filter(slug=thread_slug, is_hidden=False).values_list('pk', flat=True).afirst()
+    if thread_id is None:
+        raise Http404(_("Thread not found."))
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
+
+    async def events():
+        subscription = get_backend().subscribe(thread_channel(thread_id), last_event_id=last_event_id)
+        deadline = time.monotonic() + LIVE_MAX_STREAM_SECONDS
+        try:
+            yield f"retry: {LIVE_RETRY_MILLISECONDS}\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                message = await subscription.next(timeout=max(0, min(LIVE_HEARTBEAT_SECONDS, remaining)))
+                if message is None:
+                    if remaining <= 0:
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+        except SubscriptionClosed:
+            pass  # Fell behind; the client reconnects and replays from its Last-Event-ID
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let a proxy buffer the stream
+    return response
+
 class ReportCreateAPIView(generics.CreateAPIView):
     serializer_class = ReportSerializer
     permission_classes = [IsAuthenticated, CanInteractWithContent]
@@ -243,9 +357,33 @@ class ReportViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         if self.request.user.is_staff:
-            return Report.objects.all().select_related('reporter', 'resolved_by', 'content_type').prefetch_related('reported_object')
+            # Reported objects are loaded per page, grouped by type (see reports.load_report_targets)
+            return Report.objects.all().select_related('reporter', 'resolved_by', 'content_type')
         return Report.objects.none()
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(load_report_targets(page), many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(load_report_targets(queryset), many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='by-target')
+    def by_target(self, request):
+        """The queue with one row per reported object, most reported first. Accepts the list filters."""
+        groups = group_reports_by_target(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(groups)
+        rows = list(page if page is not None else groups)
+        targets = load_targets((row['content_type_id'], row['object_id']) for row in rows)
+        for row in rows:
+            row['target'] = targets.get((row['content_type_id'], row['object_id']))
+        serializer = ReportTargetGroupSerializer(rows, many=True, context=self.get_serializer_context())
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
     @action(detail=True, methods=['patch'], url_path='update-status')
     def update_status(self, request, pk=None):
         report = self.get_object()
@@ -0,0 +1,35 @@
+# apps/core/caching.py
+"""
+Timeouts of caches that are invalidated when the underlying rows change.
+
+Invalidation only reaches the cache it runs against. Without a CACHES
+setting Django uses a per-process LocMem cache, so an entry dropped by the
+worker that handled a write stays in every other worker until it expires.
+Such caches therefore default to off unless the default cache is shared
+between processes (Redis, Memcached, database...). An explicit setting
+always wins.
+"""
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def has_shared_cache(alias=DEFAULT_CACHE_ALIAS):
+    """Whether the cache `alias` is seen by every worker process."""
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    return backend not in PROCESS_LOCAL_BACKENDS
+
+
+def invalidated_cache_timeout(setting_name, shared_default):
+    """
+    The timeout of a write-invalidated cache: the `setting_name` setting if
+    set, else `shared_default` with a shared cache and 0 (off) without one.
+    """
+    timeout = getattr(settings, setting_name, None)
+    if timeout is not None:
+        return timeout
+    return shared_default if has_shared_cache() else 0
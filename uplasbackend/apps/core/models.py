@@ -7,4 +7,20 @@ class BaseModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+
+class CounterFieldsMixin:
+    """
+    Full saves of existing rows leave the denormalized counters alone, so a
+    stale in-memory copy cannot overwrite counters maintained with F() updates.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if self.counter_fields and not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
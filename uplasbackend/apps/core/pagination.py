@@ -0,0 +1,152 @@
+# apps/core/pagination.py
+"""
+Keyset (cursor) pagination for append-heavy, time-ordered feeds.
+
+PageNumberPagination runs a COUNT(*) and skips OFFSET rows on every page, so
+deep pages of a long thread get slower the further in they are. `KeysetPagination`
+instead encodes the ordering values of the last row of a page in an opaque
+cursor, and the next page filters on them: "(a, b, pk) after (x, y, z)". With an
+index on the same columns every page costs the same, wherever it is.
+
+The ordering is the queryset's own (`order_by`, or the model's Meta ordering),
+including any ordering a client picked through OrderingFilter. The primary key
+is appended as a tie-breaker, so rows that share the ordering values are
+neither repeated nor skipped. Only plain, non-null model fields can be keyed.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 10)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+        reverse, position = self.decode_cursor(request)
+        ordering = [self._flip(name) for name in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(requested, self.max_page_size) if requested > 0 else self.page_size
+
+    def get_ordering(self, queryset):
+        model_meta = queryset.model._meta
+        ordering = []
+        for name in queryset.query.order_by or model_meta.ordering:
+            try:
+                descending = name.startswith('-')
+                field = model_meta.pk if name.lstrip('-') == 'pk' else model_meta.get_field(name.lstrip('-'))
+            except (AttributeError, FieldDoesNotExist):
+                field = None
+            if field is None or field.null or not field.concrete or field.is_relation:
+                raise ImproperlyConfigured(f"KeysetPagination cannot key the ordering {name!r} of {model_meta.label}.")
+            ordering.append(('-' if descending else '') + field.name)
+        if not any(name.lstrip('-') == model_meta.pk.name for name in ordering):
+            # Tie-breaker, in the direction of the last column so one index serves both
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append(('-' if descending else '') + model_meta.pk.name)
+        return ordering
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def _after(self, ordering, position):
+        """Rows strictly after `position` in `ordering`: a OR b, one clause per column."""
+        condition = Q()
+        equal = {}
+        for name, value in zip(ordering, position):
+            column = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{column}__{lookup}': value})
+            equal[column] = value
+        return condition
+
+    # --- Cursors ---
+
+    def decode_cursor(self, request):
+        """Returns (reverse, position values) of the request's cursor, or (False, None) for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            values = payload['v']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(self.fields, values)]
+            return bool(payload.get('r')), position
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse=False):
+        # value_to_string keeps full datetime precision, which JSON encoders truncate
+        values = [field.value_to_string(obj) for field in self.fields]
+        payload = {'v': values, 'r': 1} if reverse else {'v': values}
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
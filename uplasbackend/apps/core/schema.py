@@ -0,0 +1,28 @@
+# apps/core/schema.py
+"""
+Schema upkeep for the apps without migrations (community, blog).
+
+`migrate` never alters the tables of such apps once they exist, so indexes
+added to their models' Meta.indexes would only reach new databases.
+`ensure_model_indexes` creates the missing ones and is run by those apps
+after every `migrate` (post_migrate, see their apps.py). It only adds
+indexes named in Meta.indexes; it never drops or alters anything.
+"""
+from django.db import connection as default_connection
+
+
+def ensure_model_indexes(models, connection=default_connection):
+    """Creates the Meta.indexes of `models` that the database lacks. Returns the names created."""
+    tables = set(connection.introspection.table_names())
+    missing = []
+    with connection.cursor() as cursor:
+        for model in models:
+            if not model._meta.indexes or model._meta.db_table not in tables:
+                continue
+            existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+            missing.extend((model, index) for index in model._meta.indexes if index.name not in existing)
+    if missing:
+        with connection.schema_editor() as schema_editor:
+            for model, index in missing:
+                schema_editor.add_index(model, index)
+    return [index.name for _model, index in missing]
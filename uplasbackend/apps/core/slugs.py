@@ -0,0 +1,89 @@
+# apps/core/slugs.py
+"""
+Unique slug allocation shared by the apps that derive slugs from titles.
+
+`unique_slug` finds the first free "<slug>", "<slug>-1", "<slug>-2"... with one
+prefix query, however many duplicates already exist; it does not probe the
+suffixes one query at a time. `unique_slugs` does the same for a batch of
+values (e.g. the topics of an imported course) with one query for the whole
+batch, keeping the allocated slugs distinct from each other too.
+`with_unique_slug` also covers concurrent writers racing for the same slug:
+the write runs in a savepoint and, if the slug was taken in the meantime, is
+retried with a freshly allocated one.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SLUG_WRITE_ATTEMPTS = 3
+
+
+def _taken_slugs(rows, stems, field):
+    """The slugs of `rows` equal to one of `stems` or to a stem followed by "-<n>"."""
+    pattern = '|'.join(re.escape(stem) for stem in stems)
+    prefixed = reduce(or_, (Q(**{f'{field}__startswith': f'{stem}-'}) for stem in stems))
+    suffixed = prefixed & Q(**{f'{field}__regex': rf'^({pattern})-[0-9]+$'})
+    return set(rows.filter(Q(**{f'{field}__in': stems}) | suffixed).order_by().values_list(field, flat=True))
+
+
+def unique_slugs(model, values, exclude_pk=None, field='slug'):
+    """
+    Maps each of `values` to a slug not used by any other `model` row
+    (ignoring `exclude_pk`) nor allocated to another of `values`.
+    """
+    max_length = model._meta.get_field(field).max_length
+    rows = model._default_manager.all()
+    if exclude_pk is not None:
+        rows = rows.exclude(pk=exclude_pk)
+    bases = {value: slugify(value)[:max_length].strip('-') or model._meta.model_name for value in values}
+    if not bases:
+        return {}
+    taken = _taken_slugs(rows, set(bases.values()), field)
+
+    allocated = {}
+    for value, base in bases.items():
+        stem = base
+        while True:
+            if stem == base and base not in taken:
+                slug = base
+                break
+            counter = 1
+            while f'{stem}-{counter}' in taken:
+                counter += 1
+            slug = f'{stem}-{counter}'
+            if len(slug) <= max_length:
+                break
+            # No room for the suffix: shorten the stem and look again
+            stem = base[:max_length - len(str(counter)) - 1].rstrip('-')
+            taken |= _taken_slugs(rows, {stem}, field)
+        allocated[value] = slug
+        taken.add(slug)
+    return allocated
+
+
+def unique_slug(model, value, exclude_pk=None, field='slug'):
+    """Returns a slug of `value` not used by any other `model` row (ignoring `exclude_pk`)."""
+    return unique_slugs(model, [value], exclude_pk, field)[value]
+
+
+def with_unique_slug(model, value, write, exclude_pk=None, field='slug', attempts=SLUG_WRITE_ATTEMPTS):
+    """
+    Calls `write(slug)` with a freshly allocated slug inside a savepoint and
+    returns its result. If the write fails because another writer took the slug
+    first, it is retried with a new one; other integrity errors propagate.
+    """
+    for attempt in range(1, attempts + 1):
+        slug = unique_slug(model, value, exclude_pk, field)
+        try:
+            with transaction.atomic():
+                return write(slug)
+        except IntegrityError:
+            taken = model._default_manager.filter(**{field: slug})
+            if exclude_pk is not None:
+                taken = taken.exclude(pk=exclude_pk)
+            if attempt == attempts or not taken.exists():
+                raise
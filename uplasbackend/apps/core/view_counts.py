@@ -0,0 +1,109 @@
+# apps/core/view_counts.py
+"""
+Buffered view counters for popular read endpoints (threads, blog posts).
+
+Retrieving an object used to increment its `view_count` with a save(),
+i.e. a row write and lock on every read, racing with concurrent viewers.
+`record_view` instead adds the view to an in-process buffer. The buffer is
+flushed at most every VIEW_COUNT_FLUSH_INTERVAL seconds, or once
+VIEW_COUNT_MAX_BUFFERED objects are pending, and at interpreter exit.
+Flushes are F() increments, one UPDATE per model and distinct increment.
+Views can optionally be deduplicated per viewer within
+VIEW_COUNT_DEDUP_WINDOW seconds. The dedup markers live in the default
+cache, so they only hold across processes when that cache is shared (Redis,
+Memcached, database...). With the per-process LocMem default each worker
+deduplicates on its own, and a viewer whose requests reach several workers
+is counted once per worker.
+
+A flush that fails (e.g. the database is unavailable) is logged and its
+views are put back in the buffer for the next flush; it never fails the
+read that triggered it. Views buffered by a crashed process are lost, which
+is acceptable for view counts.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+VIEW_COUNT_FLUSH_INTERVAL = getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 30)
+VIEW_COUNT_MAX_BUFFERED = getattr(settings, 'VIEW_COUNT_MAX_BUFFERED', 1000)
+VIEW_COUNT_DEDUP_WINDOW = getattr(settings, 'VIEW_COUNT_DEDUP_WINDOW', 0)  # 0 counts every view
+
+_lock = threading.Lock()
+_pending = Counter()  # (model, pk) -> views not yet written
+_last_flush = time.monotonic()
+
+
+def viewer_key(request):
+    """Identifies the viewer for deduplication: the user, else the client address."""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    return f"ip:{forwarded.split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')}"
+
+
+def _is_repeat_view(obj, viewer):
+    if not (VIEW_COUNT_DEDUP_WINDOW and viewer):
+        return False
+    key = f"core:views:seen:{obj._meta.label_lower}:{obj.pk}:{viewer}"
+    return not cache.add(key, True, VIEW_COUNT_DEDUP_WINDOW)
+
+
+def record_view(obj, viewer=None):
+    """
+    Counts one view of `obj` (unless `viewer` already viewed it within the
+    dedup window). Returns how many buffered views of `obj` its loaded
+    `view_count` does not include yet, so responses can show the sum.
+    """
+    key = (type(obj), obj.pk)
+    repeat = _is_repeat_view(obj, viewer)
+    with _lock:
+        if not repeat:
+            _pending[key] += 1
+        unwritten = _pending.get(key, 0)
+    if time.monotonic() - _last_flush >= VIEW_COUNT_FLUSH_INTERVAL or len(_pending) >= VIEW_COUNT_MAX_BUFFERED:
+        flush_view_counts()
+    return unwritten
+
+
+def flush_view_counts():
+    """
+    Writes the buffered views. Returns the number of objects updated. On a
+    database error the views not yet written go back to the buffer.
+    """
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+
+    by_increment = defaultdict(list)
+    for (model, pk), views in batch.items():
+        by_increment[(model, views)].append(pk)
+    groups = list(by_increment.items())
+    written = 0
+    for position, ((model, views), pks) in enumerate(groups):
+        try:
+            # A savepoint, so a failure does not break the caller's transaction
+            with transaction.atomic():
+                model.objects.filter(pk__in=pks).update(view_count=F('view_count') + views)
+        except Exception:
+            # Keep the unwritten views for the next flush rather than dropping them
+            logger.exception("Could not write buffered view counts; retrying on the next flush.")
+            with _lock:
+                for (unwritten_model, unwritten_views), unwritten_pks in groups[position:]:
+                    _pending.update({(unwritten_model, pk): unwritten_views for pk in unwritten_pks})
+            break
+        written += len(pks)
+    return written
+
+
+atexit.register(flush_view_counts)
@@ -0,0 +1,151 @@
+# apps/courses/access.py
+"""
+Course access resolution for the permission classes.
+
+The IDs of the courses a user is enrolled in and of the courses they teach
+are loaded with one query and memoized on the request, so several permission
+checks in one request share it. With a shared cache they are also cached per
+user (COURSE_ACCESS_CACHE_TIMEOUT, see apps/core/caching.py). Enrollment
+changes drop the user's entry, and a course changing instructor drops the
+entries of the old and new instructor. Helpers resolve the course of a
+Module/Topic/Question/Choice through already-loaded relations, falling back
+to a single values_list query instead of lazy-loading the chain.
+"""
+from django.core.cache import cache
+from django.db.models import CharField, Value
+
+from apps.core.caching import invalidated_cache_timeout
+
+ENROLLED = 'enrolled'
+TEACHES = 'teaches'
+
+
+def access_cache_timeout():
+    """Seconds a user's course IDs stay cached; 0 (per-request memo only) without a shared cache."""
+    return invalidated_cache_timeout('COURSE_ACCESS_CACHE_TIMEOUT', 60 * 5)
+
+
+def access_cache_key(user_id):
+    return f"courses:access:{user_id}"
+
+
+def load_course_ids(user_id):
+    """Returns (enrolled course IDs, taught course IDs) for a user in one UNION query."""
+    from .models import Course, Enrollment
+    enrolled = Enrollment.objects.filter(user_id=user_id).order_by().values_list(
+        'course_id', Value(ENROLLED, output_field=CharField())
+    )
+    taught = Course.objects.filter(instructor_id=user_id).order_by().values_list(
+        'id', Value(TEACHES, output_field=CharField())
+    )
+    enrolled_ids, taught_ids = set(), set()
+    for course_id, kind in enrolled.union(taught, all=True):
+        (enrolled_ids if kind == ENROLLED else taught_ids).add(course_id)
+    return frozenset(enrolled_ids), frozenset(taught_ids)
+
+
+def invalidate_user_access(*user_ids):
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if user_ids:
+        cache.delete_many([access_cache_key(user_id) for user_id in user_ids])
+
+
+class CourseAccess:
+    """What one user may do with courses; course IDs are loaded lazily on first use."""
+
+    def __init__(self, user):
+        self.user = user
+        self._course_ids = None
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @property
+    def is_staff(self):
+        return self.is_authenticated and self.user.is_staff
+
+    def _load(self):
+        if self._course_ids is None:
+            if not self.is_authenticated:
+                self._course_ids = (frozenset(), frozenset())
+            elif timeout := access_cache_timeout():
+                key = access_cache_key(self.user.pk)
+                self._course_ids = cache.get(key)
+                if self._course_ids is None:
+                    self._course_ids = load_course_ids(self.user.pk)
+                    cache.set(key, self._course_ids, timeout)
+            else:
+                self._course_ids = load_course_ids(self.user.pk)
+        return self._course_ids
+
+    @property
+    def enrolled_course_ids(self):
+        return self._load()[0]
+
+    @property
+    def instructor_course_ids(self):
+        return self._load()[1]
+
+    def is_enrolled(self, course_id):
+        return course_id in self.enrolled_course_ids
+
+    def is_instructor(self, course_id):
+        return course_id in self.instructor_course_ids
+
+    def can_manage(self, course_id):
+        """Staff or the course's instructor."""
+        return self.is_staff or self.is_instructor(course_id)
+
+    def can_access(self, course_id):
+        """Staff, the course's instructor or an enrolled learner."""
+        return self.can_manage(course_id) or self.is_enrolled(course_id)
+
+
+def get_course_access(request):
+    """The CourseAccess of the request's user, created once per request."""
+    holder = getattr(request, '_request', request)
+    access = getattr(holder, '_course_access', None)
+    if access is None or access.user is not request.user:
+        access = CourseAccess(request.user)
+        holder._course_access = access
+    return access
+
+
+def _cached(obj, field_name):
+    """The related object behind `field_name` if it is already loaded, else None."""
+    field = obj._meta.get_field(field_name)
+    return getattr(obj, field_name) if field.is_cached(obj) else None
+
+
+def get_course_id(obj):
+    """
+    The ID of the course `obj` (a Course or a model below it) belongs to,
+    without lazily loading intermediate objects.
+    """
+    from .models import Choice, Course, Question, Topic
+    if isinstance(obj, Course):
+        return obj.pk
+    if hasattr(obj, 'course_id'):
+        return obj.course_id
+    if isinstance(obj, Topic):
+        module = _cached(obj, 'module')
+        if module is not None:
+            return module.course_id
+        return Topic.objects.filter(pk=obj.pk).values_list('module__course_id', flat=True).first()
+    if isinstance(obj, Question):
+        topic = _cached(obj, 'topic')
+        if topic is not None:
+            return get_course_id(topic)
+        return Question.objects.filter(pk=obj.pk).values_list('topic__module__course_id', flat=True).first()
+    if isinstance(obj, Choice):
+        question = _cached(obj, 'question')
+        if question is not None:
+            return get_course_id(question)
+        return Choice.objects.filter(pk=obj.pk).values_list('question__topic__module__course_id', flat=True).first()
+    if hasattr(obj, 'topic_id'):  # QuizAttempt, TopicProgress
+        topic = _cached(obj, 'topic')
+        if topic is not None:
+            return get_course_id(topic)
+        return Topic.objects.filter(pk=obj.topic_id).values_list('module__course_id', flat=True).first()
+    return None
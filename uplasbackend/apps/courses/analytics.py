@@ -0,0 +1,250 @@
+# apps/courses/analytics.py
+"""
+Instructor analytics: enrollments over time, the module completion funnel
+and per-question correctness.
+
+The endpoints never aggregate the transactional tables. `run_rollups` (run on
+a schedule by the `rollup_course_analytics` command) folds the rows added
+since each source's watermark into daily rollups - CourseDailyStats,
+TopicDailyCompletions and QuestionDailyStats - with one grouped query per
+source over its indexed timestamp, then advances the watermark in the same
+transaction. Only rows older than ROLLUP_SETTLE_SECONDS are taken, so rows
+from transactions still in flight at the watermark are not skipped. The
+rollups are append-only: deleting an enrollment or an attempt does not
+subtract it again.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    AnalyticsWatermark, CourseDailyStats, Enrollment, Module, QuestionDailyStats, QuizAttempt, Topic,
+    TopicDailyCompletions, TopicProgress, UserTopicAttemptAnswer,
+)
+
+ROLLUP_SETTLE_SECONDS = getattr(settings, 'COURSE_ANALYTICS_SETTLE_SECONDS', 60)
+DEFAULT_SERIES_DAYS = 30
+MAX_SERIES_DAYS = 366
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class AnalyticsError(ValueError):
+    """Raised for invalid analytics date ranges."""
+
+
+# --- Rollup job ---
+
+def _enrollment_rows(start, end):
+    return (
+        Enrollment.objects.filter(enrolled_at__gt=start, enrolled_at__lte=end)
+        .annotate(date=TruncDate('enrolled_at'))
+        .values('course_id', 'date')
+        .annotate(enrollments=Count('id'))
+        .order_by()
+    )
+
+
+def _completion_rows(start, end):
+    return (
+        TopicProgress.objects.filter(is_completed=True, completed_at__gt=start, completed_at__lte=end)
+        .annotate(date=TruncDate('completed_at'))
+        .values('topic_id', 'date', course_id=F('topic__module__course_id'))
+        .annotate(completions=Count('id'))
+        .order_by()
+    )
+
+
+def _course_topic_completion_rows(start, end):
+    return (
+        TopicProgress.objects.filter(is_completed=True, completed_at__gt=start, completed_at__lte=end)
+        .annotate(date=TruncDate('completed_at'))
+        .values('date', course_id=F('topic__module__course_id'))
+        .annotate(topic_completions=Count('id'))
+        .order_by()
+    )
+
+
+def _attempt_rows(start, end):
+    return (
+        QuizAttempt.objects.filter(submitted_at__gt=start, submitted_at__lte=end)
+        .annotate(date=TruncDate('submitted_at'))
+        .values('date', course_id=F('topic__module__course_id'))
+        .annotate(quiz_attempts=Count('id'))
+        .order_by()
+    )
+
+
+def _answer_rows(start, end):
+    return (
+        UserTopicAttemptAnswer.objects.filter(quiz_attempt__submitted_at__gt=start, quiz_attempt__submitted_at__lte=end)
+        .annotate(date=TruncDate('quiz_attempt__submitted_at'))
+        .values('question_id', 'date', course_id=F('question__topic__module__course_id'))
+        .annotate(answers=Count('id'), correct_answers=Count('id', filter=Q(is_correct=True)))
+        .order_by()
+    )
+
+
+# source -> (grouped rows of new activity, rollup model, rollup key fields, counters)
+ROLLUP_SOURCES = {
+    'enrollments': (_enrollment_rows, CourseDailyStats, ['course_id', 'date'], ['enrollments']),
+    'course_topic_completions': (
+        _course_topic_completion_rows, CourseDailyStats, ['course_id', 'date'], ['topic_completions'],
+    ),
+    'quiz_attempts': (_attempt_rows, CourseDailyStats, ['course_id', 'date'], ['quiz_attempts']),
+    'topic_completions': (_completion_rows, TopicDailyCompletions, ['topic_id', 'date'], ['completions']),
+    'answers': (_answer_rows, QuestionDailyStats, ['question_id', 'date'], ['answers', 'correct_answers']),
+}
+
+
+def accumulate(model, key_fields, rows, counters):
+    """
+    Adds the `counters` of `rows` (dicts of model attnames) to the rollup rows
+    with the same `key_fields`, creating missing ones. Two queries plus the writes.
+    Returns the number of rollup rows touched.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    lookup = {f'{field}__in': {row[field] for row in rows} for field in key_fields}
+    existing = {
+        tuple(getattr(obj, field) for field in key_fields): obj
+        for obj in model.objects.filter(**lookup)
+    }
+    to_update, to_create = [], []
+    for row in rows:
+        obj = existing.get(tuple(row[field] for field in key_fields))
+        if obj is None:
+            to_create.append(model(**row))
+            continue
+        for counter in counters:
+            setattr(obj, counter, getattr(obj, counter) + row[counter])
+        to_update.append(obj)
+    model.objects.bulk_update(to_update, counters, batch_size=1000)
+    model.objects.bulk_create(to_create, batch_size=1000)
+    return len(rows)
+
+
+def run_rollups(sources=None, until=None):
+    """
+    Folds the activity recorded since each source's watermark into the daily
+    rollups. Returns {source: rollup rows touched}.
+    """
+    until = until or timezone.now() - datetime.timedelta(seconds=ROLLUP_SETTLE_SECONDS)
+    touched = {}
+    for source in sources or ROLLUP_SOURCES:
+        rows_for, model, key_fields, counters = ROLLUP_SOURCES[source]
+        with transaction.atomic():
+            AnalyticsWatermark.objects.get_or_create(source=source, defaults={'processed_until': EPOCH})
+            # Locks the watermark so overlapping runs cannot fold the same rows twice
+            watermark = AnalyticsWatermark.objects.select_for_update().get(source=source)
+            if watermark.processed_until >= until:
+                touched[source] = 0
+                continue
+            touched[source] = accumulate(model, key_fields, rows_for(watermark.processed_until, until), counters)
+            watermark.processed_until = until
+            watermark.save(update_fields=['processed_until', 'updated_at'])
+    return touched
+
+
+# --- Reads (rollup tables only) ---
+
+def parse_date_range(params, default_days=None):
+    """
+    Reads `start`/`end` (YYYY-MM-DD, inclusive) from query params. Without a
+    `start`, the range covers `default_days` up to `end` (or is open when None).
+    """
+    try:
+        end = datetime.date.fromisoformat(params['end']) if params.get('end') else timezone.now().date()
+        start = datetime.date.fromisoformat(params['start']) if params.get('start') else None
+    except ValueError:
+        raise AnalyticsError("Dates must be given as YYYY-MM-DD.")
+    if start is None and default_days:
+        start = end - datetime.timedelta(days=default_days - 1)
+    if start is not None:
+        if start > end:
+            raise AnalyticsError("'start' must not be after 'end'.")
+        if default_days and (end - start).days >= MAX_SERIES_DAYS:
+            raise AnalyticsError(f"A series covers at most {MAX_SERIES_DAYS} days.")
+    return start, end
+
+
+def _in_range(queryset, start, end):
+    queryset = queryset.filter(date__lte=end)
+    return queryset.filter(date__gte=start) if start else queryset
+
+
+def enrollment_series(course_id, start, end):
+    """Daily enrollments, topic completions and quiz attempts, with a zero row for every quiet day."""
+    stats = {
+        row['date']: row
+        for row in _in_range(CourseDailyStats.objects.filter(course_id=course_id), start, end)
+        .values('date', 'enrollments', 'topic_completions', 'quiz_attempts')
+    }
+    series = []
+    day = start
+    while day <= end:
+        row = stats.get(day) or {'enrollments': 0, 'topic_completions': 0, 'quiz_attempts': 0}
+        series.append({
+            'date': day,
+            'enrollments': row['enrollments'],
+            'topic_completions': row['topic_completions'],
+            'quiz_attempts': row['quiz_attempts'],
+        })
+        day += datetime.timedelta(days=1)
+    return series
+
+
+def completion_funnel(course_id, start=None, end=None):
+    """
+    Modules in order with the learners who completed each of their topics.
+    A module's `completions` is the count for its last topic, the usual
+    "finished the module" step of a funnel.
+    """
+    totals = dict(
+        _in_range(TopicDailyCompletions.objects.filter(course_id=course_id), start, end)
+        .values('topic_id').annotate(total=Sum('completions')).order_by()
+        .values_list('topic_id', 'total')
+    )
+    enrollments = (
+        _in_range(CourseDailyStats.objects.filter(course_id=course_id), start, end)
+        .aggregate(total=Sum('enrollments'))['total'] or 0
+    )
+    modules = {
+        module_id: {'id': module_id, 'title': title, 'order': order, 'topics': [], 'completions': 0}
+        for module_id, title, order in Module.objects.filter(course_id=course_id)
+        .order_by('order').values_list('id', 'title', 'order')
+    }
+    topics = Topic.objects.filter(module__course_id=course_id).order_by('module_id', 'order')
+    for topic_id, module_id, title in topics.values_list('id', 'module_id', 'title'):
+        modules[module_id]['topics'].append({'id': topic_id, 'title': title, 'completions': totals.get(topic_id, 0)})
+    for module in modules.values():
+        if module['topics']:
+            module['completions'] = module['topics'][-1]['completions']
+    return {'enrollments': enrollments, 'modules': list(modules.values())}
+
+
+def question_difficulty(course_id, start=None, end=None):
+    """Answers and correctness rate per question, hardest (lowest rate) first."""
+    rows = (
+        _in_range(QuestionDailyStats.objects.filter(course_id=course_id), start, end)
+        .values('question_id', 'question__text', 'question__topic_id', 'question__topic__title')
+        .annotate(answers=Sum('answers'), correct_answers=Sum('correct_answers'))
+        .order_by()
+    )
+    questions = [
+        {
+            'id': row['question_id'],
+            'text': row['question__text'],
+            'topic': {'id': row['question__topic_id'], 'title': row['question__topic__title']},
+            'answers': row['answers'],
+            'correct_answers': row['correct_answers'],
+            'correct_rate': round(row['correct_answers'] / row['answers'], 4) if row['answers'] else None,
+        }
+        for row in rows
+    ]
+    questions.sort(key=lambda q: (q['correct_rate'] is None, q['correct_rate'] or 0, -q['answers']))
+    return questions
@@ -1,7 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 from django.utils.translation import gettext_lazy as _
 
 
+def repair_search_index(sender, using, **kwargs):
+    # Table rebuilds by later migrations drop the SQLite search triggers of 0004
+    from django.db import connections
+    from .search import ensure_search_index
+    ensure_search_index(connections[using])
+
+
 class CoursesConfig(AppConfig):
     """
     Application configuration for the 'courses' app.
@@ -24,4 +32,5 @@ class CoursesConfig(AppConfig):
             pass
         # If you had a dedicated signals.py, you would import it like so:
         # import apps.courses.signals
+        post_migrate.connect(repair_search_index, sender=self)
 
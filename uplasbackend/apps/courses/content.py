@@ -0,0 +1,34 @@
+# apps/courses/content.py
+"""
+Topic bodies.
+
+`Topic.content` can be large, so list and outline endpoints defer it and the
+body is served on its own by TopicViewSet.content. Bodies are cached under a
+key that includes the topic's ETag (derived from updated_at), so a saved
+topic is picked up without explicit invalidation.
+"""
+from django.core.cache import cache
+
+from .models import Topic
+
+TOPIC_CONTENT_CACHE_TIMEOUT = 60 * 60
+
+
+def topic_content_etag(topic):
+    return f'"{topic.pk}-{int(topic.updated_at.timestamp() * 1000000)}"'
+
+
+def get_topic_content(topic, etag=None):
+    """Returns {'id', 'slug', 'content', 'updated_at'} for a topic loaded with content deferred."""
+    etag = etag or topic_content_etag(topic)
+    key = "courses:topic:content:" + etag.strip('"')
+    content = cache.get(key)
+    if content is None:
+        content = Topic.objects.filter(pk=topic.pk).values_list('content', flat=True).first()
+        cache.set(key, content, TOPIC_CONTENT_CACHE_TIMEOUT)
+    return {
+        'id': topic.pk,
+        'slug': topic.slug,
+        'content': content,
+        'updated_at': topic.updated_at,
+    }
@@ -0,0 +1,178 @@
+# apps/courses/enrollment.py
+"""
+Course enrollment, for single learners and for whole cohorts.
+
+Bulk enrollment consumes its input (CSV or NDJSON, one learner per row) as a
+stream and works in fixed-size batches: each batch resolves its users with one
+query, inserts Enrollment and CourseProgress rows with bulk_create (ignoring
+rows that already exist) and moves Course.total_enrollments once. Per-row
+results are yielded as they are produced so callers can stream them back
+without holding the whole cohort in memory.
+"""
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .access import invalidate_user_access
+from .models import CourseProgress, Enrollment, Topic
+from .statistics import apply_enrollment_delta
+
+User = get_user_model()
+
+BULK_ENROLL_BATCH_SIZE = 1000
+
+INPUT_FORMATS = ('csv', 'ndjson')
+
+# Per-row result statuses
+ENROLLED = 'enrolled'
+ALREADY_ENROLLED = 'already_enrolled'
+DUPLICATE = 'duplicate'
+USER_NOT_FOUND = 'user_not_found'
+INVALID = 'invalid'
+
+
+class AlreadyEnrolledError(Exception):
+    """Raised when enrolling a user in a course they are already enrolled in."""
+
+
+def enroll_user(user, course):
+    """Enrolls a single user and creates their progress row. Returns the Enrollment."""
+    with transaction.atomic():
+        enrollment, created = Enrollment.objects.get_or_create(user=user, course=course)
+        if not created:
+            raise AlreadyEnrolledError(course.pk)
+        CourseProgress.objects.create(
+            user=user,
+            course=course,
+            enrollment=enrollment,
+            total_topics_count=Topic.objects.filter(module__course=course).count(),
+        )
+    return enrollment
+
+
+def detect_format(filename, default='csv'):
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_text_lines(stream, encoding='utf-8'):
+    """Wraps a binary file-like object so it can be read line by line as text."""
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, newline='')
+
+
+def parse_cohort_rows(lines, input_format):
+    """
+    Yields (row_number, email) for every learner in the input. CSV input uses
+    an `email` column when there is a header row, otherwise the first column;
+    NDJSON input expects objects with a string `email`. Rows that cannot be
+    parsed yield an email of None.
+    """
+    if input_format == 'ndjson':
+        for row_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield row_number, None
+                continue
+            email = record.get('email') if isinstance(record, dict) else None
+            yield row_number, email if isinstance(email, str) else None
+        return
+
+    reader = csv.reader(lines)
+    email_index = 0
+    for row_number, row in enumerate(reader, start=1):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        cells = [cell.strip() for cell in row]
+        if row_number == 1 and 'email' in [cell.lower() for cell in cells]:
+            email_index = [cell.lower() for cell in cells].index('email')
+            continue
+        yield row_number, cells[email_index] if email_index < len(cells) else None
+
+
+def _enroll_batch(course, batch, total_topics):
+    """Enrolls one batch of (row_number, email) pairs and returns its per-row results."""
+    emails = {email for _row, email in batch}
+    users = dict(User.objects.filter(email__in=emails).values_list('email', 'id'))
+    already = set(
+        Enrollment.objects.filter(course=course, user_id__in=users.values()).values_list('user_id', flat=True)
+    )
+
+    with transaction.atomic():
+        pending = {
+            user_id: Enrollment(user_id=user_id, course=course)
+            for user_id in users.values() if user_id not in already
+        }
+        Enrollment.objects.bulk_create(pending.values(), ignore_conflicts=True)
+        # With ignore_conflicts the generated primary keys are only trustworthy for rows
+        # that were actually inserted, so read back which enrollments are ours.
+        inserted = {
+            user_id for user_id, enrollment_id in Enrollment.objects.filter(
+                course=course, user_id__in=pending.keys()
+            ).values_list('user_id', 'id')
+            if pending[user_id].pk == enrollment_id
+        }
+        CourseProgress.objects.bulk_create([
+            CourseProgress(user_id=user_id, course=course, enrollment=pending[user_id], total_topics_count=total_topics)
+            for user_id in inserted
+        ], ignore_conflicts=True)
+        apply_enrollment_delta(course.pk, len(inserted))
+    # bulk_create skips the Enrollment signals that normally do this
+    invalidate_user_access(*inserted)
+
+    results = []
+    for row_number, email in batch:
+        user_id = users.get(email)
+        if user_id is None:
+            status = USER_NOT_FOUND
+        elif user_id in inserted:
+            status = ENROLLED
+        else:
+            status = ALREADY_ENROLLED
+        results.append({'row': row_number, 'email': email, 'status': status})
+    return results
+
+
+def summarize(results, counts):
+    """Yields `results` unchanged while tallying their statuses into `counts`."""
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        yield result
+
+
+def bulk_enroll(course, rows, batch_size=BULK_ENROLL_BATCH_SIZE):
+    """
+    Enrolls the learners in `rows` (an iterable of (row_number, email)) in
+    `course`, yielding one result dict per row. Rows that are rejected before
+    reaching the database (invalid, duplicate) are reported immediately, the
+    others when their batch is written.
+    """
+    total_topics = Topic.objects.filter(module__course=course).count()
+    seen = set()
+    batch = []
+    for row_number, email in rows:
+        email = User.objects.normalize_email(email.strip()) if email else ''
+        if not email or '@' not in email:
+            yield {'row': row_number, 'email': email or None, 'status': INVALID}
+            continue
+        if email in seen:
+            yield {'row': row_number, 'email': email, 'status': DUPLICATE}
+            continue
+        seen.add(email)
+        batch.append((row_number, email))
+        if len(batch) >= batch_size:
+            yield from _enroll_batch(course, batch, total_topics)
+            batch = []
+    if batch:
+        yield from _enroll_batch(course, batch, total_topics)
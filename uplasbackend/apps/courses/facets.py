@@ -0,0 +1,137 @@
+# apps/courses/facets.py
+"""
+Facet counts for the course catalog.
+
+All facets (category, level, language, is_free, price band) are computed for
+the current filter set with a single GROUP BY over the combination of facet
+values; the per-facet counts are then rolled up in Python. Responses for
+anonymous users are cached by their normalized query string and dropped as a
+whole whenever a course changes (see the Course signals in models.py), so
+only with a shared cache (see apps/core/caching.py).
+"""
+from collections import Counter
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+from rest_framework.filters import BaseFilterBackend
+
+from apps.core.caching import invalidated_cache_timeout
+
+FACET_VERSION_KEY = "courses:facets:version"
+
+# (key, lower bound inclusive, upper bound exclusive); None means unbounded
+PRICE_BANDS = [
+    ('free', None, Decimal('0.01')),
+    ('under_25', Decimal('0.01'), Decimal('25')),
+    ('25_to_50', Decimal('25'), Decimal('50')),
+    ('50_to_100', Decimal('50'), Decimal('100')),
+    ('over_100', Decimal('100'), None),
+]
+
+FACET_FIELDS = ['category__slug', 'level', 'language', 'is_free']
+
+# Query parameters that do not change which courses match
+IGNORED_PARAMS = {'page', 'page_size', 'ordering', 'format'}
+
+
+def price_band_condition(lower, upper):
+    condition = Q()
+    if lower is not None:
+        condition &= Q(price__gte=lower)
+    if upper is not None:
+        condition &= Q(price__lt=upper)
+    return condition
+
+
+def price_band_expression():
+    return Case(
+        *[When(price_band_condition(lower, upper), then=Value(key)) for key, lower, upper in PRICE_BANDS],
+        output_field=CharField(),
+    )
+
+
+class PriceBandFilter(BaseFilterBackend):
+    """Filters on ?price_band=<key>, accepting several comma-separated bands."""
+    param = 'price_band'
+
+    def filter_queryset(self, request, queryset, view):
+        requested = {band for band in request.query_params.get(self.param, '').split(',') if band}
+        if not requested:
+            return queryset
+        condition = Q()
+        for key, lower, upper in PRICE_BANDS:
+            if key in requested:
+                condition |= price_band_condition(lower, upper)
+        return queryset.filter(condition) if condition else queryset.none()
+
+
+def compute_facets(queryset):
+    """
+    Returns {facet: [{'value', 'count'}, ...]} for every facet, computed from
+    one grouped query over `queryset`.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(price_band=price_band_expression())
+        .values(*FACET_FIELDS, 'price_band')
+        .annotate(count=Count('id'))
+    )
+    counters = {facet: Counter() for facet in FACET_FIELDS + ['price_band']}
+    total = 0
+    for row in rows:
+        count = row.pop('count')
+        total += count
+        for facet, value in row.items():
+            counters[facet][value] += count
+
+    facets = {
+        facet: [{'value': value, 'count': count} for value, count in counter.most_common() if value is not None]
+        for facet, counter in counters.items()
+    }
+    # Keep price bands in their natural order, including empty ones
+    facets['price_band'] = [{'value': key, 'count': counters['price_band'][key]} for key, _lower, _upper in PRICE_BANDS]
+    return {'total': total, 'facets': facets}
+
+
+def normalized_query_string(query_params):
+    """Sorted, de-duplicated query string without pagination/ordering parameters."""
+    items = sorted(
+        (key, value)
+        for key in query_params
+        if key not in IGNORED_PARAMS
+        for value in set(query_params.getlist(key))
+        if value != ''
+    )
+    return urlencode(items)
+
+
+def facet_cache_timeout():
+    """Seconds anonymous facet counts stay cached; 0 (computed per request) without a shared cache."""
+    return invalidated_cache_timeout('COURSE_FACET_CACHE_TIMEOUT', 60 * 10)
+
+
+def facet_cache_key(query_params):
+    version = cache.get_or_set(FACET_VERSION_KEY, 1, None)
+    return f"courses:facets:{version}:{normalized_query_string(query_params)}"
+
+
+def invalidate_facets():
+    try:
+        cache.incr(FACET_VERSION_KEY)
+    except ValueError:
+        cache.set(FACET_VERSION_KEY, 1, None)
+
+
+def get_facets(request, queryset):
+    """Computes facets for `queryset`, cached for anonymous requests."""
+    timeout = facet_cache_timeout()
+    if not timeout or (request.user and request.user.is_authenticated):
+        return compute_facets(queryset)
+    key = facet_cache_key(request.query_params)
+    data = cache.get(key)
+    if data is None:
+        data = compute_facets(queryset)
+        cache.set(key, data, timeout)
+    return data
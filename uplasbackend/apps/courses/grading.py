@@ -0,0 +1,155 @@
+# apps/courses/grading.py
+"""
+Quiz grading against a per-topic answer key.
+
+The answer key (Question -> correct Choice IDs) is built with two queries per
+topic. With a shared cache it is cached for COURSE_ANSWER_KEY_CACHE_TIMEOUT
+seconds (6 hours by default) until a Question or Choice of that topic changes
+(see the signals in models.py). The invalidation only reaches the cache it
+runs against, so with the default per-process LocMem cache the key is not
+cached at all. Otherwise the other workers would grade against a corrected
+answer for hours (see apps/core/caching.py). A whole quiz is graded in memory
+and persisted with a fixed number of queries: one QuizAttempt insert plus
+bulk inserts for the answers and their selected_choices through-rows.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.caching import invalidated_cache_timeout
+
+from .models import Choice, Question, QuizAttempt, TopicProgress, UserTopicAttemptAnswer
+
+
+def answer_key_cache_timeout():
+    """Seconds an answer key stays cached; 0 (built per submission) without a shared cache."""
+    return invalidated_cache_timeout('COURSE_ANSWER_KEY_CACHE_TIMEOUT', 60 * 60 * 6)
+
+
+class QuizGradingError(ValueError):
+    """Raised when a submission references questions or choices outside the topic."""
+
+
+def answer_key_cache_key(topic_id):
+    return f"courses:grading:answer_key:{topic_id}"
+
+
+def build_answer_key(topic_id):
+    """
+    Returns {question_id: {'question_type', 'explanation', 'choices', 'correct'}}
+    for a topic, using one query for questions and one for choices.
+    """
+    answer_key = {
+        question['id']: {
+            'question_type': question['question_type'],
+            'explanation': question['explanation'],
+            'choices': set(),
+            'correct': set(),
+        }
+        for question in Question.objects.filter(topic_id=topic_id).values('id', 'question_type', 'explanation')
+    }
+    choices = Choice.objects.filter(question__topic_id=topic_id).values_list('question_id', 'id', 'is_correct')
+    for question_id, choice_id, is_correct in choices:
+        entry = answer_key.get(question_id)
+        if entry is None:
+            continue
+        entry['choices'].add(choice_id)
+        if is_correct:
+            entry['correct'].add(choice_id)
+    return answer_key
+
+
+def get_answer_key(topic_id):
+    timeout = answer_key_cache_timeout()
+    if not timeout:
+        return build_answer_key(topic_id)
+    key = answer_key_cache_key(topic_id)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = build_answer_key(topic_id)
+        cache.set(key, answer_key, timeout)
+    return answer_key
+
+
+def invalidate_answer_key(topic_id):
+    if topic_id:
+        cache.delete(answer_key_cache_key(topic_id))
+
+
+def is_answer_correct(entry, selected_choice_ids):
+    selected = set(selected_choice_ids)
+    if not selected:
+        return False
+    if entry['question_type'] == 'single-choice' and len(selected) != 1:
+        return False
+    return selected == entry['correct']
+
+
+def grade_answers(answer_key, answers):
+    """
+    Grades `answers` (a list of {'question_id', 'selected_choice_ids'}) in memory.
+    Returns a list of per-question results in submission order.
+    """
+    results = []
+    seen = set()
+    for answer in answers:
+        question_id = answer['question_id']
+        selected = list(dict.fromkeys(answer.get('selected_choice_ids') or []))
+        entry = answer_key.get(question_id)
+        if entry is None:
+            raise QuizGradingError(f"Question '{question_id}' does not belong to this topic.")
+        if question_id in seen:
+            raise QuizGradingError(f"Question '{question_id}' was answered more than once.")
+        seen.add(question_id)
+        foreign = [choice_id for choice_id in selected if choice_id not in entry['choices']]
+        if foreign:
+            raise QuizGradingError(f"Choice '{foreign[0]}' does not belong to question '{question_id}'.")
+        results.append({
+            'question_id': question_id,
+            'selected_choice_ids': selected,
+            'is_correct': is_answer_correct(entry, selected),
+            'explanation': entry['explanation'],
+        })
+    return results
+
+
+def submit_quiz(user, topic, answers):
+    """
+    Grades and persists a whole-quiz submission for `topic`.
+    Unanswered questions count as incorrect.
+    """
+    answer_key = get_answer_key(topic.id)
+    results = grade_answers(answer_key, answers)
+    total_questions = len(answer_key)
+    correct_answers = sum(1 for result in results if result['is_correct'])
+    score = round(correct_answers / total_questions * 100, 2) if total_questions else 0.0
+
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.create(
+            user=user,
+            topic=topic,
+            topic_progress=TopicProgress.objects.filter(user=user, topic=topic).first(),
+            score=score,
+            correct_answers=correct_answers,
+            total_questions_in_topic=total_questions,
+        )
+        answer_rows = [
+            UserTopicAttemptAnswer(quiz_attempt=attempt, question_id=result['question_id'], is_correct=result['is_correct'])
+            for result in results
+        ]
+        UserTopicAttemptAnswer.objects.bulk_create(answer_rows)
+
+        Through = UserTopicAttemptAnswer.selected_choices.through
+        Through.objects.bulk_create([
+            Through(usertopicattemptanswer_id=row.pk, choice_id=choice_id)
+            for row, result in zip(answer_rows, results)
+            for choice_id in result['selected_choice_ids']
+        ])
+
+    return {
+        'id': attempt.id,
+        'topic_id': topic.id,
+        'score': score,
+        'correct_answers': correct_answers,
+        'total_questions_in_topic': total_questions,
+        'results': results,
+    }
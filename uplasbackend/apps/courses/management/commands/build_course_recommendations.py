@@ -0,0 +1,20 @@
+# apps/courses/management/commands/build_course_recommendations.py
+from django.core.management.base import BaseCommand
+
+from apps.courses.recommendations import MIN_CO_ENROLLMENTS, TOP_K, rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the precomputed \"learners also took\" course recommendations from enrollments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', action='append', dest='course_ids', metavar='COURSE_ID',
+                            help="Only rebuild the recommendations of this course (may be repeated).")
+        parser.add_argument('--top-k', type=int, default=TOP_K)
+        parser.add_argument('--min-co-enrollments', type=int, default=MIN_CO_ENROLLMENTS)
+
+    def handle(self, *args, **options):
+        written = rebuild_recommendations(
+            course_ids=options['course_ids'], k=options['top_k'], min_co_enrollments=options['min_co_enrollments']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} course recommendation(s)."))
@@ -0,0 +1,45 @@
+# apps/courses/management/commands/bulk_enroll.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.enrollment import (
+    BULK_ENROLL_BATCH_SIZE, ENROLLED, INPUT_FORMATS, bulk_enroll, detect_format, parse_cohort_rows, summarize
+)
+from apps.courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Enrolls a cohort of existing users (CSV or NDJSON file of emails) in a course."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_slug')
+        parser.add_argument('path', help="CSV (email column or first column) or NDJSON ({\"email\": ...}) file.")
+        parser.add_argument('--format', choices=INPUT_FORMATS, dest='input_format',
+                            help="Input format; detected from the file extension by default.")
+        parser.add_argument('--batch-size', type=int, default=BULK_ENROLL_BATCH_SIZE)
+        parser.add_argument('--report', metavar='PATH', help="Write every per-row result to this NDJSON file.")
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.get(slug=options['course_slug'])
+        except Course.DoesNotExist:
+            raise CommandError(f"Course '{options['course_slug']}' does not exist.")
+        input_format = options['input_format'] or detect_format(options['path'])
+
+        counts = {}
+        report = open(options['report'], 'w', encoding='utf-8') if options['report'] else None
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as lines:
+                rows = parse_cohort_rows(lines, input_format)
+                for result in summarize(bulk_enroll(course, rows, batch_size=options['batch_size']), counts):
+                    if report:
+                        report.write(json.dumps(result) + "\n")
+                    if result['status'] != ENROLLED and options['verbosity'] > 1:
+                        self.stdout.write(f"Row {result['row']}: {result['email']} {result['status']}")
+        finally:
+            if report:
+                report.close()
+
+        summary = ", ".join(f"{status}={count}" for status, count in sorted(counts.items())) or "no rows"
+        self.stdout.write(self.style.SUCCESS(f"Bulk enrollment into '{course.slug}' finished: {summary}."))
@@ -0,0 +1,27 @@
+# apps/courses/management/commands/export_course.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.models import Course
+from apps.courses.packaging import export_course
+
+
+class Command(BaseCommand):
+    help = "Writes a course and its modules, topics, questions and choices as an NDJSON course package."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_slug')
+        parser.add_argument('-o', '--output', metavar='PATH', help="Output file (defaults to stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.get(slug=options['course_slug'])
+        except Course.DoesNotExist:
+            raise CommandError(f"Course '{options['course_slug']}' does not exist.")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(export_course(course))
+            self.stderr.write(self.style.SUCCESS(f"Exported '{course.slug}' to {options['output']}."))
+        else:
+            for line in export_course(course):
+                self.stdout.write(line, ending='')
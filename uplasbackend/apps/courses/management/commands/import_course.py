@@ -0,0 +1,30 @@
+# apps/courses/management/commands/import_course.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.packaging import CoursePackageError, import_course
+
+
+class Command(BaseCommand):
+    help = "Creates a course from an NDJSON course package produced by export_course."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--instructor', required=True, metavar='EMAIL', help="Email of the instructor who will own the course.")
+        parser.add_argument('--publish', action='store_true', help="Publish the course immediately.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            instructor = User.objects.get(email=options['instructor'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email '{options['instructor']}'.")
+
+        try:
+            with open(options['path'], encoding='utf-8') as lines:
+                course, counts = import_course(lines, instructor, publish=options['publish'])
+        except CoursePackageError as e:
+            raise CommandError(str(e))
+
+        summary = ", ".join(f"{count} {level}(s)" for level, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Imported course '{course.slug}' with {summary}."))
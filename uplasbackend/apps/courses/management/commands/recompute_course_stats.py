@@ -0,0 +1,17 @@
+# apps/courses/management/commands/recompute_course_stats.py
+from django.core.management.base import BaseCommand
+
+from apps.courses.statistics import reconcile_course_statistics
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized rating, review, enrollment and duration statistics of courses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', action='append', dest='course_ids', metavar='COURSE_ID',
+                            help="Only reconcile this course (may be repeated).")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = reconcile_course_statistics(course_ids=options['course_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled statistics for {updated} course(s)."))
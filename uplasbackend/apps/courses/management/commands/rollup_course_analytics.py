@@ -0,0 +1,20 @@
+# apps/courses/management/commands/rollup_course_analytics.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.analytics import ROLLUP_SOURCES, run_rollups
+
+
+class Command(BaseCommand):
+    help = "Folds new enrollments, topic completions and quiz answers into the daily instructor analytics rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', action='append', dest='sources', metavar='SOURCE',
+                            help=f"Only roll up this source (may be repeated): {', '.join(ROLLUP_SOURCES)}.")
+
+    def handle(self, *args, **options):
+        unknown = set(options['sources'] or []) - set(ROLLUP_SOURCES)
+        if unknown:
+            raise CommandError(f"Unknown source(s): {', '.join(sorted(unknown))}")
+        for source, touched in run_rollups(options['sources']).items():
+            self.stdout.write(f"{source}: {touched} rollup row(s) updated")
+        self.stdout.write(self.style.SUCCESS("Course analytics rollups are up to date."))
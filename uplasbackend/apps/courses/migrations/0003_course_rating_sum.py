@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='average_rating',
+            field=models.FloatField(db_index=True, default=0.0, editable=False),
+        ),
+    ]
@@ -0,0 +1,79 @@
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE courses_course ADD COLUMN search_document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(short_description, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(long_description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX courses_course_search_document_gin ON courses_course USING GIN (search_document)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS courses_course_search_document_gin",
+    "ALTER TABLE courses_course DROP COLUMN IF EXISTS search_document",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE courses_course_fts USING fts5(
+        course_id UNINDEXED, title, short_description, long_description,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_insert AFTER INSERT ON courses_course BEGIN
+        INSERT INTO courses_course_fts (course_id, title, short_description, long_description)
+        VALUES (NEW.id, NEW.title, NEW.short_description, NEW.long_description);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_update AFTER UPDATE OF title, short_description, long_description ON courses_course BEGIN
+        DELETE FROM courses_course_fts WHERE course_id = OLD.id;
+        INSERT INTO courses_course_fts (course_id, title, short_description, long_description)
+        VALUES (NEW.id, NEW.title, NEW.short_description, NEW.long_description);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_delete AFTER DELETE ON courses_course BEGIN
+        DELETE FROM courses_course_fts WHERE course_id = OLD.id;
+    END
+    """,
+    """
+    INSERT INTO courses_course_fts (course_id, title, short_description, long_description)
+    SELECT id, title, short_description, long_description FROM courses_course
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS courses_course_fts_insert",
+    "DROP TRIGGER IF EXISTS courses_course_fts_update",
+    "DROP TRIGGER IF EXISTS courses_course_fts_delete",
+    "DROP TABLE IF EXISTS courses_course_fts",
+]
+
+
+def run_for_vendor(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Database-maintained search document for courses (see apps/courses/search.py).
+    Backends other than PostgreSQL and SQLite are left untouched and use unranked matching.
+    """
+
+    dependencies = [
+        ('courses', '0003_course_rating_sum'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_for_vendor({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from apps.courses.statistics import reconcile_course_statistics
+
+
+def backfill_statistics(apps, schema_editor):
+    """
+    Recomputes the maintained course statistics. rating_sum (0003) was added as
+    0 for every course, so the first review after deploy would otherwise
+    average over a sum that is missing all earlier ratings.
+    """
+    reconcile_course_statistics(
+        models=[apps.get_model('courses', name) for name in ('Course', 'CourseReview', 'Enrollment', 'Topic')]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_statistics, migrations.RunPython.noop),
+    ]
@@ -5,7 +5,7 @@ from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.db.models import Avg, Count
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from apps.core.models import BaseModel
 
@@ -52,8 +52,9 @@ class Course(BaseModel):
     supports_ai_tutor = models.BooleanField(default=False)
     supports_tts = models.BooleanField(default=False, verbose_name=_('Supports Text-to-Speech'))
     supports_ttv = models.BooleanField(default=False, verbose_name=_('Supports Text-to-Video'))
-    average_rating = models.FloatField(default=0.0, editable=False)
+    average_rating = models.FloatField(default=0.0, editable=False, db_index=True)
     total_reviews = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
     total_enrollments = models.PositiveIntegerField(default=0, editable=False)
     total_duration_minutes = models.PositiveIntegerField(default=0, editable=False)
 
@@ -125,7 +126,7 @@ class Choice(BaseModel):
 class Enrollment(BaseModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='enrollments')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
-    enrolled_at = models.DateTimeField(auto_now_add=True)
+    enrolled_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = [['user', 'course']]
@@ -156,7 +157,7 @@ class TopicProgress(BaseModel):
     topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
     course_progress = models.ForeignKey(CourseProgress, on_delete=models.CASCADE, related_name='topic_progresses')
     is_completed = models.BooleanField(default=False)
-    completed_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     class Meta:
         unique_together = [['user', 'topic']]
@@ -168,10 +169,186 @@ class QuizAttempt(BaseModel):
     score = models.FloatField(default=0.0)
     correct_answers = models.PositiveIntegerField(default=0)
     total_questions_in_topic = models.PositiveIntegerField(default=0)
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
 class UserTopicAttemptAnswer(BaseModel):
     quiz_attempt = models.ForeignKey(QuizAttempt, on_delete=models.CASCADE, related_name='answers')
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_choices = models.ManyToManyField(Choice)
-    is_correct = models.BooleanField(default=False)
\ No newline at end of file
+    is_correct = models.BooleanField(default=False)
+
+class CourseRecommendation(BaseModel):
+    """Precomputed "learners also took" entry; rebuilt by recommendations.rebuild_recommendations."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='recommendations')
+    recommended_course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    co_enrollments = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['course', 'rank']
+        unique_together = [['course', 'recommended_course']]
+        indexes = [models.Index(fields=['course', 'rank'])]
+    def __str__(self): return f"{self.course_id} -> {self.recommended_course_id} (#{self.rank})"
+
+# --- Analytics rollups (filled by analytics.run_rollups) ---
+class CourseDailyStats(BaseModel):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    enrollments = models.PositiveIntegerField(default=0)
+    topic_completions = models.PositiveIntegerField(default=0)
+    quiz_attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [['course', 'date']]
+        ordering = ['course', 'date']
+
+class TopicDailyCompletions(BaseModel):
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='daily_completions')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    date = models.DateField()
+    completions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [['topic', 'date']]
+        indexes = [models.Index(fields=['course', 'date'])]
+
+class QuestionDailyStats(BaseModel):
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='daily_stats')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    date = models.DateField()
+    answers = models.PositiveIntegerField(default=0)
+    correct_answers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [['question', 'date']]
+        indexes = [models.Index(fields=['course', 'date'])]
+
+class AnalyticsWatermark(BaseModel):
+    """High-water mark of the source rows already folded into the rollups, per source."""
+    source = models.CharField(max_length=50, unique=True)
+    processed_until = models.DateTimeField()
+
+    def __str__(self): return f"{self.source} <= {self.processed_until}"
+
+# --- Signals ---
+
+@receiver(pre_save, sender=Course)
+def remember_course_instructor(sender, instance, update_fields=None, **kwargs):
+    # Previous instructor, so post_save only drops access entries when it changed
+    instance._previous_instructor_id = instance.instructor_id
+    if not instance._state.adding and (update_fields is None or 'instructor' in update_fields):
+        instance._previous_instructor_id = Course.objects.filter(pk=instance.pk).values_list('instructor_id', flat=True).first()
+
+@receiver(post_save, sender=Course)
+def invalidate_facets_on_course_save(sender, instance, **kwargs):
+    from .access import invalidate_user_access
+    from .facets import invalidate_facets
+    invalidate_facets()
+    previous_instructor_id = getattr(instance, '_previous_instructor_id', instance.instructor_id)
+    if previous_instructor_id != instance.instructor_id or kwargs['created']:
+        invalidate_user_access(previous_instructor_id, instance.instructor_id)
+
+@receiver(post_delete, sender=Course)
+def invalidate_facets_on_course_delete(sender, instance, **kwargs):
+    # Learners' entries are dropped by their cascaded Enrollment deletes
+    from .access import invalidate_user_access
+    from .facets import invalidate_facets
+    invalidate_facets()
+    invalidate_user_access(instance.instructor_id)
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def invalidate_outline_on_module_change(sender, instance, **kwargs):
+    from .navigation import invalidate_course_outline
+    invalidate_course_outline(instance.course_id)
+
+@receiver(pre_save, sender=Topic)
+def remember_topic_duration(sender, instance, **kwargs):
+    # Previous (course, duration) so post_save can apply the difference to Course.total_duration_minutes
+    instance._previous_duration = None
+    if not instance._state.adding:
+        instance._previous_duration = Topic.objects.filter(pk=instance.pk).values_list(
+            'module__course_id', 'estimated_duration_minutes'
+        ).first()
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def handle_topic_change(sender, instance, created=False, **kwargs):
+    from .navigation import invalidate_course_outline
+    from .progress import adjust_total_topics
+    from .statistics import apply_duration_delta
+    course_id = Module.objects.filter(pk=instance.module_id).values_list('course_id', flat=True).first()
+    invalidate_course_outline(course_id)
+    if kwargs.get('signal') is post_delete:
+        adjust_total_topics(course_id, -1)
+        apply_duration_delta(course_id, -instance.estimated_duration_minutes)
+    elif created:
+        adjust_total_topics(course_id, 1)
+        apply_duration_delta(course_id, instance.estimated_duration_minutes)
+    elif getattr(instance, '_previous_duration', None):
+        previous_course_id, previous_duration = instance._previous_duration
+        if previous_course_id != course_id:
+            invalidate_course_outline(previous_course_id)
+            apply_duration_delta(previous_course_id, -previous_duration)
+            apply_duration_delta(course_id, instance.estimated_duration_minutes)
+        else:
+            apply_duration_delta(course_id, instance.estimated_duration_minutes - previous_duration)
+
+@receiver(post_delete, sender=TopicProgress)
+def revoke_progress_on_topic_progress_delete(sender, instance, **kwargs):
+    if instance.is_completed:
+        from .progress import revoke_completed_topic
+        revoke_completed_topic(instance.course_progress_id)
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_answer_key_on_question_change(sender, instance, **kwargs):
+    from .grading import invalidate_answer_key
+    invalidate_answer_key(instance.topic_id)
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def invalidate_answer_key_on_choice_change(sender, instance, **kwargs):
+    from .grading import invalidate_answer_key
+    topic_id = Question.objects.filter(pk=instance.question_id).values_list('topic_id', flat=True).first()
+    invalidate_answer_key(topic_id)
+
+@receiver(pre_save, sender=CourseReview)
+def remember_review_rating(sender, instance, **kwargs):
+    instance._previous_rating = None
+    if not instance._state.adding:
+        instance._previous_rating = CourseReview.objects.filter(pk=instance.pk).values_list('course_id', 'rating').first()
+
+@receiver(post_save, sender=CourseReview)
+def update_course_rating_on_review_save(sender, instance, created, **kwargs):
+    from .statistics import apply_review_delta
+    if created:
+        apply_review_delta(instance.course_id, instance.rating, 1)
+    elif getattr(instance, '_previous_rating', None):
+        previous_course_id, previous_rating = instance._previous_rating
+        if previous_course_id != instance.course_id:
+            apply_review_delta(previous_course_id, -previous_rating, -1)
+            apply_review_delta(instance.course_id, instance.rating, 1)
+        else:
+            apply_review_delta(instance.course_id, instance.rating - previous_rating, 0)
+
+@receiver(post_delete, sender=CourseReview)
+def update_course_rating_on_review_delete(sender, instance, **kwargs):
+    from .statistics import apply_review_delta
+    apply_review_delta(instance.course_id, -instance.rating, -1)
+
+@receiver(post_save, sender=Enrollment)
+def increment_course_enrollments(sender, instance, created, **kwargs):
+    if created:
+        from .access import invalidate_user_access
+        from .statistics import apply_enrollment_delta
+        apply_enrollment_delta(instance.course_id, 1)
+        invalidate_user_access(instance.user_id)
+
+@receiver(post_delete, sender=Enrollment)
+def decrement_course_enrollments(sender, instance, **kwargs):
+    from .access import invalidate_user_access
+    from .statistics import apply_enrollment_delta
+    apply_enrollment_delta(instance.course_id, -1)
+    invalidate_user_access(instance.user_id)
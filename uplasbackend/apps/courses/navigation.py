@@ -0,0 +1,121 @@
+# apps/courses/navigation.py
+"""
+Course navigation tree for the lesson player sidebar.
+
+The Module -> Topic outline of a course is the same for every learner, so it is
+built with a fixed number of queries and cached per course (invalidated by
+signals in models.py, so only with a shared cache, see apps/core/caching.py).
+The learner's completion state is overlaid on top of the outline with one
+query.
+"""
+from django.core.cache import cache
+
+from apps.core.caching import invalidated_cache_timeout
+
+from .models import Module, Topic, TopicProgress
+
+
+def outline_cache_timeout():
+    """Seconds a course outline stays cached; 0 (built per request) without a shared cache."""
+    return invalidated_cache_timeout('COURSE_OUTLINE_CACHE_TIMEOUT', 60 * 60)
+
+
+def outline_cache_key(course_id):
+    return f"courses:navigation:outline:{course_id}"
+
+
+def build_course_outline(course_id):
+    """
+    Builds the user-independent outline of a course in two queries
+    (one for modules, one for all topics of the course).
+    """
+    modules = list(
+        Module.objects.filter(course_id=course_id)
+        .order_by('order')
+        .values('id', 'title', 'order')
+    )
+    topics_by_module = {module['id']: [] for module in modules}
+    topics = (
+        Topic.objects.filter(module__course_id=course_id)
+        .order_by('module__order', 'order')
+        .values('id', 'slug', 'title', 'order', 'module_id', 'is_previewable', 'estimated_duration_minutes')
+    )
+    for topic in topics:
+        module_id = topic.pop('module_id')
+        if module_id in topics_by_module:
+            topics_by_module[module_id].append(topic)
+
+    for module in modules:
+        module['topics'] = topics_by_module[module['id']]
+    return modules
+
+
+def get_course_outline(course_id):
+    """Returns the cached outline for a course, building it on a cache miss."""
+    timeout = outline_cache_timeout()
+    if not timeout:
+        return build_course_outline(course_id)
+    key = outline_cache_key(course_id)
+    outline = cache.get(key)
+    if outline is None:
+        outline = build_course_outline(course_id)
+        cache.set(key, outline, timeout)
+    return outline
+
+
+def invalidate_course_outline(course_id):
+    if course_id:
+        cache.delete(outline_cache_key(course_id))
+
+
+def get_completed_topic_ids(user, course_id):
+    """Single query for the set of topic IDs the user has completed in a course."""
+    if not user or not user.is_authenticated:
+        return set()
+    return set(
+        TopicProgress.objects.filter(
+            course_progress__user=user,
+            course_progress__course_id=course_id,
+            is_completed=True,
+        ).values_list('topic_id', flat=True)
+    )
+
+
+def build_navigation(course, user):
+    """
+    Returns the sidebar navigation tree for `course` with the completion
+    state of `user` applied.
+    """
+    outline = get_course_outline(course.id)
+    completed_ids = get_completed_topic_ids(user, course.id)
+
+    total_topics = 0
+    completed_topics = 0
+    modules_data = []
+    for module in outline:
+        topics_data = []
+        for topic in module['topics']:
+            is_completed = topic['id'] in completed_ids
+            total_topics += 1
+            completed_topics += int(is_completed)
+            topics_data.append({
+                "id": topic['id'],
+                "slug": topic['slug'],
+                "title": topic['title'],
+                "is_completed": is_completed,
+                "is_locked": False,
+            })
+        modules_data.append({
+            "id": module['id'],
+            "title": module['title'],
+            "topics": topics_data,
+        })
+
+    progress = round(completed_topics / total_topics * 100, 2) if total_topics else 0
+    return {
+        "title": course.title,
+        "progress": progress,
+        "completed_topics_count": completed_topics,
+        "total_topics_count": total_topics,
+        "modules": modules_data,
+    }
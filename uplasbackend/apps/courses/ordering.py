@@ -0,0 +1,63 @@
+# apps/courses/ordering.py
+"""
+Bulk reordering of modules, topics, questions and choices.
+
+Each level has unique_together = (parent, order), so rows cannot simply be
+renumbered one by one. `reorder_children` applies a complete new ordering in
+one transaction with a fixed number of queries using a two-phase offset:
+first the rows that move are shifted past the current maximum in a single
+UPDATE, then their final positions 1..n are written with one bulk_update,
+which can no longer collide with any existing (parent, order) pair.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import Choice, Module, Question, Topic
+
+# model -> parent foreign key attribute
+REORDERABLE = {
+    Module: 'course_id',
+    Topic: 'module_id',
+    Question: 'topic_id',
+    Choice: 'question_id',
+}
+
+
+class ReorderError(ValueError):
+    """Raised when the submitted ordering is not a permutation of the parent's children."""
+
+
+def reorder_children(model, parent_id, ordered_ids):
+    """
+    Renumbers the children of `parent_id` so that `ordered_ids` get orders
+    1..n. `ordered_ids` must list every child exactly once.
+    Returns the number of rows reordered.
+    """
+    parent_attr = REORDERABLE[model]
+    ordered_ids = list(ordered_ids)
+    with transaction.atomic():
+        siblings = model.objects.select_for_update().filter(**{parent_attr: parent_id})
+        current = dict(siblings.values_list('id', 'order'))
+        if len(ordered_ids) != len(set(ordered_ids)) or set(ordered_ids) != set(current):
+            raise ReorderError("The new ordering must list every item of the parent exactly once.")
+
+        target = {pk: position for position, pk in enumerate(ordered_ids, start=1)}
+        changed = [pk for pk in ordered_ids if current[pk] != target[pk]]
+        if not changed:
+            return 0
+
+        offset = max(current.values()) + len(ordered_ids) + 1
+        model.objects.filter(pk__in=changed).update(order=F('order') + offset)
+        model.objects.bulk_update([model(pk=pk, order=target[pk]) for pk in changed], ['order'])
+
+    _after_reorder(model, parent_id)
+    return len(changed)
+
+
+def _after_reorder(model, parent_id):
+    """Cache upkeep that the post_save signals would have done for individual saves."""
+    from .navigation import invalidate_course_outline
+    if model is Module:
+        invalidate_course_outline(parent_id)
+    elif model is Topic:
+        invalidate_course_outline(Module.objects.filter(pk=parent_id).values_list('course_id', flat=True).first())
@@ -0,0 +1,210 @@
+# apps/courses/packaging.py
+"""
+Course packages: the Course -> Module -> Topic -> Question -> Choice
+hierarchy as NDJSON, for moving courses between environments.
+
+A package is a header line followed by one line per object, parents before
+children:
+
+    {"type": "package", "version": 1}
+    {"type": "course", "ref": "<id>", "category": {...}, "fields": {...}}
+    {"type": "module", "ref": "<id>", "parent": "<course ref>", "fields": {...}}
+    {"type": "topic", ...}  {"type": "question", ...}  {"type": "choice", ...}
+
+Export is a generator running one iterator() query per level, so the
+course is never materialized in memory. Import validates the whole package,
+gives the course and topics fresh slugs where they collide with existing
+ones (the "-1", "-2"... series of apps/core/slugs.py), then bulk_creates
+each level in dependency order inside one transaction.
+"""
+import json
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+
+from apps.core.slugs import unique_slug, unique_slugs
+
+from .access import invalidate_user_access
+from .facets import invalidate_facets
+from .models import Category, Choice, Course, Module, Question, Topic
+
+PACKAGE_VERSION = 1
+EXPORT_CHUNK_SIZE = 500
+
+COURSE_FIELDS = [
+    'title', 'slug', 'short_description', 'long_description', 'language', 'level', 'price', 'currency',
+    'is_free', 'is_featured', 'thumbnail_url', 'promo_video_url', 'supports_ai_tutor', 'supports_tts', 'supports_ttv',
+]
+MODULE_FIELDS = ['title', 'description', 'order']
+TOPIC_FIELDS = [
+    'title', 'slug', 'content', 'estimated_duration_minutes', 'order', 'is_previewable',
+    'supports_ai_tutor', 'supports_tts', 'supports_ttv',
+]
+QUESTION_FIELDS = ['text', 'question_type', 'order', 'explanation']
+CHOICE_FIELDS = ['text', 'is_correct', 'order']
+
+# type -> (model, exported fields, parent type, parent FK attribute)
+LEVELS = {
+    'module': (Module, MODULE_FIELDS, 'course', 'course_id'),
+    'topic': (Topic, TOPIC_FIELDS, 'module', 'module_id'),
+    'question': (Question, QUESTION_FIELDS, 'topic', 'topic_id'),
+    'choice': (Choice, CHOICE_FIELDS, 'question', 'question_id'),
+}
+LEVEL_ORDER = ['module', 'topic', 'question', 'choice']
+
+
+class CoursePackageError(ValueError):
+    """Raised for malformed or inconsistent course packages."""
+
+
+def _line(record):
+    return json.dumps(record, default=str) + "\n"
+
+
+def export_course(course):
+    """Yields the NDJSON lines of a course package."""
+    yield _line({'type': 'package', 'version': PACKAGE_VERSION})
+    category = None
+    if course.category_id:
+        category = Category.objects.filter(pk=course.category_id).values('name', 'slug', 'description').first()
+    yield _line({
+        'type': 'course',
+        'ref': str(course.pk),
+        'category': category,
+        'fields': {field: getattr(course, field) for field in COURSE_FIELDS},
+    })
+
+    parent_filters = {
+        'module': {'course_id': course.pk},
+        'topic': {'module__course_id': course.pk},
+        'question': {'topic__module__course_id': course.pk},
+        'choice': {'question__topic__module__course_id': course.pk},
+    }
+    for level in LEVEL_ORDER:
+        model, fields, _parent_type, parent_attr = LEVELS[level]
+        rows = (
+            model.objects.filter(**parent_filters[level])
+            .order_by(parent_attr, 'order')
+            .values('id', parent_attr, *fields)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        for row in rows:
+            yield _line({
+                'type': level,
+                'ref': str(row.pop('id')),
+                'parent': str(row.pop(parent_attr)),
+                'fields': row,
+            })
+
+
+def read_package(lines):
+    """Parses and validates package lines. Returns (course_record, {level: [records]})."""
+    course_record = None
+    records = {level: [] for level in LEVEL_ORDER}
+    known_refs = {level: set() for level in ['course'] + LEVEL_ORDER}
+    header_seen = False
+
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise CoursePackageError(f"Line {line_number}: not valid JSON.")
+        record_type = record.get('type') if isinstance(record, dict) else None
+
+        if not header_seen:
+            if record_type != 'package' or record.get('version') != PACKAGE_VERSION:
+                raise CoursePackageError(f"Line {line_number}: expected a version {PACKAGE_VERSION} package header.")
+            header_seen = True
+            continue
+        if not isinstance(record.get('fields'), dict) or not record.get('ref'):
+            raise CoursePackageError(f"Line {line_number}: records need a 'ref' and a 'fields' object.")
+
+        if record_type == 'course':
+            if course_record is not None:
+                raise CoursePackageError(f"Line {line_number}: a package contains exactly one course.")
+            course_record = record
+        elif record_type in LEVELS:
+            parent_type = LEVELS[record_type][2]
+            if record.get('parent') not in known_refs[parent_type]:
+                raise CoursePackageError(f"Line {line_number}: {record_type} refers to an unknown {parent_type}.")
+            records[record_type].append(record)
+        else:
+            raise CoursePackageError(f"Line {line_number}: unknown record type '{record_type}'.")
+        known_refs[record_type].add(record['ref'])
+
+    if course_record is None:
+        raise CoursePackageError("The package does not contain a course.")
+    return course_record, records
+
+
+def import_course(lines, instructor, publish=False):
+    """
+    Creates a new course from a package. Returns the Course and a dict of
+    object counts per level. The course is imported unpublished unless
+    `publish` is set.
+    """
+    course_record, records = read_package(lines)
+    fields = {field: value for field, value in course_record['fields'].items() if field in COURSE_FIELDS}
+    if not fields.get('title') or not fields.get('slug'):
+        raise CoursePackageError("The course needs a title and a slug.")
+
+    topic_slugs = [record['fields'].get('slug') for record in records['topic']]
+    if not all(topic_slugs) or len(set(topic_slugs)) != len(topic_slugs):
+        raise CoursePackageError("Every topic needs a slug that is unique within the package.")
+
+    try:
+        course, counts = _create_course(course_record, records, fields, topic_slugs, instructor, publish)
+    except IntegrityError as e:
+        raise CoursePackageError(f"The package conflicts with existing data: {e}")
+    except (DataError, TypeError, ValueError, ValidationError) as e:
+        raise CoursePackageError(f"The package has a field of the wrong type: {e}")
+    invalidate_facets()
+    # bulk_create bypasses the Course signal that refreshes the instructor's taught courses
+    invalidate_user_access(instructor.pk)
+    return course, counts
+
+
+@transaction.atomic
+def _create_course(course_record, records, fields, topic_slugs, instructor, publish):
+    """Writes a validated package: bulk_create per level, parents first, in one transaction."""
+    category = None
+    if course_record.get('category') and course_record['category'].get('slug'):
+        category_data = course_record['category']
+        category, _created = Category.objects.get_or_create(
+            slug=category_data['slug'],
+            defaults={'name': category_data.get('name') or category_data['slug'],
+                      'description': category_data.get('description')},
+        )
+
+    fields['slug'] = unique_slug(Course, fields['slug'])
+    course = Course(instructor=instructor, category=category, is_published=publish, **fields)
+    Course.objects.bulk_create([course])
+
+    topic_slug_map = unique_slugs(Topic, topic_slugs)
+    created = {'course': {course_record['ref']: course.pk}}
+    counts = {}
+    for level in LEVEL_ORDER:
+        model, allowed, parent_type, parent_attr = LEVELS[level]
+        objects = []
+        created[level] = {}
+        for record in records[level]:
+            values = {field: value for field, value in record['fields'].items() if field in allowed}
+            if level == 'topic':
+                values['slug'] = topic_slug_map[values['slug']]
+            obj = model(id=uuid.uuid4(), **{parent_attr: created[parent_type][record['parent']]}, **values)
+            created[level][record['ref']] = obj.pk
+            objects.append(obj)
+        model.objects.bulk_create(objects, batch_size=EXPORT_CHUNK_SIZE)
+        counts[level] = len(objects)
+        if level == 'topic':
+            total_duration = sum(topic.estimated_duration_minutes for topic in objects)
+
+    # bulk_create bypasses the Topic signals that maintain this
+    Course.objects.filter(pk=course.pk).update(total_duration_minutes=total_duration)
+    course.total_duration_minutes = total_duration
+    return course, counts
@@ -1,5 +1,8 @@
+import uuid
+
 from rest_framework.permissions import BasePermission, SAFE_METHODS, IsAdminUser
-from .models import Course, Module, Topic, Question, Choice, Enrollment, CourseReview
+from .models import Course, Topic, CourseReview
+from .access import get_course_access, get_course_id
 
 # IsAdminUser is already available from DRF.
 # We can use it directly in views for actions restricted to staff/admins.
@@ -31,56 +34,54 @@ class IsInstructorOrReadOnly(BasePermission):
             return True
         if not request.user.is_authenticated:
             return False
-        if request.user.is_staff:
-            return True
+        return get_course_access(request).can_manage(get_course_id(obj))
 
-        course_instructor = None
-        if isinstance(obj, Course): course_instructor = obj.instructor
-        elif isinstance(obj, Module): course_instructor = obj.course.instructor
-        elif isinstance(obj, Topic): course_instructor = obj.module.course.instructor
-        elif isinstance(obj, Question): course_instructor = obj.topic.module.course.instructor
-        elif isinstance(obj, Choice): course_instructor = obj.question.topic.module.course.instructor
-        
-        return course_instructor == request.user
+
+class IsCourseInstructor(BasePermission):
+    """
+    Allows access (for any method) only to the instructor of the course or admin users.
+    """
+    message = "Only the course instructor can perform this action."
+
+    def has_object_permission(self, request, view, obj):
+        if not request.user.is_authenticated:
+            return False
+        return get_course_access(request).can_manage(get_course_id(obj))
 
 
 class IsEnrolled(BasePermission):
     message = "You must be enrolled in this course to perform this action."
 
-    def _get_course_from_obj(self, obj):
-        if isinstance(obj, Course): return obj
-        if hasattr(obj, 'course') and isinstance(obj.course, Course): return obj.course
-        if hasattr(obj, 'module') and hasattr(obj.module, 'course'): return obj.module.course
-        if hasattr(obj, 'topic') and hasattr(obj.topic, 'module'): return obj.topic.module.course
-        if hasattr(obj, 'question') and hasattr(obj.question, 'topic'): return obj.question.topic.module.course
-        return None
+    def _get_course_id_from_view(self, view):
+        course = getattr(view, 'course_object', None)
+        if course:
+            return course.pk
+        if not hasattr(view, 'kwargs'):
+            return None
+        course_key = view.kwargs.get('course_pk') or view.kwargs.get('course_slug') # Adapt to how course is identified
+        if not course_key:
+            return None
+        if isinstance(course_key, uuid.UUID):
+            return course_key
+        return Course.objects.filter(slug=course_key).values_list('pk', flat=True).first() or False
 
     def has_permission(self, request, view):
         if not request.user.is_authenticated:
             return False
-        
-        course = getattr(view, 'course_object', None) 
-        if not course and hasattr(view, 'kwargs'):
-            course_id = view.kwargs.get('course_pk') or view.kwargs.get('course_slug') # Adapt to how course is identified
-            if course_id:
-                try:
-                    lookup_kwarg = 'pk' if isinstance(course_id, (int, uuid.UUID)) else 'slug' # Basic type check
-                    course = Course.objects.get(**{lookup_kwarg: course_id})
-                except (Course.DoesNotExist, ValueError):
-                    return False
-        
-        if course:
-            return Enrollment.objects.filter(user=request.user, course=course).exists() or \
-                   (request.user.is_staff or course.instructor == request.user) # Staff/Instructor access
+
+        course_id = self._get_course_id_from_view(view)
+        if course_id is False: # Unknown course
+            return False
+        if course_id:
+            return get_course_access(request).can_access(course_id) # Staff/Instructor access
         return True
 
     def has_object_permission(self, request, view, obj):
         if not request.user.is_authenticated: return False
-        course = self._get_course_from_obj(obj)
-        if not course: return request.method in SAFE_METHODS 
-            
-        return Enrollment.objects.filter(user=request.user, course=course).exists() or \
-               (request.user.is_staff or course.instructor == request.user) # Staff/Instructor access
+        course_id = get_course_id(obj)
+        if not course_id: return request.method in SAFE_METHODS
+
+        return get_course_access(request).can_access(course_id) # Staff/Instructor access
 
 
 class CanViewTopicContent(BasePermission):
@@ -88,15 +89,14 @@ class CanViewTopicContent(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         if not isinstance(obj, Topic): return False
-        course = obj.module.course
+        course = obj.module.course # Views load topics with select_related('module__course')
+        access = get_course_access(request)
 
-        if not course.is_published and not (request.user.is_authenticated and (request.user.is_staff or course.instructor == request.user)):
-            return False
+        if access.is_authenticated and access.can_access(course.pk):
+            return course.is_published or access.can_manage(course.pk)
 
-        if request.user.is_authenticated:
-            if request.user.is_staff or course.instructor == request.user: return True
-            if Enrollment.objects.filter(user=request.user, course=course).exists(): return True
-        
+        if not course.is_published:
+            return False
         return obj.is_previewable or course.is_free
             
 
@@ -106,20 +106,20 @@ class CanPerformEnrolledAction(BasePermission):
     def has_object_permission(self, request, view, obj): # obj is typically Topic or QuizAttempt
         if not request.user.is_authenticated: return False
 
-        course = None
-        if isinstance(obj, Topic): course = obj.module.course
-        elif hasattr(obj, 'topic') and isinstance(obj.topic, Topic): course = obj.topic.module.course
+        if isinstance(obj, Topic): topic = obj
+        elif hasattr(obj, 'topic') and isinstance(obj.topic, Topic): topic = obj.topic
         else: return False 
 
-        if not course: return False # Should not happen if obj structure is correct
-        
+        course = topic.module.course
+        access = get_course_access(request)
+
         # Instructors/staff can perform these actions regardless of enrollment
-        if request.user.is_staff or course.instructor == request.user:
+        if access.can_manage(course.pk):
             return True
 
         if not course.is_published: return False # Regular users cannot interact with unpublished course content
             
-        return Enrollment.objects.filter(user=request.user, course=course).exists()
+        return access.is_enrolled(course.pk)
 
 
 class CanSubmitCourseReview(BasePermission):
@@ -132,10 +132,10 @@ class CanSubmitCourseReview(BasePermission):
         if not request.user.is_authenticated: return False
         
         if isinstance(obj, CourseReview): # For update/delete existing review
-            return obj.user == request.user or request.user.is_staff
+            return obj.user_id == request.user.id or request.user.is_staff
         
         if isinstance(obj, Course): # For creating a new review for this Course object
-            if not Enrollment.objects.filter(user=request.user, course=obj).exists():
+            if not get_course_access(request).is_enrolled(obj.pk):
                 self.message = "You must be enrolled in the course to submit a review."
                 return False
             if CourseReview.objects.filter(user=request.user, course=obj).exists():
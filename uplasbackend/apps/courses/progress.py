@@ -0,0 +1,139 @@
+# apps/courses/progress.py
+"""
+Progress tracking for enrolled learners.
+
+Completing a topic never recounts the course: the TopicProgress row is
+upserted, and the CourseProgress counters and the user's XP are moved with
+conditional UPDATE ... SET x = x + 1 statements. This keeps the work done on
+each click constant and safe under concurrent completions.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import CourseProgress, Enrollment, Topic, TopicProgress
+
+User = get_user_model()
+
+TOPIC_COMPLETION_XP = 5
+
+
+class NotEnrolledError(Exception):
+    """Raised when progress is recorded for a user who is not enrolled in the course."""
+
+
+def percentage_expression(completed):
+    """SQL expression for `completed / total_topics_count * 100`, guarded against empty courses."""
+    return Case(
+        When(total_topics_count__gt=0, then=Cast(completed, FloatField()) * 100.0 / Cast(F('total_topics_count'), FloatField())),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def get_or_create_course_progress(user, course_id):
+    """
+    Returns the CourseProgress of an enrollment, creating it (with a one-time
+    topic count) for enrollments that predate progress tracking.
+    """
+    enrollment = Enrollment.objects.filter(user=user, course_id=course_id).first()
+    if enrollment is None:
+        raise NotEnrolledError(course_id)
+    course_progress, _created = CourseProgress.objects.get_or_create(
+        enrollment=enrollment,
+        defaults={
+            'user': user,
+            'course_id': course_id,
+            'total_topics_count': Topic.objects.filter(module__course_id=course_id).count(),
+        },
+    )
+    return course_progress
+
+
+def mark_topic_complete(user, topic, xp=TOPIC_COMPLETION_XP):
+    """
+    Marks `topic` as completed for `user`.
+
+    Returns a dict with the updated counters. `newly_completed` is False when the
+    topic had already been completed, in which case nothing is changed and no
+    XP is awarded.
+    """
+    course_id = topic.module.course_id
+    now = timezone.now()
+
+    with transaction.atomic():
+        course_progress = get_or_create_course_progress(user, course_id)
+
+        topic_progress, created = TopicProgress.objects.get_or_create(
+            user=user,
+            topic=topic,
+            defaults={'course_progress': course_progress, 'is_completed': True, 'completed_at': now},
+        )
+        if created:
+            newly_completed = True
+        else:
+            # Only the first caller flips the flag; concurrent duplicates update 0 rows.
+            newly_completed = bool(
+                TopicProgress.objects.filter(pk=topic_progress.pk, is_completed=False)
+                .update(is_completed=True, completed_at=now, updated_at=now)
+            )
+
+        course_completed = False
+        if newly_completed:
+            CourseProgress.objects.filter(pk=course_progress.pk).update(
+                completed_topics_count=F('completed_topics_count') + 1,
+                progress_percentage=percentage_expression(F('completed_topics_count') + 1),
+                updated_at=now,
+            )
+            course_completed = bool(
+                CourseProgress.objects.filter(
+                    pk=course_progress.pk,
+                    completed_at__isnull=True,
+                    total_topics_count__gt=0,
+                    completed_topics_count__gte=F('total_topics_count'),
+                ).update(completed_at=now)
+            )
+            if xp:
+                User.objects.filter(pk=user.pk).update(uplas_xp_points=F('uplas_xp_points') + xp)
+
+        course_progress.refresh_from_db(fields=[
+            'completed_topics_count', 'total_topics_count', 'progress_percentage', 'completed_at'
+        ])
+
+    return {
+        'newly_completed': newly_completed,
+        'xp_awarded': xp if newly_completed else 0,
+        'course_completed': course_completed,
+        'completed_topics_count': course_progress.completed_topics_count,
+        'total_topics_count': course_progress.total_topics_count,
+        'progress_percentage': course_progress.progress_percentage,
+        'completed_at': course_progress.completed_at,
+    }
+
+
+def adjust_total_topics(course_id, delta):
+    """Applies a topic being added to (+1) or removed from (-1) a course to every learner's progress row."""
+    if not course_id or not delta:
+        return
+    progresses = CourseProgress.objects.filter(course_id=course_id)
+    if delta < 0:
+        progresses = progresses.filter(total_topics_count__gte=-delta)
+    progresses.update(
+        total_topics_count=F('total_topics_count') + delta,
+        progress_percentage=Case(
+            When(total_topics_count__gt=-delta, then=Cast(F('completed_topics_count'), FloatField()) * 100.0
+                 / Cast(F('total_topics_count') + delta, FloatField())),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def revoke_completed_topic(course_progress_id):
+    """Decrements the completed counter when a completed TopicProgress row disappears."""
+    CourseProgress.objects.filter(pk=course_progress_id, completed_topics_count__gt=0).update(
+        completed_topics_count=F('completed_topics_count') - 1,
+        progress_percentage=percentage_expression(F('completed_topics_count') - 1),
+    )
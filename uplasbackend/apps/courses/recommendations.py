@@ -0,0 +1,140 @@
+# apps/courses/recommendations.py
+"""
+"Learners also took" recommendations from enrollment co-occurrence.
+
+The item-item co-occurrence matrix is accumulated sparsely (a dict keyed by
+course pair) from a single pass over Enrollment ordered by user, so only one
+learner's courses are held at a time. Pairs are scored with cosine similarity
+(co-enrollments / sqrt(enrollments_a * enrollments_b)) and the top K per
+course are stored in CourseRecommendation, which the API reads with one
+query. Rebuilds run on a schedule through the `build_course_recommendations`
+command, for all courses or only some. The command is its own process, so
+results are only cached when the cache is shared with the web workers (see
+apps/core/caching.py); otherwise a rebuild would not reach them.
+"""
+import heapq
+import math
+import uuid
+from collections import Counter, defaultdict
+from itertools import combinations, groupby
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.core.caching import invalidated_cache_timeout
+
+from .models import CourseRecommendation, Enrollment
+
+TOP_K = 10
+# Learners enrolled in more courses than this add noise and quadratic work; they are skipped
+MAX_COURSES_PER_LEARNER = 200
+MIN_CO_ENROLLMENTS = 2
+RECOMMENDATION_VERSION_KEY = "courses:recommendations:version"
+
+
+def count_co_enrollments(source_course_ids=None, chunk_size=2000):
+    """
+    Returns {(course_a, course_b): co_enrollments} for published courses,
+    restricted to pairs whose first course is in `source_course_ids` when given.
+    """
+    enrollments = Enrollment.objects.filter(course__is_published=True)
+    if source_course_ids is not None:
+        enrollments = enrollments.filter(
+            user_id__in=Enrollment.objects.filter(course_id__in=source_course_ids).values('user_id')
+        )
+    rows = enrollments.order_by('user_id').values_list('user_id', 'course_id').iterator(chunk_size=chunk_size)
+
+    counts = Counter()
+    for _user_id, group in groupby(rows, key=lambda row: row[0]):
+        course_ids = sorted({course_id for _user, course_id in group})
+        if len(course_ids) < 2 or len(course_ids) > MAX_COURSES_PER_LEARNER:
+            continue
+        for a, b in combinations(course_ids, 2):
+            if source_course_ids is None or a in source_course_ids:
+                counts[(a, b)] += 1
+            if source_course_ids is None or b in source_course_ids:
+                counts[(b, a)] += 1
+    return counts
+
+
+def top_k_recommendations(counts, enrollment_totals, k=TOP_K, min_co_enrollments=MIN_CO_ENROLLMENTS):
+    """Scores co-occurrence counts and keeps the best `k` per course: {course_id: [(other, score, co)]}."""
+    scored = defaultdict(list)
+    for (a, b), co in counts.items():
+        if co < min_co_enrollments:
+            continue
+        score = co / math.sqrt(enrollment_totals[a] * enrollment_totals[b])
+        scored[a].append((score, co, b))
+    return {
+        course_id: [(other, score, co) for score, co, other in heapq.nlargest(k, candidates, key=lambda c: (c[0], c[1]))]
+        for course_id, candidates in scored.items()
+    }
+
+
+def rebuild_recommendations(course_ids=None, k=TOP_K, min_co_enrollments=MIN_CO_ENROLLMENTS):
+    """
+    Recomputes the stored top-K recommendations of all published courses, or
+    only of `course_ids`. Returns the number of recommendation rows written.
+    """
+    source_ids = {uuid.UUID(str(course_id)) for course_id in course_ids} if course_ids is not None else None
+    counts = count_co_enrollments(source_ids)
+    enrollment_totals = dict(
+        Enrollment.objects.filter(course__is_published=True).values('course_id')
+        .annotate(total=Count('id')).order_by().values_list('course_id', 'total')
+    )
+    top = top_k_recommendations(counts, enrollment_totals, k=k, min_co_enrollments=min_co_enrollments)
+
+    rows = [
+        CourseRecommendation(course_id=course_id, recommended_course_id=other, rank=rank, score=score, co_enrollments=co)
+        for course_id, recommendations in top.items()
+        for rank, (other, score, co) in enumerate(recommendations, start=1)
+    ]
+    with transaction.atomic():
+        existing = CourseRecommendation.objects.all()
+        if source_ids is not None:
+            existing = existing.filter(course_id__in=source_ids)
+        existing.delete()
+        CourseRecommendation.objects.bulk_create(rows, batch_size=1000)
+    invalidate_recommendations()
+    return len(rows)
+
+
+def recommendation_cache_timeout():
+    """Seconds recommendations stay cached; 0 (read per request) without a shared cache."""
+    return invalidated_cache_timeout('COURSE_RECOMMENDATION_CACHE_TIMEOUT', 60 * 60 * 6)
+
+
+def invalidate_recommendations():
+    try:
+        cache.incr(RECOMMENDATION_VERSION_KEY)
+    except ValueError:
+        cache.set(RECOMMENDATION_VERSION_KEY, 1, None)
+
+
+def get_recommended_courses(course_id, limit=TOP_K):
+    """Returns the recommended published courses for a course, best first, annotated with `score`."""
+    timeout = recommendation_cache_timeout()
+    if not timeout:
+        return load_recommended_courses(course_id, limit)
+    version = cache.get_or_set(RECOMMENDATION_VERSION_KEY, 1, None)
+    key = f"courses:recommendations:{version}:{course_id}:{limit}"
+    courses = cache.get(key)
+    if courses is None:
+        courses = load_recommended_courses(course_id, limit)
+        cache.set(key, courses, timeout)
+    return courses
+
+
+def load_recommended_courses(course_id, limit=TOP_K):
+    recommendations = (
+        CourseRecommendation.objects.filter(course_id=course_id, recommended_course__is_published=True)
+        .select_related('recommended_course__category', 'recommended_course__instructor')
+        .order_by('rank')[:limit]
+    )
+    courses = []
+    for recommendation in recommendations:
+        course = recommendation.recommended_course
+        course.recommendation_score = recommendation.score
+        courses.append(course)
+    return courses
@@ -0,0 +1,84 @@
+# apps/courses/resume.py
+"""
+"Continue learning": where each learner stopped in each course.
+
+Lesson views are tracked in CourseProgress.last_accessed_topic. Each view
+runs one conditional UPDATE that only matches when the topic changed, so
+reloads and repeated views of the same lesson write nothing. Moving on to
+another lesson is written at once, and the resume endpoint reads the
+database only. A cache-held "latest topic" would live in one worker's
+LocMem and be lost with it.
+
+`get_resume_points` resolves the next topic for every active enrollment of a
+user with three queries: progress rows, the topics of those courses and the
+learner's completed topics.
+"""
+from django.utils import timezone
+
+from .models import CourseProgress, Topic, TopicProgress
+
+
+def record_topic_view(user_id, course_id, topic_id):
+    """
+    Notes that a learner opened a topic. Returns True if the view was written
+    to CourseProgress, False if the topic was already the last accessed one.
+    """
+    return bool(
+        CourseProgress.objects.filter(user_id=user_id, course_id=course_id)
+        .exclude(last_accessed_topic_id=topic_id)
+        .update(last_accessed_topic_id=topic_id, updated_at=timezone.now())
+    )
+
+
+def _next_topic(topics, completed_ids, last_topic_id):
+    """
+    The topic to resume: the last accessed one if it is unfinished, else the
+    first unfinished topic after it, else the first unfinished topic at all.
+    """
+    position = next((i for i, topic in enumerate(topics) if topic['id'] == last_topic_id), None)
+    if position is not None:
+        if last_topic_id not in completed_ids:
+            return topics[position]
+        for topic in topics[position + 1:]:
+            if topic['id'] not in completed_ids:
+                return topic
+    return next((topic for topic in topics if topic['id'] not in completed_ids), None)
+
+
+def get_resume_points(user):
+    """
+    One entry per unfinished enrollment, most recently active first:
+    {'progress': CourseProgress (with course), 'last_topic': dict|None, 'next_topic': dict|None}.
+    """
+    progresses = list(
+        CourseProgress.objects.filter(user=user, completed_at__isnull=True)
+        .select_related('course')
+        .order_by('-updated_at')
+    )
+    if not progresses:
+        return []
+    course_ids = [progress.course_id for progress in progresses]
+
+    topics_by_course = {course_id: [] for course_id in course_ids}
+    topics = (
+        Topic.objects.filter(module__course_id__in=course_ids)
+        .order_by('module__order', 'order')
+        .values('id', 'slug', 'title', 'module_id', 'module__title', 'module__course_id')
+    )
+    for topic in topics:
+        topics_by_course[topic.pop('module__course_id')].append(topic)
+    completed_ids = set(
+        TopicProgress.objects.filter(user=user, is_completed=True, topic__module__course_id__in=course_ids)
+        .values_list('topic_id', flat=True)
+    )
+
+    points = []
+    for progress in progresses:
+        course_topics = topics_by_course[progress.course_id]
+        last_topic_id = progress.last_accessed_topic_id
+        points.append({
+            'progress': progress,
+            'last_topic': next((topic for topic in course_topics if topic['id'] == last_topic_id), None),
+            'next_topic': _next_topic(course_topics, completed_ids, last_topic_id),
+        })
+    return points
@@ -0,0 +1,202 @@
+# apps/courses/search.py
+"""
+Ranked full-text search over the course catalog.
+
+Each course has a weighted search document (title > short description > long
+description) maintained by the database itself, see migration
+0004_course_search_document:
+
+- PostgreSQL: a generated `search_document` tsvector column with a GIN index.
+- SQLite (local development): an FTS5 table `courses_course_fts` kept in sync
+  by triggers on `courses_course`.
+
+SQLite drops those triggers whenever a later migration rebuilds
+`courses_course` (e.g. an AlterField), so `ensure_search_index` recreates
+whatever is missing, and resyncs the FTS5 table, after every `migrate`
+(post_migrate, see apps.py). It is safe to run repeatedly.
+
+Other backends fall back to the previous `icontains` matching without ranking.
+`CourseSearchFilter` plugs this into the DRF filter backends of the catalog
+views in place of `SearchFilter`, annotating `search_rank` (higher is better)
+and `search_snippet` (HTML with <mark> highlights).
+"""
+import re
+
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+SNIPPET_START = '<mark>'
+SNIPPET_STOP = '</mark>'
+
+# FTS5 column weights, in table column order: course_id, title, short_description, long_description
+FTS5_WEIGHTS = '0.0, 10.0, 4.0, 1.0'
+
+POSTGRES_CONFIG = 'english'
+
+SEARCH_MIGRATION = ('courses', '0004_course_search_document')
+
+# Idempotent versions of the index created by the migration
+POSTGRES_INDEX = [
+    f"""
+    ALTER TABLE courses_course ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{POSTGRES_CONFIG}'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{POSTGRES_CONFIG}'::regconfig, coalesce(short_description, '')), 'B') ||
+        setweight(to_tsvector('{POSTGRES_CONFIG}'::regconfig, coalesce(long_description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS courses_course_search_document_gin ON courses_course USING GIN (search_document)",
+]
+
+SQLITE_INDEX_OBJECTS = ['courses_course_fts', 'courses_course_fts_insert', 'courses_course_fts_update', 'courses_course_fts_delete']
+SQLITE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS courses_course_fts USING fts5(
+        course_id UNINDEXED, title, short_description, long_description,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_course_fts_insert AFTER INSERT ON courses_course BEGIN
+        INSERT INTO courses_course_fts (course_id, title, short_description, long_description)
+        VALUES (NEW.id, NEW.title, NEW.short_description, NEW.long_description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_course_fts_update
+    AFTER UPDATE OF title, short_description, long_description ON courses_course BEGIN
+        DELETE FROM courses_course_fts WHERE course_id = OLD.id;
+        INSERT INTO courses_course_fts (course_id, title, short_description, long_description)
+        VALUES (NEW.id, NEW.title, NEW.short_description, NEW.long_description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_course_fts_delete AFTER DELETE ON courses_course BEGIN
+        DELETE FROM courses_course_fts WHERE course_id = OLD.id;
+    END
+    """,
+]
+# Courses written while a trigger was missing are not indexed; rebuilt from the table
+SQLITE_RESYNC = [
+    "DELETE FROM courses_course_fts",
+    """
+    INSERT INTO courses_course_fts (course_id, title, short_description, long_description)
+    SELECT id, title, short_description, long_description FROM courses_course
+    """,
+]
+
+
+def fts5_query(term):
+    """
+    Turns free text into a safe FTS5 query: every word is quoted (so FTS5
+    operators in user input are treated as text) and the last one is a prefix
+    match for search-as-you-type.
+    """
+    words = re.findall(r'\w+', term)
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def ensure_search_index(connection=connection):
+    """
+    Recreates the parts of the database's search index over courses that are
+    missing, once migration 0004 has created it. On SQLite a repaired index is
+    resynced from `courses_course`.
+    """
+    if SEARCH_MIGRATION not in MigrationRecorder(connection).applied_migrations():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for statement in POSTGRES_INDEX:
+                cursor.execute(statement)
+        elif connection.vendor == 'sqlite':
+            placeholders = ', '.join(['%s'] * len(SQLITE_INDEX_OBJECTS))
+            cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({placeholders})", SQLITE_INDEX_OBJECTS)
+            if cursor.fetchone()[0] < len(SQLITE_INDEX_OBJECTS):
+                for statement in SQLITE_INDEX + SQLITE_RESYNC:
+                    cursor.execute(statement)
+
+
+class BaseCourseSearchBackend:
+    vendor = None
+
+    def search(self, queryset, term):
+        raise NotImplementedError
+
+
+class PostgresCourseSearchBackend(BaseCourseSearchBackend):
+    vendor = 'postgresql'
+
+    def search(self, queryset, term):
+        tsquery = f"websearch_to_tsquery('{POSTGRES_CONFIG}', %s)"
+        return queryset.annotate(
+            search_match=RawSQL(f"courses_course.search_document @@ {tsquery}", [term], output_field=BooleanField()),
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(f"ts_rank(courses_course.search_document, {tsquery})", [term], output_field=FloatField()),
+            search_snippet=RawSQL(
+                f"ts_headline('{POSTGRES_CONFIG}', "
+                "courses_course.short_description || ' ' || courses_course.long_description, "
+                f"{tsquery}, 'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=35, MinWords=15')",
+                [term], output_field=TextField(),
+            ),
+        ).order_by('-search_rank')
+
+
+class SQLiteCourseSearchBackend(BaseCourseSearchBackend):
+    vendor = 'sqlite'
+
+    def search(self, queryset, term):
+        match = fts5_query(term)
+        if match is None:
+            return queryset
+        correlated = "FROM courses_course_fts WHERE courses_course_fts MATCH %s AND courses_course_fts.course_id = courses_course.id"
+        return queryset.filter(
+            pk__in=RawSQL("SELECT course_id FROM courses_course_fts WHERE courses_course_fts MATCH %s", [match]),
+        ).annotate(
+            search_rank=RawSQL(f"SELECT -bm25(courses_course_fts, {FTS5_WEIGHTS}) {correlated}", [match], output_field=FloatField()),
+            search_snippet=RawSQL(
+                f"SELECT snippet(courses_course_fts, -1, '{SNIPPET_START}', '{SNIPPET_STOP}', '...', 16) {correlated}",
+                [match], output_field=TextField(),
+            ),
+        ).order_by('-search_rank')
+
+
+class FallbackCourseSearchBackend(BaseCourseSearchBackend):
+    """Unranked matching for databases without a full-text index."""
+
+    def search(self, queryset, term):
+        condition = Q()
+        for word in term.split():
+            condition &= Q(title__icontains=word) | Q(short_description__icontains=word) | Q(long_description__icontains=word)
+        return queryset.filter(condition)
+
+
+SEARCH_BACKENDS = {backend.vendor: backend for backend in (PostgresCourseSearchBackend(), SQLiteCourseSearchBackend())}
+
+
+def get_search_backend():
+    return SEARCH_BACKENDS.get(connection.vendor, FallbackCourseSearchBackend())
+
+
+def search_courses(queryset, term):
+    term = (term or '').strip()
+    if not term:
+        return queryset
+    return get_search_backend().search(queryset, term)
+
+
+class CourseSearchFilter(BaseFilterBackend):
+    """
+    Full-text replacement for SearchFilter on Course querysets. Results are
+    ordered by relevance unless an explicit ?ordering= is applied afterwards
+    by OrderingFilter.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        return search_courses(queryset, request.query_params.get(self.search_param, ''))
@@ -42,16 +42,48 @@ class ModuleDetailSerializer(serializers.ModelSerializer):
         model = Module
         fields = ['id', 'title', 'order', 'description', 'topics']
 
+class TopicOutlineSerializer(serializers.ModelSerializer):
+    """
+    Topic without its `content` body (served by the topic content endpoint).
+    Questions are only included when the view asks for them via the
+    `expand_questions` context flag (?expand=questions).
+    """
+    questions = QuestionSerializer(many=True, read_only=True)
+    class Meta:
+        model = Topic
+        fields = ['id', 'title', 'slug', 'order', 'estimated_duration_minutes', 'is_previewable', 'questions']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('expand_questions'):
+            fields.pop('questions')
+        return fields
+
+class ModuleOutlineSerializer(serializers.ModelSerializer):
+    topics = TopicOutlineSerializer(many=True, read_only=True)
+    class Meta:
+        model = Module
+        fields = ['id', 'title', 'order', 'description', 'topics']
+
 class CourseListSerializer(serializers.ModelSerializer):
     category = serializers.StringRelatedField()
     instructor = serializers.StringRelatedField()
+    # Only present on ?search= results (see search.py)
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = serializers.CharField(read_only=True)
     class Meta:
         model = Course
         fields = [
             'id', 'slug', 'title', 'short_description', 'thumbnail_url',
-            'level', 'instructor', 'category', 'price', 'average_rating', 'total_enrollments'
+            'level', 'instructor', 'category', 'price', 'average_rating', 'total_enrollments',
+            'search_rank', 'search_snippet'
         ]
 
+class RecommendedCourseSerializer(CourseListSerializer):
+    score = serializers.FloatField(source='recommendation_score', read_only=True)
+    class Meta(CourseListSerializer.Meta):
+        fields = CourseListSerializer.Meta.fields + ['score']
+
 class CourseDetailSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     instructor = serializers.StringRelatedField()
@@ -63,4 +95,15 @@ class CourseDetailSerializer(serializers.ModelSerializer):
             'instructor', 'category', 'price', 'level', 'language',
             'average_rating', 'total_reviews', 'total_enrollments', 'total_duration_minutes',
             'promo_video_url', 'supports_ai_tutor'
-        ]
\ No newline at end of file
+        ]
+
+class QuizAnswerSerializer(serializers.Serializer):
+    question_id = serializers.UUIDField()
+    selected_choice_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=True)
+
+class QuizSubmissionSerializer(serializers.Serializer):
+    topic_id = serializers.UUIDField()
+    answers = QuizAnswerSerializer(many=True)
+
+class ReorderSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
@@ -0,0 +1,94 @@
+# apps/courses/statistics.py
+"""
+Denormalized course statistics.
+
+`Course.average_rating`, `total_reviews`, `rating_sum`, `total_enrollments` and
+`total_duration_minutes` are kept current by the signals in models.py, which
+apply the change of a single review/enrollment/topic as a delta in one UPDATE
+(no re-aggregation). `reconcile_course_statistics` recomputes everything from
+scratch with one grouped query per statistic. It is exposed through the
+`recompute_course_stats` management command and backfills the statistics in
+migration 0007.
+"""
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, Greatest
+
+from .models import Course, CourseReview, Enrollment, Topic
+
+
+def apply_review_delta(course_id, rating_delta, count_delta):
+    """Adds `rating_delta` to the rating sum and `count_delta` to the review count of a course."""
+    if not course_id or not (rating_delta or count_delta):
+        return
+    new_sum = Greatest(F('rating_sum') + rating_delta, 0)
+    new_count = Greatest(F('total_reviews') + count_delta, 0)
+    Course.objects.filter(pk=course_id).update(
+        rating_sum=new_sum,
+        total_reviews=new_count,
+        average_rating=Case(
+            When(total_reviews__gt=-count_delta, then=Cast(new_sum, FloatField()) / Cast(new_count, FloatField())),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def apply_enrollment_delta(course_id, delta):
+    if course_id and delta:
+        Course.objects.filter(pk=course_id).update(total_enrollments=Greatest(F('total_enrollments') + delta, 0))
+
+
+def apply_duration_delta(course_id, delta):
+    if course_id and delta:
+        Course.objects.filter(pk=course_id).update(total_duration_minutes=Greatest(F('total_duration_minutes') + delta, 0))
+
+
+def reconcile_course_statistics(course_ids=None, batch_size=500, models=None):
+    """
+    Recomputes the statistics of all courses (or of `course_ids`) from the source
+    tables. Uses one grouped query per statistic and batched bulk_update writes.
+    Data migrations pass their historical (Course, CourseReview, Enrollment,
+    Topic) as `models`. Returns the number of courses updated.
+    """
+    course_model, review_model, enrollment_model, topic_model = models or (Course, CourseReview, Enrollment, Topic)
+    reviews = review_model.objects.all()
+    enrollments = enrollment_model.objects.all()
+    topics = topic_model.objects.all()
+    courses = course_model.objects.all()
+    if course_ids is not None:
+        reviews = reviews.filter(course_id__in=course_ids)
+        enrollments = enrollments.filter(course_id__in=course_ids)
+        topics = topics.filter(module__course_id__in=course_ids)
+        courses = courses.filter(pk__in=course_ids)
+
+    review_stats = {
+        row['course_id']: (row['count'], row['total'] or 0)
+        for row in reviews.values('course_id').annotate(count=Count('id'), total=Sum('rating')).order_by()
+    }
+    enrollment_counts = dict(
+        enrollments.values('course_id').annotate(count=Count('id')).order_by().values_list('course_id', 'count')
+    )
+    durations = dict(
+        topics.values('module__course_id').annotate(total=Sum('estimated_duration_minutes')).order_by()
+        .values_list('module__course_id', 'total')
+    )
+
+    fields = ['rating_sum', 'total_reviews', 'average_rating', 'total_enrollments', 'total_duration_minutes']
+    updated = 0
+    batch = []
+    for course in courses.only('id', *fields).iterator(chunk_size=batch_size):
+        review_count, rating_sum = review_stats.get(course.id, (0, 0))
+        course.rating_sum = rating_sum
+        course.total_reviews = review_count
+        course.average_rating = rating_sum / review_count if review_count else 0.0
+        course.total_enrollments = enrollment_counts.get(course.id, 0)
+        course.total_duration_minutes = durations.get(course.id) or 0
+        batch.append(course)
+        if len(batch) >= batch_size:
+            course_model.objects.bulk_update(batch, fields)
+            updated += len(batch)
+            batch = []
+    if batch:
+        course_model.objects.bulk_update(batch, fields)
+        updated += len(batch)
+    return updated
@@ -4,6 +4,10 @@ from django.utils.text import slugify
 from django.utils import timezone
 from django.db import IntegrityError
 from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
 
 from apps.courses.models import (
     Category, Course, Module, Topic, Question, Choice,
@@ -453,3 +457,71 @@ class QuizAttemptModelTests(CourseModelTestDataMixin, TestCase):
         self.assertIn(self.c1_q1, answer.selected_choices.all())
 
 # Add more tests for edge cases, other model methods, and more complex signal interactions.
+
+
+class CourseStatisticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user(username='stats_instructor', email='stats_instructor@example.com', password='pw')
+        cls.students = [
+            User.objects.create_user(username=f'stats_student{i}', email=f'stats_student{i}@example.com', password='pw')
+            for i in range(3)
+        ]
+        cls.course = Course.objects.create(
+            title='Stats Course', slug='stats-course', instructor=cls.instructor,
+            short_description='Stats', long_description='Stats'
+        )
+        cls.module = Module.objects.create(course=cls.course, title='Stats Module', order=1)
+
+    def test_enrollments_are_counted_incrementally(self):
+        enrollments = [Enrollment.objects.create(user=s, course=self.course) for s in self.students]
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_enrollments, 3)
+        enrollments[0].delete()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_enrollments, 2)
+
+    def test_review_rating_update_applies_difference(self):
+        review = CourseReview.objects.create(user=self.students[0], course=self.course, rating=2)
+        CourseReview.objects.create(user=self.students[1], course=self.course, rating=4)
+        review.rating = 5
+        review.save()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_reviews, 2)
+        self.assertEqual(self.course.rating_sum, 9)
+        self.assertEqual(self.course.average_rating, 4.5)
+
+    def test_topic_durations_are_summed_incrementally(self):
+        topic = Topic.objects.create(module=self.module, title='T1', slug='stats-t1', order=1, estimated_duration_minutes=10)
+        Topic.objects.create(module=self.module, title='T2', slug='stats-t2', order=2, estimated_duration_minutes=25)
+        topic.estimated_duration_minutes = 15
+        topic.save()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_duration_minutes, 40)
+        topic.delete()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_duration_minutes, 25)
+
+    def test_reconciliation_command_repairs_drift(self):
+        Enrollment.objects.create(user=self.students[0], course=self.course)
+        CourseReview.objects.create(user=self.students[0], course=self.course, rating=4)
+        Topic.objects.create(module=self.module, title='T1', slug='stats-t1', order=1, estimated_duration_minutes=12)
+        Course.objects.filter(pk=self.course.pk).update(
+            average_rating=1.0, total_reviews=9, rating_sum=9, total_enrollments=0, total_duration_minutes=0
+        )
+        call_command('recompute_course_stats', stdout=StringIO())
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_reviews, 1)
+        self.assertEqual(self.course.average_rating, 4.0)
+        self.assertEqual(self.course.total_enrollments, 1)
+        self.assertEqual(self.course.total_duration_minutes, 12)
+
+    def test_migration_backfills_rating_sum(self):
+        CourseReview.objects.create(user=self.students[0], course=self.course, rating=4)
+        CourseReview.objects.create(user=self.students[1], course=self.course, rating=2)
+        Course.objects.filter(pk=self.course.pk).update(rating_sum=0)  # As added by 0003
+        migration = import_module('apps.courses.migrations.0007_backfill_course_statistics')
+        migration.backfill_statistics(apps, None)
+        CourseReview.objects.create(user=self.students[2], course=self.course, rating=3)
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.rating_sum, self.course.average_rating), (9, 3.0))
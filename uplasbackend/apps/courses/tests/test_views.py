@@ -2,6 +2,18 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils.text import slugify
 from decimal import Decimal
+from django.core.cache import cache
+from django.test import override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from io import StringIO
+import json
+import os
+import tempfile
+import datetime
+from unittest import mock, skipUnless
+from django.db import connection
+from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -10,9 +22,12 @@ from rest_framework_simplejwt.tokens import RefreshToken # For JWT authenticatio
 # Import models from the courses app
 from apps.courses.models import (
     Category, Course, Module, Topic, Question, Choice,
-    Enrollment, CourseReview, CourseProgress, TopicProgress
+    Enrollment, CourseReview, CourseProgress, TopicProgress, QuizAttempt,
+    UserTopicAttemptAnswer, CourseDailyStats
 )
 # Import serializers to compare response data (optional, can also check specific fields)
+from apps.courses.analytics import run_rollups
+from apps.courses.search import SQLITE_INDEX_OBJECTS, ensure_search_index
 from apps.courses.serializers import (
     CategorySerializer, CourseListSerializer, CourseDetailSerializer
 )
@@ -561,3 +576,1008 @@ class QuizAttemptResultViewSetTests(ViewTestDataMixin, APITestCase):
 # - More complex permission scenarios.
 # - Error handling for invalid data in POST/PUT/PATCH requests.
 # - Functionality of all custom actions.
+
+
+
+class LearnerTestDataMixin:
+    """
+    Minimal course fixture (instructor, enrolled student, outsider) used by the
+    navigation/progress/grading tests.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user(
+            username='lt_instructor', email='lt_instructor@example.com', password='password123',
+            full_name='LT Instructor'
+        )
+        cls.student = User.objects.create_user(
+            username='lt_student', email='lt_student@example.com', password='password123',
+            full_name='LT Student'
+        )
+        cls.outsider = User.objects.create_user(
+            username='lt_outsider', email='lt_outsider@example.com', password='password123',
+            full_name='LT Outsider'
+        )
+        cls.course = Course.objects.create(
+            title='Learner Course', slug='learner-course', instructor=cls.instructor,
+            short_description='Course for learner tests.', long_description='Long description.',
+            is_published=True
+        )
+        cls.module1 = Module.objects.create(course=cls.course, title='Module One', order=1)
+        cls.module2 = Module.objects.create(course=cls.course, title='Module Two', order=2)
+        cls.topic1 = Topic.objects.create(module=cls.module1, title='Topic 1.1', slug='lt-topic-1-1', order=1, estimated_duration_minutes=10)
+        cls.topic2 = Topic.objects.create(module=cls.module1, title='Topic 1.2', slug='lt-topic-1-2', order=2, estimated_duration_minutes=15)
+        cls.topic3 = Topic.objects.create(module=cls.module2, title='Topic 2.1', slug='lt-topic-2-1', order=1, estimated_duration_minutes=20)
+        cls.enrollment = Enrollment.objects.create(user=cls.student, course=cls.course)
+        cls.course_progress = CourseProgress.objects.create(
+            user=cls.student, course=cls.course, enrollment=cls.enrollment, total_topics_count=3
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def authenticate(self, user):
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+
+class CourseNavigationTests(LearnerTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('courses:course-navigation', kwargs={'slug': self.course.slug})
+
+    def test_navigation_tree_with_completion_overlay(self):
+        TopicProgress.objects.create(
+            user=self.student, topic=self.topic2, course_progress=self.course_progress, is_completed=True
+        )
+        self.authenticate(self.student)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['title'] for m in response.data['modules']], ['Module One', 'Module Two'])
+        module1_topics = response.data['modules'][0]['topics']
+        self.assertEqual([t['slug'] for t in module1_topics], ['lt-topic-1-1', 'lt-topic-1-2'])
+        self.assertFalse(module1_topics[0]['is_completed'])
+        self.assertTrue(module1_topics[1]['is_completed'])
+        self.assertEqual(response.data['completed_topics_count'], 1)
+        self.assertEqual(response.data['total_topics_count'], 3)
+        self.assertEqual(response.data['progress'], 33.33)
+
+    @override_settings(COURSE_OUTLINE_CACHE_TIMEOUT=60)  # As with a shared cache
+    def test_navigation_query_count_is_constant_and_outline_is_cached(self):
+        self.authenticate(self.student)
+        self.client.get(self.url)  # Warm the outline cache
+        for i in range(5):
+            Topic.objects.create(module=self.module2, title=f'Extra {i}', slug=f'lt-extra-{i}', order=10 + i)
+        self.client.get(self.url)  # Topic saves invalidated the outline; rebuild it
+        # JWT user + course lookup + course access + completion overlay
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['total_topics_count'], 8)
+
+    @override_settings(COURSE_OUTLINE_CACHE_TIMEOUT=60)
+    def test_topic_change_invalidates_cached_outline(self):
+        self.authenticate(self.student)
+        self.client.get(self.url)
+        self.topic1.title = 'Renamed Topic'
+        self.topic1.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['modules'][0]['topics'][0]['title'], 'Renamed Topic')
+
+    def test_outline_rebuilt_per_request_without_shared_cache(self):
+        self.authenticate(self.student)
+        self.client.get(self.url)
+        Topic.objects.filter(pk=self.topic1.pk).update(title='Renamed Elsewhere')  # A rename saved by another worker
+        # JWT user + course lookup + course access + modules + topics + completion overlay
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['modules'][0]['topics'][0]['title'], 'Renamed Elsewhere')
+
+    def test_navigation_requires_enrollment(self):
+        self.authenticate(self.outsider)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TopicMarkCompleteTests(LearnerTestDataMixin, APITestCase):
+    def url(self, topic):
+        return reverse('courses:topic-mark-complete', kwargs={'pk': topic.pk})
+
+    def test_mark_complete_updates_counters_and_awards_xp(self):
+        self.authenticate(self.student)
+        response = self.client.post(self.url(self.topic1))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['newly_completed'])
+        self.assertEqual(response.data['xp_awarded'], 5)
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.completed_topics_count, 1)
+        self.assertAlmostEqual(self.course_progress.progress_percentage, 100 / 3)
+        self.assertIsNone(self.course_progress.completed_at)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.uplas_xp_points, 5)
+        self.assertTrue(TopicProgress.objects.filter(user=self.student, topic=self.topic1, is_completed=True).exists())
+
+    def test_mark_complete_twice_is_idempotent(self):
+        self.authenticate(self.student)
+        self.client.post(self.url(self.topic1))
+        response = self.client.post(self.url(self.topic1))
+        self.assertFalse(response.data['newly_completed'])
+        self.assertEqual(response.data['xp_awarded'], 0)
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.completed_topics_count, 1)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.uplas_xp_points, 5)
+
+    def test_completing_last_topic_sets_completed_at(self):
+        self.authenticate(self.student)
+        for topic in (self.topic1, self.topic2):
+            self.client.post(self.url(topic))
+        response = self.client.post(self.url(self.topic3))
+        self.assertTrue(response.data['course_completed'])
+        self.assertEqual(response.data['progress_percentage'], 100.0)
+        self.course_progress.refresh_from_db()
+        self.assertIsNotNone(self.course_progress.completed_at)
+
+    def test_topic_added_after_enrollment_adjusts_total(self):
+        self.authenticate(self.student)
+        self.client.post(self.url(self.topic1))
+        Topic.objects.create(module=self.module2, title='Topic 2.2', slug='lt-topic-2-2', order=2)
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.total_topics_count, 4)
+        self.assertEqual(self.course_progress.progress_percentage, 25.0)
+
+    def test_mark_complete_not_enrolled_forbidden(self):
+        self.authenticate(self.outsider)
+        response = self.client.post(self.url(self.topic1))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class QuizGradingTests(LearnerTestDataMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.q1 = Question.objects.create(topic=cls.topic1, text='Pick one', question_type='single-choice', order=1)
+        cls.q1_right = Choice.objects.create(question=cls.q1, text='Right', is_correct=True, order=1)
+        cls.q1_wrong = Choice.objects.create(question=cls.q1, text='Wrong', is_correct=False, order=2)
+        cls.q2 = Question.objects.create(topic=cls.topic1, text='Pick many', question_type='multiple-choice', order=2)
+        cls.q2_a = Choice.objects.create(question=cls.q2, text='A', is_correct=True, order=1)
+        cls.q2_b = Choice.objects.create(question=cls.q2, text='B', is_correct=True, order=2)
+        cls.q2_c = Choice.objects.create(question=cls.q2, text='C', is_correct=False, order=3)
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('courses:submit-quiz')
+
+    def submission(self, *answers):
+        return {
+            'topic_id': str(self.topic1.id),
+            'answers': [
+                {'question_id': str(question.id), 'selected_choice_ids': [str(c.id) for c in choices]}
+                for question, choices in answers
+            ]
+        }
+
+    def test_submit_whole_quiz_grades_and_persists_attempt(self):
+        self.authenticate(self.student)
+        data = self.submission((self.q1, [self.q1_right]), (self.q2, [self.q2_a, self.q2_c]))
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['score'], 50.0)
+        self.assertEqual(response.data['correct_answers'], 1)
+        self.assertEqual(response.data['total_questions_in_topic'], 2)
+
+        attempt = QuizAttempt.objects.get(user=self.student, topic=self.topic1)
+        answers = {a.question_id: a for a in attempt.answers.prefetch_related('selected_choices')}
+        self.assertTrue(answers[self.q1.id].is_correct)
+        self.assertFalse(answers[self.q2.id].is_correct)
+        self.assertEqual(set(answers[self.q2.id].selected_choices.all()), {self.q2_a, self.q2_c})
+
+    @override_settings(COURSE_ANSWER_KEY_CACHE_TIMEOUT=60)  # As with a shared cache
+    def test_submission_uses_constant_number_of_queries(self):
+        self.authenticate(self.student)
+        data = self.submission((self.q1, [self.q1_right]), (self.q2, [self.q2_a, self.q2_b]))
+        self.client.post(self.url, data, format='json')  # Warm the answer key cache
+        # JWT user, topic, topic progress, savepoint, attempt insert,
+        # answers bulk insert, through-rows bulk insert, release, course access
+        with self.assertNumQueries(9):
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.data['score'], 100.0)
+
+    def test_answer_key_rebuilt_per_submission_without_shared_cache(self):
+        self.authenticate(self.student)
+        data = self.submission((self.q1, [self.q1_wrong]))
+        self.assertEqual(self.client.post(self.url, data, format='json').data['score'], 0.0)
+        Choice.objects.filter(pk=self.q1_wrong.pk).update(is_correct=True)  # A correction saved by another worker
+        Choice.objects.filter(pk=self.q1_right.pk).update(is_correct=False)
+        self.assertEqual(self.client.post(self.url, data, format='json').data['score'], 50.0)
+
+    @override_settings(COURSE_ANSWER_KEY_CACHE_TIMEOUT=60)
+    def test_choice_change_invalidates_answer_key(self):
+        self.authenticate(self.student)
+        data = self.submission((self.q1, [self.q1_wrong]))
+        self.assertEqual(self.client.post(self.url, data, format='json').data['score'], 0.0)
+        Choice.objects.filter(pk=self.q1_wrong.pk).update(is_correct=True)  # No signal: key stays cached
+        self.assertEqual(self.client.post(self.url, data, format='json').data['score'], 0.0)
+        self.q1_right.is_correct = False
+        self.q1_right.save()
+        self.assertEqual(self.client.post(self.url, data, format='json').data['score'], 50.0)
+
+    def test_choice_from_other_question_rejected(self):
+        self.authenticate(self.student)
+        data = self.submission((self.q1, [self.q2_a]))
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(QuizAttempt.objects.exists())
+
+    def test_submit_quiz_not_enrolled_forbidden(self):
+        self.authenticate(self.outsider)
+        response = self.client.post(self.url, self.submission((self.q1, [self.q1_right])), format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_submit_single_answer_feedback(self):
+        self.authenticate(self.student)
+        url = reverse('courses:topic-submit-answer', kwargs={'pk': self.topic1.pk})
+        response = self.client.post(url, {'question_id': str(self.q1.id), 'selected_choice_ids': [str(self.q1_wrong.id)]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['is_correct'])
+
+
+class CourseSearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user(
+            username='search_instructor', email='search_instructor@example.com', password='password123',
+            full_name='Search Instructor'
+        )
+        cls.category = Category.objects.create(name='Search Category', slug='search-category')
+        cls.title_match = Course.objects.create(
+            title='Kubernetes Fundamentals', slug='kubernetes-fundamentals',
+            instructor=cls.instructor, category=cls.category,
+            short_description='Containers in production.', long_description='Pods, services and deployments.',
+            is_published=True
+        )
+        cls.body_match = Course.objects.create(
+            title='Cloud Operations', slug='cloud-operations',
+            instructor=cls.instructor, category=cls.category,
+            short_description='Running services in the cloud.',
+            long_description='Includes a short chapter on kubernetes clusters.',
+            is_published=True
+        )
+        cls.no_match = Course.objects.create(
+            title='Statistics', slug='statistics', instructor=cls.instructor, category=cls.category,
+            short_description='Probability and inference.', is_published=True
+        )
+        cls.url = reverse('courses:course-list')
+
+    def test_search_ranks_title_matches_first(self):
+        response = self.client.get(self.url, {'search': 'kubernetes'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        slugs = [course['slug'] for course in response.data['results']]
+        self.assertEqual(slugs, [self.title_match.slug, self.body_match.slug])
+        self.assertGreater(response.data['results'][0]['search_rank'], response.data['results'][1]['search_rank'])
+
+    def test_search_returns_highlighted_snippet(self):
+        response = self.client.get(self.url, {'search': 'kubernetes clusters'})
+        self.assertEqual([course['slug'] for course in response.data['results']], [self.body_match.slug])
+        self.assertIn('<mark>kubernetes</mark>', response.data['results'][0]['search_snippet'])
+
+    def test_search_matches_prefix_and_stems(self):
+        response = self.client.get(self.url, {'search': 'deployment'})
+        self.assertEqual([course['slug'] for course in response.data['results']], [self.title_match.slug])
+
+    def test_search_index_follows_updates(self):
+        self.no_match.long_description = 'Bayesian methods for Kubernetes capacity planning.'
+        self.no_match.save()
+        response = self.client.get(self.url, {'search': 'kubernetes'})
+        self.assertIn(self.no_match.slug, [course['slug'] for course in response.data['results']])
+
+    def _search_slugs(self, term):
+        return [course['slug'] for course in self.client.get(self.url, {'search': term}).data['results']]
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite FTS5 index")
+    def test_sqlite_search_triggers_exist_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE 'courses_course_fts%%'")
+            self.assertTrue(set(SQLITE_INDEX_OBJECTS) <= {name for name, in cursor.fetchall()})
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite FTS5 index")
+    def test_dropped_sqlite_triggers_are_recreated_and_resynced(self):
+        with connection.cursor() as cursor:  # As after a migration that rebuilt courses_course
+            cursor.execute("DROP TRIGGER courses_course_fts_insert")
+            cursor.execute("DROP TRIGGER courses_course_fts_update")
+        Course.objects.create(
+            title='Terraform Basics', slug='terraform-basics', instructor=self.instructor, category=self.category,
+            short_description='Infrastructure as code.', is_published=True
+        )
+        self.assertEqual(self._search_slugs('terraform'), [])
+        ensure_search_index()
+        self.assertEqual(self._search_slugs('terraform'), ['terraform-basics'])
+        self.no_match.title = 'Terraform Statistics'
+        self.no_match.save()
+        self.assertEqual(set(self._search_slugs('terraform')), {'terraform-basics', self.no_match.slug})
+
+    @skipUnless(connection.vendor == 'postgresql', "PostgreSQL search document")
+    def test_postgres_search_document_is_restored(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX courses_course_search_document_gin")
+        ensure_search_index()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'courses_course_search_document_gin'")
+            self.assertIsNotNone(cursor.fetchone())
+        self.assertEqual(self._search_slugs('kubernetes'), [self.title_match.slug, self.body_match.slug])
+
+    def test_search_ignores_query_syntax(self):
+        response = self.client.get(self.url, {'search': 'kubernetes" ( -'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_explicit_ordering_overrides_rank(self):
+        response = self.client.get(self.url, {'search': 'kubernetes', 'ordering': 'title'})
+        self.assertEqual([course['slug'] for course in response.data['results']], [self.body_match.slug, self.title_match.slug])
+
+    def test_list_without_search_has_no_search_fields(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertNotIn('search_rank', response.data['results'][0])
+
+
+class CourseFacetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user(
+            username='facet_instructor', email='facet_instructor@example.com', password='password123',
+            full_name='Facet Instructor'
+        )
+        cls.data = Category.objects.create(name='Data', slug='data')
+        cls.web = Category.objects.create(name='Web', slug='web')
+        for slug, category, level, language, price, is_free, description in [
+            ('python-basics', cls.data, 'beginner', 'en', Decimal('0.00'), True, 'Python for analysis.'),
+            ('pandas-deep-dive', cls.data, 'advanced', 'en', Decimal('49.00'), False, 'Python dataframes.'),
+            ('ml-es', cls.data, 'intermediate', 'es', Decimal('120.00'), False, 'Machine learning.'),
+            ('react', cls.web, 'beginner', 'en', Decimal('19.99'), False, 'Frontend with React.'),
+        ]:
+            Course.objects.create(
+                title=slug.replace('-', ' ').title(), slug=slug, instructor=cls.instructor, category=category,
+                level=level, language=language, price=price, is_free=is_free,
+                short_description=description, is_published=True
+            )
+        Course.objects.create(
+            title='Draft', slug='draft', instructor=cls.instructor, category=cls.web,
+            short_description='Unpublished.', is_published=False
+        )
+        cls.url = reverse('courses:course-facets')
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def counts(self, data, facet):
+        return {entry['value']: entry['count'] for entry in data['facets'][facet]}
+
+    def test_facets_for_whole_catalog(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(self.counts(response.data, 'category__slug'), {'data': 3, 'web': 1})
+        self.assertEqual(self.counts(response.data, 'level'), {'beginner': 2, 'advanced': 1, 'intermediate': 1})
+        self.assertEqual(self.counts(response.data, 'language'), {'en': 3, 'es': 1})
+        self.assertEqual(self.counts(response.data, 'is_free'), {True: 1, False: 3})
+        self.assertEqual(
+            self.counts(response.data, 'price_band'),
+            {'free': 1, 'under_25': 1, '25_to_50': 1, '50_to_100': 0, 'over_100': 1}
+        )
+
+    def test_facets_follow_filters_and_search(self):
+        response = self.client.get(self.url, {'category__slug': 'data', 'search': 'python'})
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(self.counts(response.data, 'level'), {'beginner': 1, 'advanced': 1})
+
+    def test_price_band_filter_on_list(self):
+        response = self.client.get(reverse('courses:course-list'), {'price_band': 'free,over_100'})
+        self.assertEqual(sorted(course['slug'] for course in response.data['results']), ['ml-es', 'python-basics'])
+
+    @override_settings(COURSE_FACET_CACHE_TIMEOUT=60)  # As with a shared cache
+    def test_anonymous_facets_cached_by_normalized_query(self):
+        self.client.get(self.url, {'level': 'beginner', 'language': 'en'})
+        with self.assertNumQueries(0):
+            response = self.client.get(f"{self.url}?language=en&level=beginner&page=2")
+        self.assertEqual(response.data['total'], 2)
+
+    def test_facets_computed_per_request_without_shared_cache(self):
+        self.client.get(self.url)
+        Course.objects.filter(slug='draft').update(is_published=True)  # Published by another worker
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['total'], 5)
+
+    @override_settings(COURSE_FACET_CACHE_TIMEOUT=60)
+    def test_course_change_invalidates_cached_facets(self):
+        self.client.get(self.url)
+        Course.objects.filter(slug='draft').get().delete()
+        Course.objects.create(
+            title='Vue', slug='vue', instructor=self.instructor, category=self.web,
+            short_description='Frontend with Vue.', is_published=True
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['total'], 5)
+
+
+class BulkEnrollmentTests(LearnerTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('courses:course-bulk-enroll', kwargs={'slug': self.course.slug})
+        self.learners = [
+            User.objects.create_user(
+                username=f'cohort_{i}', email=f'cohort{i}@example.com', password='password123', full_name=f'Cohort {i}'
+            )
+            for i in range(5)
+        ]
+
+    def upload(self, name, content, **data):
+        return self.client.post(self.url, {'file': SimpleUploadedFile(name, content.encode()), **data}, format='multipart')
+
+    def results(self, response):
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        return lines[:-1], lines[-1]['summary']
+
+    def test_bulk_enroll_csv_reports_each_row(self):
+        self.authenticate(self.instructor)
+        content = "name,email\n" + "".join(f"Cohort {i},cohort{i}@example.com\n" for i in range(5))
+        content += "Student,lt_student@example.com\nNobody,nobody@example.com\nBad,not-an-email\nAgain,cohort0@example.com\n"
+        response = self.upload('cohort.csv', content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows, summary = self.results(response)
+        self.assertEqual(summary, {'enrolled': 5, 'already_enrolled': 1, 'user_not_found': 1, 'invalid': 1, 'duplicate': 1})
+        self.assertEqual({row['row']: row['status'] for row in rows}[7], 'already_enrolled')
+
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 6)
+        progresses = CourseProgress.objects.filter(course=self.course, user__in=self.learners)
+        self.assertEqual(progresses.count(), 5)
+        self.assertTrue(all(progress.total_topics_count == 3 for progress in progresses))
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_enrollments, 6)
+
+    def test_bulk_enroll_ndjson_in_batches_uses_constant_queries(self):
+        self.authenticate(self.instructor)
+        content = "".join(json.dumps({'email': learner.email}) + "\n" for learner in self.learners)
+        response = self.upload('cohort.ndjson', content)
+        # topic count + per batch: users, existing enrollments, insert, read-back, progress insert, counter
+        with self.assertNumQueries(7 + 2):  # + savepoint pair around the batch
+            rows, summary = self.results(response)
+        self.assertEqual(summary, {'enrolled': 5})
+
+    def test_bulk_enroll_ndjson_non_string_emails_are_invalid(self):
+        self.authenticate(self.instructor)
+        records = [{'email': 123}, {'email': ['cohort0@example.com']}, {'email': None}, {'email': self.learners[1].email}]
+        rows, summary = self.results(self.upload('cohort.ndjson', "".join(json.dumps(record) + "\n" for record in records)))
+        self.assertEqual(summary, {'invalid': 3, 'enrolled': 1})
+        self.assertEqual([row['email'] for row in rows[:3]], [None, None, None])
+
+    def test_bulk_enroll_is_idempotent(self):
+        self.authenticate(self.instructor)
+        content = "".join(f"{learner.email}\n" for learner in self.learners)
+        self.results(self.upload('cohort.csv', content))
+        _rows, summary = self.results(self.upload('cohort.csv', content))
+        self.assertEqual(summary, {'already_enrolled': 5})
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_enrollments, 6)
+
+    def test_bulk_enroll_requires_course_instructor(self):
+        self.authenticate(self.student)
+        response = self.upload('cohort.csv', "cohort0@example.com\n")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Enrollment.objects.filter(user=self.learners[0]).exists())
+
+    def test_bulk_enroll_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write("email\n" + "".join(f"{learner.email}\n" for learner in self.learners))
+        self.addCleanup(os.remove, handle.name)
+        out = StringIO()
+        call_command('bulk_enroll', self.course.slug, handle.name, '--batch-size', '2', stdout=out)
+        self.assertIn('enrolled=5', out.getvalue())
+        self.assertEqual(CourseProgress.objects.filter(course=self.course).count(), 6)
+
+
+class EnrollCourseViewTests(LearnerTestDataMixin, APITestCase):
+    def test_enroll_creates_enrollment_and_progress(self):
+        self.authenticate(self.outsider)
+        response = self.client.post(reverse('courses:course-enroll', kwargs={'pk': self.course.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        progress = CourseProgress.objects.get(user=self.outsider, course=self.course)
+        self.assertEqual(progress.total_topics_count, 3)
+
+        response = self.client.get(reverse('courses:user-enrollments'))
+        self.assertEqual([course['slug'] for course in response.data['results']], [self.course.slug])
+
+    def test_enroll_twice_rejected(self):
+        self.authenticate(self.student)
+        response = self.client.post(reverse('courses:course-enroll', kwargs={'pk': self.course.pk}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ModuleOutlineTests(LearnerTestDataMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Topic.objects.filter(pk=cls.topic1.pk).update(content={'type': 'text', 'text_content': 'x' * 10000})
+        cls.question = Question.objects.create(topic=cls.topic1, text='Pick one', question_type='single-choice', order=1)
+        Choice.objects.create(question=cls.question, text='A', is_correct=True, order=1)
+        Choice.objects.create(question=cls.question, text='B', is_correct=False, order=2)
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('courses:course-modules-list', kwargs={'course_slug': self.course.slug})
+
+    def test_outline_omits_content_and_questions(self):
+        with self.assertNumQueries(3):  # modules, topics, count
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        topics = response.data['results'][0]['topics']
+        self.assertEqual([topic['slug'] for topic in topics], [self.topic1.slug, self.topic2.slug])
+        self.assertNotIn('content', topics[0])
+        self.assertNotIn('questions', topics[0])
+
+    def test_outline_expand_questions_prefetches(self):
+        with self.assertNumQueries(5):  # + questions, choices
+            response = self.client.get(self.url, {'expand': 'questions'})
+        questions = response.data['results'][0]['topics'][0]['questions']
+        self.assertEqual([choice['text'] for choice in questions[0]['choices']], ['A', 'B'])
+
+    def test_topic_content_endpoint_supports_etag(self):
+        self.authenticate(self.student)
+        url = reverse('courses:topic-content', kwargs={'pk': self.topic1.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['content']['text_content']), 10000)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.topic1.refresh_from_db()
+        self.topic1.content = {'type': 'text', 'text_content': 'updated'}
+        self.topic1.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content']['text_content'], 'updated')
+
+    def test_topic_content_requires_enrollment_unless_previewable(self):
+        self.authenticate(self.outsider)
+        url = reverse('courses:topic-content', kwargs={'pk': self.topic1.pk})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        Topic.objects.filter(pk=self.topic1.pk).update(is_previewable=True)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+
+class CoursePackageTests(LearnerTestDataMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.question = Question.objects.create(topic=cls.topic1, text='Pick one', question_type='single-choice', order=1)
+        Choice.objects.create(question=cls.question, text='A', is_correct=True, order=1)
+        Choice.objects.create(question=cls.question, text='B', is_correct=False, order=2)
+
+    def export(self):
+        self.authenticate(self.instructor)
+        response = self.client.get(reverse('courses:course-export', kwargs={'slug': self.course.slug}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def test_export_streams_hierarchy(self):
+        lines = [json.loads(line) for line in self.export().decode().splitlines()]
+        self.assertEqual([line['type'] for line in lines], [
+            'package', 'course', 'module', 'module', 'topic', 'topic', 'topic', 'question', 'choice', 'choice'
+        ])
+        self.assertEqual(lines[1]['fields']['slug'], self.course.slug)
+
+    def test_export_requires_instructor(self):
+        self.authenticate(self.student)
+        response = self.client.get(reverse('courses:course-export', kwargs={'slug': self.course.slug}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_round_trip_resolves_slug_conflicts(self):
+        package = self.export()
+        self.authenticate(self.outsider)
+        with self.assertNumQueries(11):  # user, slugs of course and topics, 5 inserts, duration, savepoints
+            response = self.client.post(
+                reverse('courses:course-import'),
+                {'file': SimpleUploadedFile('course.ndjson', package)}, format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['counts'], {'module': 2, 'topic': 3, 'question': 1, 'choice': 2})
+        self.assertEqual(response.data['slug'], 'learner-course-1')
+
+        course = Course.objects.get(pk=response.data['id'])
+        self.assertEqual(course.instructor, self.outsider)
+        self.assertFalse(course.is_published)
+        self.assertEqual(course.total_duration_minutes, 45)
+        self.assertEqual(
+            list(Topic.objects.filter(module__course=course).order_by('module__order', 'order').values_list('slug', flat=True)),
+            ['lt-topic-1-1-1', 'lt-topic-1-2-1', 'lt-topic-2-1-1']
+        )
+        self.assertEqual(Choice.objects.filter(question__topic__module__course=course, is_correct=True).count(), 1)
+
+    @override_settings(COURSE_ACCESS_CACHE_TIMEOUT=300)  # As with a shared cache
+    def test_importer_manages_imported_course_with_cached_access(self):
+        package = self.export()
+        self.authenticate(self.outsider)
+        self.client.get(reverse('courses:course-export', kwargs={'slug': self.course.slug}))  # Caches the outsider's access
+        response = self.client.post(
+            reverse('courses:course-import'), {'file': SimpleUploadedFile('course.ndjson', package)}, format='multipart'
+        )
+        response = self.client.get(reverse('courses:course-export', kwargs={'slug': response.data['slug']}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_import_rejects_fields_of_wrong_type(self):
+        lines = [json.loads(line) for line in self.export().decode().splitlines()]
+        for field, value in [('estimated_duration_minutes', None), ('order', 'first'), ('estimated_duration_minutes', [1])]:
+            broken = [dict(line, fields=dict(line['fields'], **{field: value})) if line['type'] == 'topic' else line
+                      for line in lines]
+            package = '\n'.join(json.dumps(line) for line in broken).encode()
+            response = self.client.post(
+                reverse('courses:course-import'), {'file': SimpleUploadedFile('course.ndjson', package)}, format='multipart'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (field, value))
+        self.assertEqual(Course.objects.filter(slug__startswith='learner-course-').count(), 0)
+
+    def test_import_rejects_dangling_references(self):
+        self.authenticate(self.instructor)
+        package = b'{"type": "package", "version": 1}\n{"type": "module", "ref": "m", "parent": "nope", "fields": {}}\n'
+        response = self.client.post(
+            reverse('courses:course-import'), {'file': SimpleUploadedFile('course.ndjson', package)}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('unknown course', response.data['detail'])
+
+    def test_export_and_import_commands(self):
+        with tempfile.NamedTemporaryFile(suffix='.ndjson', delete=False) as handle:
+            path = handle.name
+        self.addCleanup(os.remove, path)
+        call_command('export_course', self.course.slug, '-o', path, stderr=StringIO())
+        out = StringIO()
+        call_command('import_course', path, '--instructor', self.instructor.email, stdout=out)
+        self.assertIn("Imported course 'learner-course-1'", out.getvalue())
+        self.assertEqual(Topic.objects.filter(module__course__slug='learner-course-1').count(), 3)
+
+
+class CourseRecommendationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user(
+            username='rec_instructor', email='rec_instructor@example.com', password='password123', full_name='Rec Instructor'
+        )
+        cls.courses = {
+            slug: Course.objects.create(
+                title=slug.title(), slug=slug, instructor=instructor, short_description=slug, is_published=True
+            )
+            for slug in ['python', 'pandas', 'numpy', 'design']
+        }
+        cls.draft = Course.objects.create(title='Draft', slug='draft', instructor=instructor, short_description='draft')
+        baskets = [
+            ['python', 'pandas', 'numpy'],
+            ['python', 'pandas', 'draft'],
+            ['python', 'pandas'],
+            ['python', 'numpy', 'design'],
+            ['python', 'numpy', 'pandas'],
+            ['design', 'pandas'],
+        ]
+        for i, basket in enumerate(baskets):
+            learner = User.objects.create_user(
+                username=f'rec_{i}', email=f'rec{i}@example.com', password='password123', full_name=f'Rec {i}'
+            )
+            for slug in basket:
+                Enrollment.objects.create(user=learner, course=cls.courses.get(slug, cls.draft))
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def url(self, slug):
+        return reverse('courses:course-recommendations', kwargs={'slug': slug})
+
+    def test_recommendations_ranked_by_co_enrollment(self):
+        call_command('build_course_recommendations', stdout=StringIO())
+        with self.assertNumQueries(2):  # course lookup + recommendations
+            response = self.client.get(self.url('python'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([course['slug'] for course in response.data], ['pandas', 'numpy'])
+        self.assertGreater(response.data[0]['score'], response.data[1]['score'])
+
+    @override_settings(COURSE_RECOMMENDATION_CACHE_TIMEOUT=60)  # As with a shared cache
+    def test_recommendations_cached_until_rebuild(self):
+        call_command('build_course_recommendations', stdout=StringIO())
+        self.client.get(self.url('python'))
+        with self.assertNumQueries(1):  # course lookup; recommendations cached
+            self.client.get(self.url('python'))
+        Enrollment.objects.filter(course=self.courses['pandas']).delete()
+        call_command('build_course_recommendations', stdout=StringIO())
+        self.assertEqual([course['slug'] for course in self.client.get(self.url('python')).data], ['numpy'])
+
+    def test_rebuild_reaches_workers_without_shared_cache(self):
+        call_command('build_course_recommendations', stdout=StringIO())
+        self.client.get(self.url('python'))
+        Enrollment.objects.filter(course=self.courses['pandas']).delete()
+        # The rebuild runs in another process, whose invalidation does not reach this one
+        with mock.patch('apps.courses.recommendations.invalidate_recommendations'):
+            call_command('build_course_recommendations', stdout=StringIO())
+        self.assertEqual([course['slug'] for course in self.client.get(self.url('python')).data], ['numpy'])
+
+    def test_partial_rebuild_only_touches_given_courses(self):
+        call_command('build_course_recommendations', stdout=StringIO())
+        Enrollment.objects.filter(course=self.courses['design']).delete()
+        call_command('build_course_recommendations', '--course', str(self.courses['numpy'].id), '--min-co-enrollments', '1',
+                     stdout=StringIO())
+        self.assertEqual(
+            [course['slug'] for course in self.client.get(self.url('numpy')).data], ['python', 'pandas']
+        )
+        self.assertEqual([course['slug'] for course in self.client.get(self.url('python')).data], ['pandas', 'numpy'])
+
+    def test_no_recommendations_before_build(self):
+        response = self.client.get(self.url('python'))
+        self.assertEqual(response.data, [])
+
+
+@override_settings(COURSE_ACCESS_CACHE_TIMEOUT=300)  # As with a shared cache
+class CourseAccessTests(LearnerTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('courses:course-navigation', kwargs={'slug': self.course.slug})
+
+    def test_access_loaded_once_and_cached_per_user(self):
+        from apps.courses.access import CourseAccess
+        access = CourseAccess(self.student)
+        with self.assertNumQueries(1):
+            self.assertTrue(access.is_enrolled(self.course.pk))
+            self.assertFalse(access.is_instructor(self.course.pk))
+            self.assertTrue(CourseAccess(self.student).can_access(self.course.pk))
+        self.assertTrue(CourseAccess(self.instructor).can_manage(self.course.pk))
+
+    def test_enrollment_invalidates_cached_access(self):
+        self.authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        Enrollment.objects.create(user=self.outsider, course=self.course)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        Enrollment.objects.filter(user=self.outsider).delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_instructor_change_invalidates_cached_access(self):
+        self.authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.course.instructor = self.outsider
+        self.course.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_other_course_saves_keep_cached_access(self):
+        from apps.courses.access import access_cache_key
+        self.authenticate(self.student)
+        self.client.get(self.url)
+        self.course.title = 'Renamed'
+        self.course.save()
+        self.assertIsNotNone(cache.get(access_cache_key(self.student.pk)))
+
+    @override_settings(COURSE_ACCESS_CACHE_TIMEOUT=None)
+    def test_not_cached_without_shared_cache(self):
+        from apps.courses.access import CourseAccess, access_cache_timeout
+        self.assertEqual(access_cache_timeout(), 0)  # Tests run on the per-process LocMem cache
+        self.assertTrue(CourseAccess(self.student).is_enrolled(self.course.pk))
+        with self.assertNumQueries(1):
+            CourseAccess(self.student).is_enrolled(self.course.pk)
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache'}}):
+            self.assertEqual(access_cache_timeout(), 300)
+
+    def test_previewable_topic_content_without_enrollment(self):
+        Topic.objects.filter(pk=self.topic2.pk).update(is_previewable=True)
+        self.authenticate(self.outsider)
+        self.assertEqual(self.client.get(reverse('courses:topic-content', kwargs={'pk': self.topic2.pk})).status_code, 200)
+        self.assertEqual(self.client.get(reverse('courses:topic-content', kwargs={'pk': self.topic1.pk})).status_code, 403)
+
+
+
+class BulkReorderTests(LearnerTestDataMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.module3 = Module.objects.create(course=cls.course, title='Module Three', order=3)
+        cls.questions = [
+            Question.objects.create(topic=cls.topic1, text=f'Q{i}', question_type='single-choice', order=i)
+            for i in range(1, 4)
+        ]
+        cls.choices = [Choice.objects.create(question=cls.questions[0], text=c, order=i) for i, c in enumerate('ABC', start=1)]
+
+    def post(self, url, ids):
+        return self.client.post(url, {'ids': [str(pk) for pk in ids]}, format='json')
+
+    def test_reorder_modules_constant_queries(self):
+        self.authenticate(self.instructor)
+        url = reverse('courses:course-modules-reorder', kwargs={'course_slug': self.course.slug})
+        new_order = [self.module3, self.module1, self.module2]
+        warmup = self.client.post(url, {'ids': []}, format='json')
+        self.assertEqual(warmup.status_code, status.HTTP_400_BAD_REQUEST)
+        # JWT user, course, course access, savepoint, siblings, offset update, bulk_update, release
+        with self.assertNumQueries(8):
+            response = self.post(url, [module.pk for module in new_order])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reordered'], 3)
+        self.assertEqual(list(Module.objects.filter(course=self.course).order_by('order')), new_order)
+
+    def test_reorder_topics_refreshes_navigation(self):
+        self.authenticate(self.instructor)
+        nav_url = reverse('courses:course-navigation', kwargs={'slug': self.course.slug})
+        self.client.get(nav_url)
+        url = reverse('courses:module-topics-reorder', kwargs={'course_slug': self.course.slug, 'module_pk': self.module1.pk})
+        self.assertEqual(self.post(url, [self.topic2.pk, self.topic1.pk]).status_code, status.HTTP_200_OK)
+        topics = self.client.get(nav_url).data['modules'][0]['topics']
+        self.assertEqual([topic['id'] for topic in topics], [self.topic2.pk, self.topic1.pk])
+
+    def test_reorder_questions_and_choices(self):
+        self.authenticate(self.instructor)
+        url = reverse('courses:topic-reorder-questions', kwargs={'pk': self.topic1.pk})
+        reversed_questions = list(reversed(self.questions))
+        self.assertEqual(self.post(url, [q.pk for q in reversed_questions]).status_code, status.HTTP_200_OK)
+        self.assertEqual(list(Question.objects.filter(topic=self.topic1).order_by('order')), reversed_questions)
+
+        url = reverse('courses:topic-reorder-choices', kwargs={'pk': self.topic1.pk, 'question_pk': self.questions[0].pk})
+        new_order = [self.choices[1], self.choices[2], self.choices[0]]
+        self.assertEqual(self.post(url, [c.pk for c in new_order]).status_code, status.HTTP_200_OK)
+        self.assertEqual(list(Choice.objects.filter(question=self.questions[0]).order_by('order')), new_order)
+
+    def test_reorder_rejects_partial_or_foreign_ids(self):
+        self.authenticate(self.instructor)
+        url = reverse('courses:course-modules-reorder', kwargs={'course_slug': self.course.slug})
+        self.assertEqual(self.post(url, [self.module1.pk, self.module2.pk]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.post(url, [self.module1.pk, self.module2.pk, self.topic1.pk]).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(list(Module.objects.filter(course=self.course).order_by('order')),
+                         [self.module1, self.module2, self.module3])
+
+    def test_reorder_requires_instructor(self):
+        self.authenticate(self.student)
+        url = reverse('courses:topic-reorder-questions', kwargs={'pk': self.topic1.pk})
+        response = self.post(url, [q.pk for q in self.questions])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CourseAnalyticsTests(LearnerTestDataMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.question1 = Question.objects.create(topic=cls.topic1, text='Easy?', question_type='single-choice', order=1)
+        cls.question2 = Question.objects.create(topic=cls.topic1, text='Hard?', question_type='single-choice', order=2)
+
+    def complete(self, user, topic, progress):
+        TopicProgress.objects.create(user=user, topic=topic, course_progress=progress, is_completed=True, completed_at=timezone.now())
+
+    def answer_quiz(self, user, correct):
+        attempt = QuizAttempt.objects.create(user=user, topic=self.topic1)
+        for question, is_correct in zip([self.question1, self.question2], correct):
+            UserTopicAttemptAnswer.objects.create(quiz_attempt=attempt, question=question, is_correct=is_correct)
+
+    def roll_up(self):
+        run_rollups(until=timezone.now())
+
+    def url(self, name):
+        return reverse(f'courses:course-analytics-{name}', kwargs={'slug': self.course.slug})
+
+    def test_rollups_are_incremental(self):
+        self.complete(self.student, self.topic1, self.course_progress)
+        self.answer_quiz(self.student, [True, False])
+        self.roll_up()
+        self.roll_up()  # Nothing new since the watermark: no double counting
+        today = CourseDailyStats.objects.get(course=self.course)
+        self.assertEqual((today.enrollments, today.topic_completions, today.quiz_attempts), (1, 1, 1))
+
+        enrollment = Enrollment.objects.create(user=self.outsider, course=self.course)
+        progress = CourseProgress.objects.create(user=self.outsider, course=self.course, enrollment=enrollment)
+        self.complete(self.outsider, self.topic1, progress)
+        self.answer_quiz(self.outsider, [True, True])
+        self.roll_up()
+        today.refresh_from_db()
+        self.assertEqual((today.enrollments, today.topic_completions, today.quiz_attempts), (2, 2, 2))
+
+    def test_instructor_reads_series_funnel_and_questions(self):
+        self.complete(self.student, self.topic1, self.course_progress)
+        self.complete(self.student, self.topic2, self.course_progress)
+        self.answer_quiz(self.student, [True, False])
+        self.answer_quiz(self.student, [True, True])
+        self.roll_up()
+        self.authenticate(self.instructor)
+
+        series = self.client.get(self.url('enrollments'), {'start': (timezone.now().date() - datetime.timedelta(days=6)).isoformat()})
+        self.assertEqual(series.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(series.data['results']), 7)
+        self.assertEqual(series.data['results'][-1]['enrollments'], 1)
+        self.assertEqual(series.data['results'][0]['enrollments'], 0)
+
+        funnel = self.client.get(self.url('funnel')).data['results']
+        self.assertEqual(funnel['enrollments'], 1)
+        self.assertEqual([module['completions'] for module in funnel['modules']], [1, 0])
+        self.assertEqual([topic['completions'] for topic in funnel['modules'][0]['topics']], [1, 1])
+
+        questions = self.client.get(self.url('questions')).data['results']
+        self.assertEqual([q['id'] for q in questions], [self.question2.pk, self.question1.pk])
+        self.assertEqual((questions[0]['answers'], questions[0]['correct_rate']), (2, 0.5))
+
+    def test_command_leaves_unsettled_rows_for_the_next_run(self):
+        out = StringIO()
+        call_command('rollup_course_analytics', stdout=out)
+        self.assertIn('enrollments: 0 rollup row(s) updated', out.getvalue())
+        self.assertFalse(CourseDailyStats.objects.exists())
+
+    def test_endpoints_read_only_rollups(self):
+        self.roll_up()
+        self.authenticate(self.instructor)
+        # JWT user, course, course access, rollup aggregation
+        with self.assertNumQueries(4):
+            self.client.get(self.url('questions'))
+        # JWT user, course, course access, topic totals, enrollments, modules, topics
+        with self.assertNumQueries(7):
+            self.client.get(self.url('funnel'))
+
+    def test_learners_are_refused_and_bad_ranges_rejected(self):
+        self.authenticate(self.student)
+        self.assertEqual(self.client.get(self.url('enrollments')).status_code, status.HTTP_403_FORBIDDEN)
+        self.authenticate(self.instructor)
+        response = self.client.get(self.url('enrollments'), {'start': '2024-02-01', 'end': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url('funnel'), {'start': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ResumeLearningTests(LearnerTestDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.authenticate(self.student)
+
+    def view(self, topic):
+        url = reverse('courses:topic-content', kwargs={'pk': topic.pk})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_topic_views_are_coalesced(self):
+        self.view(self.topic1)
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.last_accessed_topic, self.topic1)
+        updated_at = self.course_progress.updated_at
+
+        self.view(self.topic1)  # Same topic again: nothing written
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.updated_at, updated_at)
+
+    def test_latest_topic_persists_when_learner_leaves(self):
+        # A, then B a few seconds later, then the learner leaves
+        self.view(self.topic1)
+        self.view(self.topic2)
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.last_accessed_topic, self.topic2)
+        cache.clear()  # Another worker, or a restart
+        resume = self.client.get(reverse('courses:resume')).data
+        self.assertEqual(resume[0]['last_accessed_topic']['id'], self.topic2.pk)
+
+    def test_resume_picks_next_unfinished_topic(self):
+        TopicProgress.objects.create(user=self.student, topic=self.topic1, course_progress=self.course_progress,
+                                     is_completed=True, completed_at=timezone.now())
+        CourseProgress.objects.filter(pk=self.course_progress.pk).update(last_accessed_topic=self.topic1)
+        response = self.client.get(reverse('courses:resume'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['course']['slug'], self.course.slug)
+        self.assertEqual(response.data[0]['next_topic']['id'], self.topic2.pk)
+
+    def test_resume_constant_queries(self):
+        for i in range(3):
+            course = Course.objects.create(title=f'Extra {i}', slug=f'extra-{i}', instructor=self.instructor,
+                                           short_description='s', long_description='l', is_published=True)
+            module = Module.objects.create(course=course, title='M', order=1)
+            Topic.objects.create(module=module, title='T', slug=f'extra-topic-{i}', order=1)
+            enrollment = Enrollment.objects.create(user=self.student, course=course)
+            CourseProgress.objects.create(user=self.student, course=course, enrollment=enrollment, total_topics_count=1)
+        # JWT user, progress rows, topics, completed topics
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('courses:resume'))
+        self.assertEqual(len(response.data), 4)
+        self.assertTrue(all(point['next_topic'] for point in response.data))
+
+    def test_outsider_views_are_not_tracked(self):
+        self.authenticate(self.outsider)
+        self.client.get(reverse('courses:topic-detail', kwargs={'pk': self.topic1.pk}))
+        self.assertEqual(self.client.get(reverse('courses:resume')).data, [])
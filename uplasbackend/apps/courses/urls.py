@@ -1,8 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from rest_framework_nested import routers # For nested routing
 from .views import (
     CategoryViewSet, CourseViewSet, ModuleViewSet, TopicViewSet,
-    EnrollCourseView, UserEnrollmentListView
+    EnrollCourseView, UserEnrollmentListView, ResumeLearningView, QuizSubmissionView
 )
 
 app_name = 'courses'
@@ -12,9 +13,22 @@ router.register(r'categories', CategoryViewSet)
 router.register(r'courses', CourseViewSet) 
 router.register(r'topics', TopicViewSet) # Register Topics explicitly to access /courses/topics/{id}/submit_answer/
 
+# Modules nested under courses, topics nested under modules
+# URL: /api/courses/courses/{course_slug}/modules/[?expand=questions]
+# URL: /api/courses/courses/{course_slug}/modules/{module_pk}/topics/
+# URL: /api/courses/courses/{course_slug}/modules/{module_pk}/topics/{pk}/content/
+courses_router = routers.NestedSimpleRouter(router, r'courses', lookup='course')
+courses_router.register(r'modules', ModuleViewSet, basename='course-modules')
+modules_router = routers.NestedSimpleRouter(courses_router, r'modules', lookup='module')
+modules_router.register(r'topics', TopicViewSet, basename='module-topics')
+
 urlpatterns = [
     path('', include(router.urls)),
+    path('', include(courses_router.urls)),
+    path('', include(modules_router.urls)),
     path('enrollments/', UserEnrollmentListView.as_view(), name='user-enrollments'),
-    path('courses/<int:pk>/enroll/', EnrollCourseView.as_view(), name='course-enroll'),
+    path('resume/', ResumeLearningView.as_view(), name='resume'),
+    path('courses/<uuid:pk>/enroll/', EnrollCourseView.as_view(), name='course-enroll'),
+    path('quiz/submit/', QuizSubmissionView.as_view(), name='submit-quiz'),
 ]
 
@@ -1,13 +1,40 @@
+import json
+
 from rest_framework import viewsets, generics, permissions, status
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+
+from django.db.models import Prefetch
 
-from .models import Category, Course, Module, Topic
-from .serializers import CategorySerializer, CourseListSerializer, CourseDetailSerializer, ModuleDetailSerializer, TopicDetailSerializer
-from .permissions import IsInstructorOrReadOnly, IsEnrolled
+from .models import Category, Course, Module, Topic, Question, Choice
+from .serializers import (
+    CategorySerializer, CourseListSerializer, CourseDetailSerializer, TopicDetailSerializer,
+    ModuleOutlineSerializer, TopicOutlineSerializer, RecommendedCourseSerializer,
+    QuizAnswerSerializer, QuizSubmissionSerializer, ReorderSerializer
+)
+from .permissions import IsInstructorOrReadOnly, IsCourseInstructor, IsEnrolled, CanPerformEnrolledAction, CanViewTopicContent
+from .navigation import build_navigation
+from .content import get_topic_content, topic_content_etag
+from .progress import mark_topic_complete, NotEnrolledError
+from .search import CourseSearchFilter
+from .facets import PriceBandFilter, get_facets
+from .enrollment import (
+    INPUT_FORMATS, AlreadyEnrolledError, bulk_enroll, detect_format, enroll_user, iter_text_lines, parse_cohort_rows, summarize
+)
+from .packaging import CoursePackageError, export_course, import_course
+from .recommendations import TOP_K, get_recommended_courses
+from .ordering import ReorderError, reorder_children
+from .access import get_course_access
+from .resume import get_resume_points, record_topic_view
+from .analytics import (
+    DEFAULT_SERIES_DAYS, AnalyticsError, completion_funnel, enrollment_series, parse_date_range, question_difficulty,
+)
+from .grading import get_answer_key, grade_answers, submit_quiz, QuizGradingError
 
 # ==============================================================================
 # EXISTING VIEWSETS
@@ -22,12 +49,23 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
 class CourseViewSet(viewsets.ModelViewSet):
     queryset = Course.objects.filter(is_published=True)
     permission_classes = [IsInstructorOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['category__slug', 'level']
-    search_fields = ['title', 'short_description', 'long_description']
+    filter_backends = [DjangoFilterBackend, PriceBandFilter, CourseSearchFilter, OrderingFilter]
+    filterset_fields = ['category__slug', 'level', 'language', 'is_free']
     ordering_fields = ['title', 'price', 'created_at', 'average_rating']
     lookup_field = 'slug'
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('export', 'analytics_enrollments', 'analytics_funnel', 'analytics_questions'):
+            queryset = Course.objects.all()  # Drafts too; IsCourseInstructor guards access
+        queryset = queryset.select_related('category', 'instructor')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('modules', queryset=Module.objects.order_by('order')),
+                Prefetch('modules__topics', queryset=topic_outline_queryset()),
+            )
+        return queryset
+
     def get_serializer_class(self):
         if self.action == 'list':
             return CourseListSerializer
@@ -36,57 +74,181 @@ class CourseViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(instructor=self.request.user)
 
-    # --- ADD THIS ACTION ---
+    @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    def facets(self, request):
+        """
+        Counts per category, level, language, is_free and price band for the
+        courses matching the current filters (same query parameters as the list).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(get_facets(request, queryset))
+
+    @action(detail=True, methods=['post'], url_path='bulk-enroll',
+            permission_classes=[permissions.IsAuthenticated, IsInstructorOrReadOnly])
+    def bulk_enroll(self, request, slug=None):
+        """
+        Enrolls a cohort from an uploaded CSV or NDJSON file (`file`, one email
+        per row). The file is processed in batches and the per-row results are
+        streamed back as NDJSON, followed by a final {"summary": {...}} line.
+        """
+        course = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Upload the cohort as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        input_format = request.data.get('input_format') or detect_format(upload.name)
+        if input_format not in INPUT_FORMATS:
+            return Response({"detail": f"input_format must be one of {', '.join(INPUT_FORMATS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def stream():
+            counts = {}
+            rows = parse_cohort_rows(iter_text_lines(upload.file), input_format)
+            for result in summarize(bulk_enroll(course, rows), counts):
+                yield json.dumps(result) + "\n"
+            yield json.dumps({"summary": counts}) + "\n"
+
+        return StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def export(self, request, slug=None):
+        """Streams the course and its full content hierarchy as an NDJSON course package."""
+        course = self.get_object()
+        response = StreamingHttpResponse(export_course(course), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{course.slug}.ndjson"'
+        return response
+
+    def _analytics_response(self, request, build, default_days=None):
+        course = self.get_object()
+        try:
+            start, end = parse_date_range(request.query_params, default_days)
+        except AnalyticsError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"start": start, "end": end, "results": build(course.pk, start, end)})
+
+    @action(detail=True, methods=['get'], url_path='analytics/enrollments', url_name='analytics-enrollments',
+            permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def analytics_enrollments(self, request, slug=None):
+        """
+        Daily enrollments, topic completions and quiz attempts between `start`
+        and `end` (YYYY-MM-DD, default: the last 30 days). Read from the daily
+        rollups, so activity shows up once `rollup_course_analytics` has run.
+        """
+        return self._analytics_response(request, enrollment_series, DEFAULT_SERIES_DAYS)
+
+    @action(detail=True, methods=['get'], url_path='analytics/funnel', url_name='analytics-funnel',
+            permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def analytics_funnel(self, request, slug=None):
+        """Module-by-module completion funnel, optionally limited to `start`..`end`."""
+        return self._analytics_response(request, completion_funnel)
+
+    @action(detail=True, methods=['get'], url_path='analytics/questions', url_name='analytics-questions',
+            permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def analytics_questions(self, request, slug=None):
+        """Correctness rate per quiz question, hardest first, optionally limited to `start`..`end`."""
+        return self._analytics_response(request, question_difficulty)
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import', permission_classes=[permissions.IsAuthenticated])
+    def import_package(self, request):
+        """
+        Creates a new (unpublished) course owned by the requesting user from an
+        uploaded course package (`file`). Slugs that already exist are suffixed.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Upload the course package as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            course, counts = import_course(upload, request.user)
+        except CoursePackageError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"id": course.id, "slug": course.slug, "counts": counts}, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    def recommendations(self, request, slug=None):
+        """
+        "Learners also took": published courses most often taken together with
+        this one, read from the precomputed table (see recommendations.py).
+        """
+        course = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', TOP_K)), 1), TOP_K)
+        except ValueError:
+            limit = TOP_K
+        courses = get_recommended_courses(course.id, limit)
+        return Response(RecommendedCourseSerializer(courses, many=True, context={'request': request}).data)
+
     @action(detail=True, methods=['get'], permission_classes=[IsEnrolled])
     def navigation(self, request, slug=None):
         """
         Returns the full course hierarchy (Modules -> Topics) with 
         completion status for the sidebar navigation.
+        The outline is cached per course; only the user's completion
+        state is queried on each request.
         """
         course = self.get_object()
-        modules = course.modules.all().order_by('order')
-        
-        # Build the tree manually or use a specific NavigationSerializer
-        nav_data = {
-            "title": course.title,
-            "progress": 0, # Calculate actual progress here based on UserCourseProgress
-            "modules": []
-        }
-        
-        for module in modules:
-            topics_data = []
-            for topic in module.topics.all().order_by('order'):
-                # Check if user has completed this topic
-                # is_completed = topic.completions.filter(user=request.user).exists()
-                is_completed = False # Placeholder logic
-                topics_data.append({
-                    "id": topic.id, # Using ID for mapping
-                    "slug": topic.slug, # Useful if routing by slug
-                    "title": topic.title,
-                    "is_completed": is_completed,
-                    "is_locked": False # Implement lock logic based on progress
-                })
-            
-            nav_data["modules"].append({
-                "id": module.id,
-                "title": module.title,
-                "topics": topics_data
-            })
-            
-        return Response(nav_data)
+        return Response(build_navigation(course, request.user))
+
+def expand_questions_requested(request):
+    return 'questions' in request.query_params.get('expand', '').split(',')
+
+def topic_outline_queryset(expand_questions=False):
+    """Topics without their content body, optionally with questions and choices prefetched."""
+    topics = Topic.objects.defer('content').order_by('order')
+    if expand_questions:
+        topics = topics.prefetch_related(
+            Prefetch('questions', queryset=Question.objects.order_by('order').prefetch_related(
+                Prefetch('choices', queryset=Choice.objects.order_by('order'))
+            ))
+        )
+    return topics
+
+def reorder_response(request, model, parent_id):
+    """Applies a {"ids": [...]} reorder payload to the children of `parent_id`."""
+    serializer = ReorderSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        reordered = reorder_children(model, parent_id, serializer.validated_data['ids'])
+    except ReorderError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"status": "success", "reordered": reordered})
 
 class ModuleViewSet(viewsets.ModelViewSet):
-    serializer_class = ModuleDetailSerializer
+    """
+    Modules of a course with a lean topic outline. Topic bodies are fetched
+    separately from /topics/{id}/content/; pass ?expand=questions to include
+    each topic's questions and choices.
+    """
+    serializer_class = ModuleOutlineSerializer
     permission_classes = [IsInstructorOrReadOnly]
 
     def get_queryset(self):
         course_slug = self.kwargs.get('course_slug')
-        return Module.objects.filter(course__slug=course_slug).order_by('order')
+        topics = topic_outline_queryset(expand_questions_requested(self.request))
+        return (
+            Module.objects.filter(course__slug=course_slug)
+            .select_related('course__instructor')
+            .prefetch_related(Prefetch('topics', queryset=topics))
+            .order_by('order')
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand_questions'] = expand_questions_requested(self.request)
+        return context
 
     def perform_create(self, serializer):
         course = Course.objects.get(slug=self.kwargs.get('course_slug'))
         serializer.save(course=course)
 
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def reorder(self, request, course_slug=None):
+        """
+        Sets the order of all modules of the course at once.
+        POST {"ids": [<module id>, ...]} listing every module in its new position.
+        """
+        course = get_object_or_404(Course.objects.only('id', 'instructor_id'), slug=course_slug)
+        self.check_object_permissions(request, course)
+        return reorder_response(request, Module, course.pk)
+
 class TopicViewSet(viewsets.ModelViewSet):
     queryset = Topic.objects.all() # Added queryset
     serializer_class = TopicDetailSerializer
@@ -94,52 +256,128 @@ class TopicViewSet(viewsets.ModelViewSet):
     # lookup_field = 'slug' # Careful with lookup fields if using ID in routes
 
     def get_queryset(self):
+        if self.action == 'list':
+            queryset = topic_outline_queryset(expand_questions_requested(self.request))
+        elif self.action == 'content':
+            queryset = Topic.objects.defer('content')
+        elif self.action == 'retrieve':
+            queryset = Topic.objects.prefetch_related('questions__choices')
+        else:
+            queryset = Topic.objects.all()
+        queryset = queryset.select_related('module__course')
         # If accessed nested
         if 'module_pk' in self.kwargs:
-            return Topic.objects.filter(module_id=self.kwargs['module_pk']).order_by('order')
-        return Topic.objects.all()
+            return queryset.filter(module_id=self.kwargs['module_pk']).order_by('order')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return TopicOutlineSerializer
+        return TopicDetailSerializer
+
+    def track_view(self, topic):
+        """Records the lesson view for the resume endpoint when the user is enrolled."""
+        course_id = topic.module.course_id
+        if get_course_access(self.request).is_enrolled(course_id):
+            record_topic_view(self.request.user.pk, course_id, topic.pk)
+
+    def retrieve(self, request, *args, **kwargs):
+        topic = self.get_object()
+        self.track_view(topic)
+        return Response(self.get_serializer(topic).data)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand_questions'] = expand_questions_requested(self.request)
+        return context
+
+    @action(detail=True, methods=['get'], permission_classes=[CanViewTopicContent])
+    def content(self, request, pk=None, **kwargs):
+        """
+        Returns the body of a topic. Responses carry an ETag derived from the
+        topic's updated_at, so clients revalidate with If-None-Match and get a
+        304 without the body being loaded; bodies are also cached server-side.
+        """
+        topic = self.get_object()
+        self.track_view(topic)
+        etag = topic_content_etag(topic)
+        headers = {'ETag': etag, 'Cache-Control': 'private, max-age=0, must-revalidate'}
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(get_topic_content(topic, etag), headers=headers)
 
     def perform_create(self, serializer):
         module = Module.objects.get(pk=self.kwargs.get('module_pk'))
         serializer.save(module=module)
 
-    # --- ADD THIS ACTION ---
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def reorder(self, request, **kwargs):
+        """
+        Sets the order of all topics of a module (nested route only).
+        POST {"ids": [<topic id>, ...]}
+        """
+        module = get_object_or_404(Module.objects.only('id', 'course_id'), pk=self.kwargs.get('module_pk'))
+        self.check_object_permissions(request, module)
+        return reorder_response(request, Topic, module.pk)
+
+    @action(detail=True, methods=['post'], url_path='questions/reorder', url_name='reorder-questions',
+            permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def reorder_questions(self, request, pk=None, **kwargs):
+        """POST {"ids": [<question id>, ...]} to set the order of all questions of the topic."""
+        topic = self.get_object()
+        return reorder_response(request, Question, topic.pk)
+
+    @action(detail=True, methods=['post'], url_path=r'questions/(?P<question_pk>[0-9a-fA-F-]{32,36})/choices/reorder',
+            url_name='reorder-choices', permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def reorder_choices(self, request, pk=None, question_pk=None, **kwargs):
+        """POST {"ids": [<choice id>, ...]} to set the order of all choices of one of the topic's questions."""
+        topic = self.get_object()
+        question = get_object_or_404(Question.objects.only('id'), pk=question_pk, topic=topic)
+        return reorder_response(request, Choice, question.pk)
+
     @action(detail=True, methods=['post'], url_path='submit_answer')
     def submit_answer(self, request, pk=None):
         """
-        Validates a user's answer to a question within this topic.
+        Checks a single answer for instant feedback, against the topic's cached answer key.
+        Nothing is persisted; whole quizzes are submitted through QuizSubmissionView.
         """
         topic = self.get_object()
-        user_answer = request.data.get('answer')
-        
-        # Simple Logic: In reality, you'd look up the specific Question model
-        # linked to this topic.
-        # For parity, we assume the Topic has a "questions" relation or field.
-        
-        # Mocking the grading logic if Question model isn't strictly defined yet
-        is_correct = True # Replace with: topic.questions.first().check_answer(user_answer)
-        
+        serializer = QuizAnswerSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = grade_answers(get_answer_key(topic.id), [serializer.validated_data])[0]
+        except QuizGradingError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        is_correct = result['is_correct']
         feedback = "Correct! You nailed the definition." if is_correct else "Not quite. Try focusing on..."
-        
+
         return Response({
             "is_correct": is_correct,
             "feedback": feedback,
-            "xp_awarded": 10 if is_correct else 0
+            "explanation": result['explanation'],
         })
-        
+
     @action(detail=True, methods=['post'], url_path='complete')
     def mark_complete(self, request, pk=None):
         """
         Manually marks a topic as complete (e.g., for reading-only topics).
+        Counters on CourseProgress and the user's XP are updated in the same transaction.
         """
         topic = self.get_object()
-        # In a real app, you would create a Completion model instance here
-        # Completion.objects.get_or_create(user=request.user, topic=topic)
-        
+        try:
+            result = mark_topic_complete(request.user, topic)
+        except NotEnrolledError:
+            return Response(
+                {"detail": "You must be enrolled in this course to track progress."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         return Response({
-            "status": "success", 
-            "message": "Topic marked as complete",
-            "xp_awarded": 5
+            "status": "success",
+            "message": "Topic marked as complete" if result['newly_completed'] else "Topic already completed",
+            **result
         })
 
 
@@ -151,9 +389,8 @@ class CourseListView(generics.ListAPIView):
     queryset = Course.objects.filter(is_published=True)
     serializer_class = CourseListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['category__slug', 'level']
-    search_fields = ['title', 'short_description', 'long_description']
+    filter_backends = [DjangoFilterBackend, PriceBandFilter, CourseSearchFilter, OrderingFilter]
+    filterset_fields = ['category__slug', 'level', 'language', 'is_free']
     ordering_fields = ['title', 'price', 'created_at', 'average_rating']
 
 class CourseDetailView(generics.RetrieveAPIView):
@@ -165,19 +402,18 @@ class CourseDetailView(generics.RetrieveAPIView):
 class EnrollCourseView(APIView):
     """
     Handles course enrollment. 
-    POST /courses/<int:pk>/enroll/
+    POST /courses/<uuid:pk>/enroll/
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk=None):
         course = get_object_or_404(Course, pk=pk)
-        user = request.user
 
-        if course.students.filter(id=user.id).exists():
+        try:
+            enroll_user(request.user, course)
+        except AlreadyEnrolledError:
             return Response({"message": "Already enrolled"}, status=status.HTTP_400_BAD_REQUEST)
 
-        course.students.add(user)
-        
         return Response({
             "message": "Enrolled successfully",
             "course_slug": course.slug
@@ -192,7 +428,48 @@ class UserEnrollmentListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Course.objects.filter(students=self.request.user)
+        return Course.objects.filter(enrollments__user=self.request.user).select_related('category', 'instructor').order_by('-enrollments__enrolled_at')
+
+class ResumeLearningView(APIView):
+    """
+    Where to continue in each unfinished enrolled course, most recently active first.
+    GET /courses/resume/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        results = []
+        for point in get_resume_points(request.user):
+            progress = point['progress']
+            course = progress.course
+            results.append({
+                'course': {'id': course.id, 'slug': course.slug, 'title': course.title, 'thumbnail_url': course.thumbnail_url},
+                'progress_percentage': progress.progress_percentage,
+                'completed_topics_count': progress.completed_topics_count,
+                'total_topics_count': progress.total_topics_count,
+                'last_accessed_topic': point['last_topic'],
+                'next_topic': point['next_topic'],
+            })
+        return Response(results)
+
+class QuizSubmissionView(APIView):
+    """
+    Grades all answers for a topic's quiz in one request and records the attempt.
+    POST /courses/quiz/submit/
+    """
+    permission_classes = [permissions.IsAuthenticated, CanPerformEnrolledAction]
+
+    def post(self, request):
+        serializer = QuizSubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        topic = get_object_or_404(Topic.objects.select_related('module__course'), pk=serializer.validated_data['topic_id'])
+        self.check_object_permissions(request, topic)
+
+        try:
+            result = submit_quiz(request.user, topic, serializer.validated_data['answers'])
+        except QuizGradingError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
 
 class LessonContentView(APIView):
     permission_classes = [permissions.IsAuthenticated] 
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
-from django.utils.text import slugify # For generating slugs if needed
+
+from apps.core.slugs import with_unique_slug
 
 from .models import (
     ProjectTag, Project, UserProject, ProjectSubmission, ProjectAssessment,
@@ -98,40 +99,32 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         if 'created_by' not in validated_data and self.context['request'].user.is_authenticated:
             validated_data['created_by'] = self.context['request'].user
 
-        if 'slug' not in validated_data or not validated_data['slug']:
-            validated_data['slug'] = slugify(validated_data['title'])
-            # Ensure slug uniqueness if auto-generating
-            original_slug = validated_data['slug']
-            counter = 1
-            while Project.objects.filter(slug=validated_data['slug']).exists():
-                validated_data['slug'] = f"{original_slug}-{counter}"
-                counter += 1
-        
         # Handle ManyToMany for technology_tag_ids
         tags_data = validated_data.pop('technologies_used', None) # source='technologies_used' for technology_tag_ids
-        project = Project.objects.create(**validated_data)
+        if 'slug' not in validated_data or not validated_data['slug']:
+            # Auto-generated slugs are made unique (retried if a concurrent create takes the same one)
+            project = with_unique_slug(
+                Project, validated_data['title'], lambda slug: Project.objects.create(**{**validated_data, 'slug': slug})
+            )
+        else:
+            project = Project.objects.create(**validated_data)
         if tags_data:
             project.technologies_used.set(tags_data)
         return project
 
     def update(self, instance, validated_data):
-        if 'slug' not in validated_data or not validated_data.get('slug'):
-            if 'title' in validated_data and validated_data['title'] != instance.title:
-                new_slug = slugify(validated_data['title'])
-                # Check uniqueness if slug changes
-                if new_slug != instance.slug and Project.objects.filter(slug=new_slug).exclude(pk=instance.pk).exists():
-                    original_slug = new_slug
-                    counter = 1
-                    while Project.objects.filter(slug=new_slug).exclude(pk=instance.pk).exists():
-                        new_slug = f"{original_slug}-{counter}"
-                        counter += 1
-                validated_data['slug'] = new_slug
-        
         # Handle ManyToMany for technology_tag_ids
         if 'technologies_used' in validated_data: # This key comes from source='technologies_used'
             tags_data = validated_data.pop('technologies_used')
             instance.technologies_used.set(tags_data)
 
+        if 'slug' not in validated_data or not validated_data.get('slug'):
+            if 'title' in validated_data and validated_data['title'] != instance.title:
+                update = super().update
+                return with_unique_slug(
+                    Project, validated_data['title'],
+                    lambda slug: update(instance, {**validated_data, 'slug': slug}), exclude_pk=instance.pk,
+                )
         return super().update(instance, validated_data)
 
 
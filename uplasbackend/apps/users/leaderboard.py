@@ -0,0 +1,133 @@
+# users/leaderboard.py
+"""
+XP leaderboards (global, per country, per industry, per course).
+
+Standings are materialized in LeaderboardEntry by `refresh_leaderboards`
+(the `refresh_leaderboards` command, run on a schedule) with one RANK()
+window query per scope. Nothing on the XP-award path writes them: shifting
+other users' ranks as one learner gains XP would rewrite and lock large
+parts of each board on every click. Pages are the standings of the last
+refresh, rank ranges on the (scope, scope_value, rank) index, and each
+board's entry count and refresh time are stored in its Leaderboard row, so
+pages need no COUNT(*). The caller's own standing is live: their current XP
+and one plus the number of entries with more XP, a count over the
+(scope, scope_value, xp) index, so ties keep RANK() semantics.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+from .models import Leaderboard, LeaderboardEntry, User
+
+SCOPES = ['global', 'country', 'industry', 'course']
+SCOPED_BY_PROFILE = {'country': 'country', 'industry': 'industry'}
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+REFRESH_BATCH_SIZE = 2000
+
+
+def _standings(scope):
+    """Yields (scope_value, user_id, xp, rank) for every entry of a scope, ranked in the database."""
+    if scope == 'course':
+        from apps.courses.models import CourseProgress
+        from apps.courses.progress import TOPIC_COMPLETION_XP
+        rows = (
+            CourseProgress.objects.filter(user__is_active=True)
+            .annotate(
+                xp=F('completed_topics_count') * TOPIC_COMPLETION_XP,
+                rank=Window(Rank(), partition_by=F('course_id'), order_by=F('completed_topics_count').desc()),
+            )
+            .order_by()
+            .values_list('course_id', 'user_id', 'xp', 'rank')
+        )
+        for course_id, user_id, xp, rank in rows.iterator(chunk_size=REFRESH_BATCH_SIZE):
+            yield str(course_id), user_id, xp, rank
+        return
+
+    users = User.objects.filter(is_active=True)
+    if scope == 'global':
+        rows = users.annotate(rank=Window(Rank(), order_by=F('uplas_xp_points').desc())).order_by()
+        for user_id, xp, rank in rows.values_list('id', 'uplas_xp_points', 'rank').iterator(chunk_size=REFRESH_BATCH_SIZE):
+            yield '', user_id, xp, rank
+        return
+
+    field = SCOPED_BY_PROFILE[scope]
+    rows = (
+        users.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        .annotate(rank=Window(Rank(), partition_by=F(field), order_by=F('uplas_xp_points').desc()))
+        .order_by()
+        .values_list(field, 'id', 'uplas_xp_points', 'rank')
+    )
+    yield from rows.iterator(chunk_size=REFRESH_BATCH_SIZE)
+
+
+def refresh_leaderboards(scopes=None, batch_size=REFRESH_BATCH_SIZE):
+    """Rebuilds the materialized standings of `scopes` (all by default). Returns {scope: entries written}."""
+    written = {}
+    for scope in scopes or SCOPES:
+        totals = {}
+        batch = []
+        with transaction.atomic():
+            LeaderboardEntry.objects.filter(scope=scope).delete()
+            for scope_value, user_id, xp, rank in _standings(scope):
+                batch.append(LeaderboardEntry(scope=scope, scope_value=scope_value, user_id=user_id, xp=xp, rank=rank))
+                totals[scope_value] = totals.get(scope_value, 0) + 1
+                if len(batch) >= batch_size:
+                    LeaderboardEntry.objects.bulk_create(batch)
+                    batch = []
+            LeaderboardEntry.objects.bulk_create(batch)
+            now = timezone.now()
+            Leaderboard.objects.filter(scope=scope).delete()
+            Leaderboard.objects.bulk_create(
+                [Leaderboard(scope=scope, scope_value=value, total=total, refreshed_at=now) for value, total in totals.items()],
+                batch_size=batch_size,
+            )
+        written[scope] = sum(totals.values())
+    return written
+
+
+# --- Reads ---
+
+def get_board(scope, scope_value):
+    """(total entries, last full rebuild time or None) of a board."""
+    board = Leaderboard.objects.filter(scope=scope, scope_value=scope_value).values_list('total', 'refreshed_at').first()
+    return board or (0, None)
+
+
+def get_my_standing(scope, scope_value, user):
+    """
+    The user's (rank, xp) on a board from their current XP, or None if they
+    do not belong on it. Their own, possibly stale, entry is not counted.
+    """
+    if not user.is_active:
+        return None
+    if scope == 'course':
+        from apps.courses.models import CourseProgress
+        from apps.courses.progress import TOPIC_COMPLETION_XP
+        try:
+            completed = CourseProgress.objects.filter(user=user, course_id=scope_value).values_list(
+                'completed_topics_count', flat=True
+            ).first()
+        except ValidationError:  # Not a course id
+            return None
+        if completed is None:
+            return None
+        xp = completed * TOPIC_COMPLETION_XP
+    else:
+        if scope in SCOPED_BY_PROFILE and getattr(user, SCOPED_BY_PROFILE[scope]) != scope_value:
+            return None
+        xp = user.uplas_xp_points
+    ahead = LeaderboardEntry.objects.filter(scope=scope, scope_value=scope_value, xp__gt=xp).exclude(user=user).count()
+    return ahead + 1, xp
+
+
+def get_page(scope, scope_value, start_rank=1, limit=DEFAULT_PAGE_SIZE):
+    """Entries ranked `start_rank` and below, at most `limit` of them, best first."""
+    return list(
+        LeaderboardEntry.objects.filter(scope=scope, scope_value=scope_value, rank__gte=start_rank)
+        .select_related('user')
+        .only('rank', 'xp', 'user__id', 'user__full_name', 'user__profile_picture_url')
+        .order_by('rank', 'user_id')[:limit]
+    )
@@ -0,0 +1,18 @@
+# users/management/commands/refresh_leaderboards.py
+from django.core.management.base import BaseCommand
+
+from apps.users.leaderboard import REFRESH_BATCH_SIZE, SCOPES, refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recomputes the materialized XP leaderboard standings. Meant to run on a schedule."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scope', action='append', dest='scopes', choices=SCOPES,
+                            help="Only refresh this scope (may be repeated).")
+        parser.add_argument('--batch-size', type=int, default=REFRESH_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        written = refresh_leaderboards(scopes=options['scopes'], batch_size=options['batch_size'])
+        summary = ", ".join(f"{scope}={count}" for scope, count in written.items())
+        self.stdout.write(self.style.SUCCESS(f"Refreshed leaderboards: {summary}."))
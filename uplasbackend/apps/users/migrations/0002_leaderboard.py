@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='uplas_xp_points',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='XP Points'),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('country', 'Country'), ('industry', 'Industry'), ('course', 'Course')], max_length=20, verbose_name='Scope')),
+                ('scope_value', models.CharField(blank=True, default='', max_length=100, verbose_name='Scope Value')),
+                ('xp', models.PositiveIntegerField(verbose_name='XP')),
+                ('rank', models.PositiveIntegerField(verbose_name='Rank')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'indexes': [models.Index(fields=['scope', 'scope_value', 'rank'], name='users_leade_scope_aa63d9_idx')],
+                'unique_together': {('scope', 'scope_value', 'user')},
+            },
+        ),
+    ]
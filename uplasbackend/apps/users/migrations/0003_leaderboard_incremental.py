@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:12
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('country', 'Country'), ('industry', 'Industry'), ('course', 'Course')], max_length=20, verbose_name='Scope')),
+                ('scope_value', models.CharField(blank=True, default='', max_length=100, verbose_name='Scope Value')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total Entries')),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True, verbose_name='Refreshed At')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard',
+                'verbose_name_plural': 'Leaderboards',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['scope', 'scope_value', 'xp'], name='users_leaderboard_xp_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaderboard',
+            unique_together={('scope', 'scope_value')},
+        ),
+    ]
@@ -73,7 +73,7 @@ class User(AbstractUser):
     preferred_language = models.CharField(_("Language"), max_length=10, choices=LANGUAGE_CHOICES, default='en', db_index=True)
     preferred_currency = models.CharField(_("Currency"), max_length=3, choices=settings.CURRENCY_CHOICES, default='USD')
     profile_picture_url = models.URLField(_("Profile Picture URL"), max_length=1024, blank=True, null=True)
-    uplas_xp_points = models.PositiveIntegerField(_("XP Points"), default=0)
+    uplas_xp_points = models.PositiveIntegerField(_("XP Points"), default=0, db_index=True)
     is_premium_subscriber = models.BooleanField(_("Is Premium"), default=False, db_index=True)
     country = models.CharField(_("Country"), max_length=100, blank=True, null=True, db_index=True)
     city = models.CharField(_("City"), max_length=100, blank=True, null=True)
@@ -117,6 +117,55 @@ class UserProfile(BaseModel):
     def __str__(self):
         return f"{self.user.email}'s Profile"
 
+LEADERBOARD_SCOPE_CHOICES = [
+    ('global', _('Global')),
+    ('country', _('Country')),
+    ('industry', _('Industry')),
+    ('course', _('Course')),
+]
+
+class LeaderboardEntry(BaseModel):
+    """
+    One user's standing on one leaderboard (e.g. scope='country', scope_value='Kenya').
+    Rows are materialized by apps.users.leaderboard.refresh_leaderboards.
+    """
+    scope = models.CharField(_("Scope"), max_length=20, choices=LEADERBOARD_SCOPE_CHOICES)
+    scope_value = models.CharField(_("Scope Value"), max_length=100, blank=True, default='')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    xp = models.PositiveIntegerField(_("XP"))
+    rank = models.PositiveIntegerField(_("Rank"))
+
+    class Meta:
+        verbose_name = _('Leaderboard Entry')
+        verbose_name_plural = _('Leaderboard Entries')
+        unique_together = [['scope', 'scope_value', 'user']]
+        indexes = [
+            models.Index(fields=['scope', 'scope_value', 'rank']),
+            # Live "how many are ahead of me" counts between refreshes
+            models.Index(fields=['scope', 'scope_value', 'xp'], name='users_leaderboard_xp_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.scope_value} #{self.rank} {self.user_id}"
+
+class Leaderboard(BaseModel):
+    """
+    Per-board bookkeeping: the number of ranked entries (kept in step with
+    LeaderboardEntry) and when the board was last rebuilt from scratch.
+    """
+    scope = models.CharField(_("Scope"), max_length=20, choices=LEADERBOARD_SCOPE_CHOICES)
+    scope_value = models.CharField(_("Scope Value"), max_length=100, blank=True, default='')
+    total = models.PositiveIntegerField(_("Total Entries"), default=0)
+    refreshed_at = models.DateTimeField(_("Refreshed At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Leaderboard')
+        verbose_name_plural = _('Leaderboards')
+        unique_together = [['scope', 'scope_value']]
+
+    def __str__(self):
+        return f"{self.scope}:{self.scope_value} ({self.total})"
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
     if created:
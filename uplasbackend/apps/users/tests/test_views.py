@@ -2,6 +2,9 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils import timezone
 from django.conf import settings
+from django.core.management import call_command
+from django.core.cache import cache
+from io import StringIO
 from unittest.mock import patch # For mocking external calls like WhatsApp sending
 
 from rest_framework import status
@@ -320,3 +323,88 @@ class WhatsAppVerificationViewTests(UsersViewTestDataMixin, APITestCase):
 # - If AdminUserViewSet is implemented, add tests for its CRUD operations and permissions.
 # - Test any specific error responses or edge cases for each view.
 # - Test that non-owners cannot update profiles of others (should be covered by IsAccountOwnerOrReadOnly).
+
+
+class LeaderboardViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = []
+        for i, (xp, country, industry) in enumerate([
+            (500, 'Kenya', 'Technology'), (400, 'Kenya', 'Finance'), (400, 'Ghana', 'Technology'),
+            (300, 'Kenya', 'Technology'), (200, 'Ghana', 'Finance'), (100, 'Kenya', None),
+        ]):
+            cls.users.append(User.objects.create_user(
+                email=f'board{i}@example.com', password='password123', username=f'board{i}',
+                full_name=f'Board {i}', uplas_xp_points=xp, country=country, industry=industry
+            ))
+        call_command('refresh_leaderboards', stdout=StringIO())
+        cls.url = reverse('users:leaderboard')
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.users[3]).access_token}')
+
+    def test_global_leaderboard_ranks_with_ties(self):
+        response = self.client.get(self.url, {'limit': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 6)
+        self.assertEqual([entry['rank'] for entry in response.data['results']], [1, 2, 2, 4, 5, 6])
+        self.assertEqual(response.data['me'], {'rank': 4, 'xp': 300})
+
+    def test_country_leaderboard_defaults_to_callers_country(self):
+        response = self.client.get(self.url, {'scope': 'country'})
+        self.assertEqual(response.data['value'], 'Kenya')
+        self.assertEqual([entry['xp'] for entry in response.data['results']], [500, 400, 300, 100])
+        self.assertEqual(response.data['me']['rank'], 3)
+
+    def test_window_around_me_uses_constant_queries(self):
+        with self.assertNumQueries(4):  # auth user, my rank, page, board total
+            response = self.client.get(self.url, {'around': 'me', 'limit': 4})
+        self.assertEqual([entry['rank'] for entry in response.data['results']], [2, 2, 4, 5])
+        response = self.client.get(self.url, {'start_rank': 4, 'limit': 2})
+        self.assertEqual([entry['full_name'] for entry in response.data['results']], ['Board 3', 'Board 4'])
+
+    def test_industry_requires_value_for_anonymous(self):
+        self.client.credentials()
+        response = self.client.get(self.url, {'scope': 'industry'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'scope': 'industry', 'value': 'Technology'})
+        self.assertEqual(response.data['total'], 3)
+        self.assertIsNone(response.data['me'])
+
+    def test_total_and_refresh_time_are_stored_with_the_board(self):
+        cache.clear()  # Nothing lives in a worker's cache
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['total'], 6)
+        self.assertIsNotNone(response.data['refreshed_at'])
+
+    def test_my_standing_is_live_between_refreshes(self):
+        User.objects.filter(pk=self.users[3].pk).update(uplas_xp_points=450)
+        response = self.client.get(self.url, {'limit': 10})
+        self.assertEqual(response.data['me'], {'rank': 2, 'xp': 450})
+        # Everyone else keeps the standings of the last refresh
+        self.assertEqual([entry['rank'] for entry in response.data['results']], [1, 2, 2, 4, 5, 6])
+        self.assertEqual(self.client.get(self.url, {'scope': 'country'}).data['me']['rank'], 2)
+
+        # Ties keep RANK() semantics
+        User.objects.filter(pk=self.users[3].pk).update(uplas_xp_points=400)
+        self.assertEqual(self.client.get(self.url).data['me']['rank'], 2)
+
+    def test_my_standing_follows_profile_changes(self):
+        user = self.users[3]
+        user.country = 'Ghana'
+        user.save()
+        self.assertIsNone(self.client.get(self.url, {'scope': 'country', 'value': 'Kenya'}).data['me'])
+        ghana = self.client.get(self.url, {'scope': 'country'}).data
+        self.assertEqual((ghana['value'], ghana['me']), ('Ghana', {'rank': 2, 'xp': 300}))
+
+    def test_unknown_course_board_is_empty(self):
+        response = self.client.get(self.url, {'scope': 'course', 'value': 'not-a-course'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['total'], response.data['me'], response.data['results']), (0, None, []))
+
+    def test_standings_change_on_refresh(self):
+        User.objects.filter(pk=self.users[5].pk).update(uplas_xp_points=1000)
+        self.assertEqual(self.client.get(self.url).data['results'][0]['xp'], 500)
+        call_command('refresh_leaderboards', '--scope', 'global', stdout=StringIO())
+        self.assertEqual(self.client.get(self.url).data['results'][0]['full_name'], 'Board 5')
@@ -1,6 +1,6 @@
 # users/urls.py
 from django.urls import path
-from .views import RegisterView, UserProfileView, CustomTokenObtainPairView
+from .views import RegisterView, UserProfileView, CustomTokenObtainPairView, LeaderboardView
 from rest_framework_simplejwt.views import TokenRefreshView
 
 app_name = 'users'
@@ -10,4 +10,5 @@ urlpatterns = [
     path('login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', UserProfileView.as_view(), name='user_profile'),
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
 ]
@@ -3,8 +3,12 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.views import APIView
 from .serializers import UserSerializer, RegisterSerializer
 from .models import User
+from .leaderboard import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SCOPED_BY_PROFILE, SCOPES, get_board, get_my_standing, get_page
+)
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
@@ -39,3 +43,57 @@ class UserProfileView(generics.RetrieveAPIView):
 
     def get_object(self):
         return self.request.user
+
+class LeaderboardView(APIView):
+    """
+    XP leaderboard served from the standings of the last refresh; "me" is the caller's live standing.
+    GET /users/leaderboard/?scope=global|country|industry|course&value=<...>
+        &start_rank=<n> (rank-keyed pages) or &around=me (window centred on the caller)
+        &limit=<n>
+    Country and industry boards default to the caller's own country/industry.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        scope = request.query_params.get('scope', 'global')
+        if scope not in SCOPES:
+            return Response({"detail": f"scope must be one of {', '.join(SCOPES)}."}, status=status.HTTP_400_BAD_REQUEST)
+        user = request.user if request.user.is_authenticated else None
+
+        scope_value = ''
+        if scope != 'global':
+            scope_value = request.query_params.get('value')
+            if not scope_value and user and scope in SCOPED_BY_PROFILE:
+                scope_value = getattr(user, SCOPED_BY_PROFILE[scope])
+            if not scope_value:
+                return Response({"detail": "A 'value' is required for this scope."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            start_rank = max(int(request.query_params.get('start_rank', 1)), 1)
+        except ValueError:
+            return Response({"detail": "limit and start_rank must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        me = get_my_standing(scope, scope_value, user) if user else None
+        if request.query_params.get('around') == 'me' and me:
+            start_rank = max(me[0] - limit // 2, 1)
+
+        entries = get_page(scope, scope_value, start_rank, limit)
+        total, refreshed_at = get_board(scope, scope_value)
+        return Response({
+            "scope": scope,
+            "value": scope_value,
+            "total": total,
+            "refreshed_at": refreshed_at,
+            "me": {"rank": me[0], "xp": me[1]} if me else None,
+            "results": [
+                {
+                    "rank": entry.rank,
+                    "xp": entry.xp,
+                    "user_id": entry.user.id,
+                    "full_name": entry.user.full_name,
+                    "profile_picture_url": entry.user.profile_picture_url,
+                }
+                for entry in entries
+            ],
+        })